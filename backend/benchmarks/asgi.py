@@ -0,0 +1,51 @@
+"""不经过网络、直接在进程内调用 ASGI 应用的最小客户端"""
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+async def request(app, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                  body: bytes = b"") -> Tuple[int, Dict[str, str], bytes]:
+    """发送一次请求，返回 (状态码, 响应头, 响应体)"""
+    parts = urlsplit(url)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    status = 0
+    response_headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for key, value in message.get("headers", []):
+                response_headers[key.decode().lower()] = value.decode()
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, response_headers, b"".join(chunks)
+
+
+async def get(app, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+    return await request(app, "GET", url, headers)
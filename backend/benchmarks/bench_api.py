@@ -0,0 +1,210 @@
+"""在进程内（ASGI）以固定并发压测 main.py 的全部接口，输出吞吐量和 p50/p95/p99 延迟
+
+先生成指定规模的合成数据写入临时 data.json，并按服务启动时相同的方式
+加载（默认编译并映射快照），再依次压测每个场景。所有请求直接调用 ASGI
+应用，不经过网络，测得的是接口自身的开销；并发主要影响会让出事件循环的
+接口（流式导出、在线程池中执行的重新加载）。
+
+场景覆盖 main.app 中的全部路由，新增路由而没有对应场景时会给出提示。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_api --size 100000 --concurrency 1 16 --output api.json
+    python -m benchmarks.bench_api --baseline api.json    # 与之前的结果比较
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from fastapi.routing import APIRoute
+
+import main
+
+from benchmarks import asgi
+from benchmarks.report import compare, latency_summary, write_report
+from benchmarks.synthetic import BASE_FOODS, CATEGORY_INFO, generate_catalog
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    route: str  # 对应的路由路径模板
+    urls: Sequence[str]  # 依次轮换使用
+    headers: Optional[Dict[str, str]] = None
+    body: bytes = b""
+    expected_status: int = 200
+    # 请求数相对于 --requests 的比例（响应体很大或很慢的接口少测一些）
+    weight: float = 1.0
+    # 固定请求数和并发（例如重新加载数据），None 表示使用命令行参数
+    fixed: Optional[Tuple[int, int]] = None
+
+
+async def first_response(url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, str], bytes]:
+    status, response_headers, body = await asgi.get(main.app, url, headers)
+    assert status == 200, f"{url} 返回 {status}"
+    return response_headers, body
+
+
+async def build_scenarios(foods: List[Dict[str, Any]], seed: int) -> List[Scenario]:
+    rng = random.Random(seed)
+    size = len(foods)
+    ids = [food["id"] for food in rng.sample(foods, min(1000, size))]
+    names = [food["name"] for food in rng.sample(foods, min(1000, size))]
+    common_queries = [quote(base) for base, _, _ in BASE_FOODS]
+    # 长尾搜索：带编号的名称，大部分不会命中响应缓存
+    rare_queries = [quote(f"{base}{rng.randint(1, 999)}") for base, _, _ in BASE_FOODS for _ in range(30)]
+    categories = list(CATEGORY_INFO)
+
+    first_page_headers, _ = await first_response("/api/foods?limit=20")
+    cursor = first_page_headers.get("x-next-cursor", "")
+    etag = first_page_headers["etag"]
+    gzip = {"Accept-Encoding": "gzip"}
+
+    meal = {"items": [{"id": food_id, "quantity": 1.5} for food_id in ids[:5]]
+            + [{"name": name, "amount": 200, "unit": "g"} for name in names[:5]]}
+    meal_body = json.dumps(meal, ensure_ascii=False).encode()
+
+    admin_headers = {"X-Admin-Token": main.ADMIN_TOKEN} if main.ADMIN_TOKEN else None
+
+    return [
+        Scenario("root", "GET", "/", ["/"]),
+        Scenario("foods_first_page", "GET", "/api/foods", ["/api/foods?limit=20"]),
+        Scenario("foods_deep_offset", "GET", "/api/foods", [f"/api/foods?limit=20&offset={size // 2}"]),
+        Scenario("foods_cursor", "GET", "/api/foods", [f"/api/foods?limit=20&cursor={cursor}"]),
+        Scenario("foods_calorie_range", "GET", "/api/foods",
+                 ["/api/foods?min_calories=200&max_calories=400&sort=-calories&limit=20"]),
+        Scenario("foods_not_modified", "GET", "/api/foods", ["/api/foods?limit=20"],
+                 headers={"If-None-Match": etag}, expected_status=304),
+        Scenario("search_common", "GET", "/api/foods/search",
+                 [f"/api/foods/search?q={q}" for q in common_queries], headers=gzip),
+        Scenario("search_long_tail", "GET", "/api/foods/search",
+                 [f"/api/foods/search?q={q}&limit=50" for q in rare_queries]),
+        Scenario("suggest_prefix", "GET", "/api/foods/suggest",
+                 [f"/api/foods/suggest?q={quote(base[:n])}" for base, _, _ in BASE_FOODS for n in (1, 2)]),
+        Scenario("category_page", "GET", "/api/foods/category/{category}",
+                 [f"/api/foods/category/{c}?limit=20" for c in categories]),
+        Scenario("category_calorie_sorted", "GET", "/api/foods/category/{category}",
+                 [f"/api/foods/category/{c}?sort=calories&min_calories=100&limit=20" for c in categories]),
+        Scenario("export_category_ndjson", "GET", "/api/foods/export",
+                 ["/api/foods/export?format=ndjson&category=dairy"], weight=0.02),
+        Scenario("batch_meal", "POST", "/api/foods/batch", ["/api/foods/batch"],
+                 headers={"Content-Type": "application/json"}, body=meal_body),
+        Scenario("food_by_id", "GET", "/api/foods/{food_id}", [f"/api/foods/{quote(i)}" for i in ids]),
+        Scenario("categories", "GET", "/api/categories", ["/api/categories"], headers=gzip),
+        Scenario("stats", "GET", "/api/stats", ["/api/stats"], headers=gzip),
+        Scenario("metrics", "GET", "/metrics", ["/metrics"], weight=0.1),
+        # 重新加载会替换数据、清空响应缓存，放在最后
+        Scenario("admin_reload", "POST", "/api/admin/reload", ["/api/admin/reload"],
+                 headers=admin_headers, fixed=(3, 1)),
+    ]
+
+
+def uncovered_routes(scenarios: List[Scenario]) -> List[str]:
+    """main.app 中没有任何场景覆盖的路由"""
+    covered = {(s.method, s.route) for s in scenarios}
+    missing = []
+    for route in main.app.routes:
+        if isinstance(route, APIRoute):
+            for method in sorted(route.methods):
+                if (method, route.path) not in covered:
+                    missing.append(f"{method} {route.path}")
+    return missing
+
+
+async def run_scenario(scenario: Scenario, requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    total_bytes = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, total_bytes
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            url = scenario.urls[index % len(scenario.urls)]
+            start = time.perf_counter()
+            status, _, body = await asgi.request(main.app, scenario.method, url, scenario.headers, scenario.body)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            total_bytes += len(body)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    summary = latency_summary(latencies)
+    return {
+        "scenario": scenario.name,
+        "method": scenario.method,
+        "route": scenario.route,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": requests - statuses.get(scenario.expected_status, 0),
+        "rps": round(requests / elapsed, 2),
+        **{f"{key}_ms": value for key, value in summary.items()},
+        "bytes_per_request": total_bytes // max(1, requests),
+    }
+
+
+async def run(args, foods: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    scenarios = await build_scenarios(foods, args.seed)
+    missing = uncovered_routes(scenarios)
+    if missing:
+        print(f"⚠️ 以下路由没有压测场景: {', '.join(missing)}")
+    selected = [s for s in scenarios if not args.only or s.name in args.only]
+
+    results = []
+    print(f"{'场景':<26}{'并发':>5}{'请求数':>8}{'req/s':>11}{'p50(ms)':>10}{'p95(ms)':>10}"
+          f"{'p99(ms)':>10}{'错误':>6}")
+    for scenario in selected:
+        plans = [scenario.fixed] if scenario.fixed else [
+            (max(10, int(args.requests * scenario.weight)), c) for c in args.concurrency
+        ]
+        for requests, concurrency in plans:
+            if not scenario.fixed:
+                # 预热：填充响应缓存、触发各模块的首次导入和初始化
+                await run_scenario(scenario, min(requests, args.warmup), 1)
+            result = await run_scenario(scenario, requests, concurrency)
+            results.append(result)
+            print(f"{scenario.name:<26}{concurrency:>5}{requests:>8}{result['rps']:>11.1f}"
+                  f"{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+                  f"{result['errors']:>6}")
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000, help="合成数据条数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=2000, help="每个场景、每档并发的请求数")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--only", nargs="+", help="只运行指定的场景")
+    parser.add_argument("--no-snapshot", action="store_true", help="直接解析 JSON，不使用快照文件")
+    parser.add_argument("--output", help="结果 JSON 文件路径，- 表示输出到标准输出")
+    parser.add_argument("--baseline", help="与之前保存的结果 JSON 比较")
+    args = parser.parse_args()
+
+    foods = generate_catalog(args.size, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        main.DATA_FILE = os.path.join(tmp, "data.json")
+        main.SNAPSHOT_FILE = "" if args.no_snapshot else os.path.join(tmp, "data.snapshot")
+        with open(main.DATA_FILE, "w", encoding="utf-8") as f:
+            json.dump(foods, f, ensure_ascii=False)
+        main.load_food_data()
+        results = asyncio.run(run(args, foods))
+
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    write_report("api", params, results, args.output)
+    if args.baseline:
+        compare(args.baseline, results, ("scenario", "concurrency"), "rps")
+
+
+if __name__ == "__main__":
+    main_cli()
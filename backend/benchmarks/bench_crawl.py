@@ -0,0 +1,86 @@
+"""在本地桩服务上对比串行与并发批量抓取的耗时和请求数
+
+默认对比两种抓取后端：api（批量调用 MediaWiki API）和 wikipedia（wikipedia 库逐页加载）。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_crawl --latency 0.05 --workers 1 4 8
+    python -m benchmarks.bench_crawl --backends api
+    python -m benchmarks.bench_crawl --cache    # 额外对比冷/热缓存与离线模式
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import time
+
+from scrape_cache import ScrapeCache
+from scraper import WikipediaFoodScraper
+
+from benchmarks.stub_wiki import StubWiki
+
+FOODS = ["牛奶", "巧克力", "可乐", "苹果", "米饭", "鸡腿", "薯片", "面包", "香蕉", "咖啡", "不存在的食物"]
+
+
+def crawl(stub: StubWiki, workers: int, rate: float, host_interval: float, cache=None, backend: str = "api"):
+    scraper = WikipediaFoodScraper(api_url=stub.api_url, requests_per_second=rate,
+                                   host_interval=host_interval, backoff=0.05, cache=cache, backend=backend)
+    stub.request_count = 0
+    start = time.perf_counter()
+    # 屏蔽爬虫的逐条日志输出
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = scraper.get_food_data_batch(FOODS, workers=workers)
+    return time.perf_counter() - start, results, stub.request_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.05, help="桩服务每个请求的延迟（秒）")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="桩服务随机返回 503 的比例")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--backends", nargs="+", choices=["api", "wikipedia"], default=["api", "wikipedia"])
+    parser.add_argument("--rate", type=float, default=0, help="每秒请求数上限，0 为不限")
+    parser.add_argument("--host-interval", type=float, default=0.0)
+    parser.add_argument("--cache", action="store_true", help="同时测试持久化缓存")
+    args = parser.parse_args()
+
+    with StubWiki(latency=args.latency, fail_rate=args.fail_rate) as stub:
+        print(f"🧪 {len(FOODS)} 个食物，单请求延迟 {args.latency * 1000:.0f}ms")
+        print(f"{'后端':<12}{'并发数':<8}{'耗时(s)':>10}{'请求数':>8}{'找到':>6}")
+        baseline = None
+        for backend in args.backends:
+            for workers in args.workers:
+                elapsed, results, requests = crawl(stub, workers, args.rate, args.host_interval, backend=backend)
+                if baseline is None:
+                    baseline = results
+                elif not args.fail_rate:
+                    # 并发只改变完成顺序，后端只改变请求方式，返回结果都与第一次一致
+                    assert results == baseline, backend
+                print(f"{backend:<12}{workers:<8}{elapsed:>10.2f}{requests:>8}{len(results):>6}")
+
+        if args.cache:
+            compare_cache(stub, max(args.workers), baseline, args.backends[0])
+
+
+def compare_cache(stub: StubWiki, workers: int, baseline, backend: str):
+    """同一份食物清单连续抓取：冷缓存、热缓存、缓存全部过期（按修订号重新验证）、离线"""
+    print(f"\n💾 持久化缓存（{backend} 后端，并发数 {workers}）")
+    print(f"{'场景':<12}{'耗时(s)':>10}{'请求数':>8}{'找到':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite3")
+        scenarios = ["冷缓存", "热缓存", "全部过期", "离线"]
+        for label in scenarios:
+            if label == "全部过期":
+                # 把已有条目的存储时间改到很久以前；本轮重新验证或写入的条目照常有效
+                with sqlite3.connect(path) as db:
+                    db.execute("UPDATE entries SET stored_at = 0")
+            cache = ScrapeCache(path, offline=label == "离线")
+            elapsed, results, requests = crawl(stub, workers, 0, 0, cache, backend)
+            cache.close()
+            assert results == baseline, label
+            print(f"{label:<12}{elapsed:>10.2f}{requests:>8}{len(results):>6}")
+
+
+if __name__ == "__main__":
+    main()
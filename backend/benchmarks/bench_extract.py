@@ -0,0 +1,96 @@
+"""对比热量提取的原实现（每次调用 re.findall）与预编译 + 关键词预检的实现
+
+真实维基百科条目通常有几万字，热量信息往往只在某一小节中出现，
+因此把录制页面的正文放在一段不含热量信息的长文本之后进行测试。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_extract --page-chars 2000 20000 100000
+"""
+import argparse
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from scraper import CALORIE_PATTERNS, WikipediaFoodScraper
+
+from benchmarks.stub_wiki import load_fixture_pages
+
+# 模拟条目中历史、产地等章节：含有数字、单位和常见标点，但不含热量信息
+FILLER = ("== 历史 ==\n该食物最早见于公元1200年前后的文献记载，19世纪传入欧洲，"
+          "目前全球年产量约为3500万吨，其中约60%产自亚洲。"
+          "常见的包装规格有250毫升、500克和1000克等，保质期一般为12个月。\n")
+
+# 原实现使用的模式字符串，与 CALORIE_PATTERNS 一一对应
+LEGACY_PATTERNS = [(pattern.pattern, unit_type) for pattern, unit_type, _ in CALORIE_PATTERNS]
+
+
+def legacy_extract(scraper: WikipediaFoodScraper, content: str, food_name: str) -> Optional[Dict]:
+    """原 _extract_calories_from_content 的实现：每个模式都对全文执行 re.findall"""
+    for pattern, unit_type in LEGACY_PATTERNS:
+        matches = re.findall(pattern, content, re.IGNORECASE)
+        if matches:
+            try:
+                if unit_type in ['specific_portion', '100g_energy']:
+                    if len(matches[0]) == 2:
+                        portion_amount, calories_value = int(matches[0][0]), int(matches[0][1])
+                        if scraper._is_reasonable_specific_calorie_value(
+                            calories_value, portion_amount, unit_type, food_name
+                        ):
+                            converted = scraper._convert_specific_portion_to_standard(
+                                calories_value, portion_amount, unit_type, food_name
+                            )
+                            if converted:
+                                return converted
+                else:
+                    calories_value = int(matches[0])
+                    if scraper._is_reasonable_calorie_value(calories_value, unit_type, food_name):
+                        converted = scraper._convert_to_standard_portion(calories_value, unit_type, food_name)
+                        if converted:
+                            return converted
+            except (ValueError, IndexError):
+                continue
+    return None
+
+
+def build_corpus(page_chars: int) -> List[Tuple[str, str]]:
+    """(正文, 食物名) 列表，每篇正文前补足到约 page_chars 个字符"""
+    corpus = []
+    for page in load_fixture_pages():
+        padding = FILLER * max(0, (page_chars - len(page["content"])) // len(FILLER))
+        corpus.append((padding + page["content"], page["title"]))
+        # 不含任何热量信息的页面，每个模式都要扫描全文
+        corpus.append((padding + page["summary"], page["title"]))
+    return corpus
+
+
+def throughput(func, corpus: List[Tuple[str, str]], repeat: int) -> float:
+    """返回每秒处理的页面数"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for content, food_name in corpus:
+            func(content, food_name)
+    return len(corpus) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-chars", type=int, nargs="+", default=[2000, 20000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scraper = WikipediaFoodScraper()
+    print(f"{'页面字数':<10}{'原实现(页/s)':>14}{'预编译(页/s)':>14}{'加速比':>10}")
+    for page_chars in args.page_chars:
+        corpus = build_corpus(page_chars)
+        for content, food_name in corpus:
+            expected = legacy_extract(scraper, content, food_name)
+            actual = scraper._extract_calories_from_content(content, food_name)
+            assert expected == actual, f"结果不一致: {food_name}"
+
+        legacy = throughput(lambda c, f: legacy_extract(scraper, c, f), corpus, args.repeat)
+        compiled = throughput(scraper._extract_calories_from_content, corpus, args.repeat)
+        print(f"{page_chars:<10}{legacy:>14.0f}{compiled:>14.0f}{compiled / legacy:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
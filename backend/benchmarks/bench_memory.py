@@ -0,0 +1,102 @@
+"""对比 list[dict] 与列式存储的内存占用
+
+每种表示在独立子进程中构建，分别用 tracemalloc（Python 分配量）和
+RSS 增量衡量常驻内存。合成数据的描述每行各不相同，与爬虫发布的目录一致。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_memory --sizes 10000 1000000
+"""
+import argparse
+import ctypes
+import gc
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+from benchmarks.synthetic import generate_catalog
+
+MODES = {
+    "dicts": "json.load 得到的 list[dict]（原实现）",
+    "columnar": "ColumnarFoodStore（仅数据列）",
+    "dataset": "FoodDataset（列式存储 + 全部索引）",
+}
+
+
+def rss_bytes() -> int:
+    """当前进程的常驻内存（仅 Linux）"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def release_free_memory():
+    """让 glibc 归还构建过程中释放的堆内存，使 RSS 反映常驻数据"""
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def build(mode: str, raw: str):
+    foods = json.loads(raw)
+    if mode == "dicts":
+        return foods
+    if mode == "columnar":
+        from food_store import FoodStoreBuilder
+        builder = FoodStoreBuilder()
+        for food in foods:
+            builder.append(food, json.dumps(food, ensure_ascii=False, separators=(",", ":")).encode())
+        return builder.finish()
+    from dataset import FoodDataset
+    return FoodDataset(foods)
+
+
+def child(mode: str, size: int, measure: str):
+    raw = json.dumps(generate_catalog(size, unique_descriptions=True), ensure_ascii=False)
+    gc.collect()
+    if measure == "tracemalloc":
+        tracemalloc.start()
+        result = build(mode, raw)
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0]
+    else:
+        release_free_memory()
+        before = rss_bytes()
+        result = build(mode, raw)
+        gc.collect()
+        release_free_memory()
+        used = rss_bytes() - before
+    print(json.dumps({"bytes": used, "rows": len(result)}))
+
+
+def measure(mode: str, size: int, how: str) -> int:
+    output = subprocess.check_output(
+        [sys.executable, "-m", "benchmarks.bench_memory", "--child", mode, str(size), how],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])["bytes"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 1000000])
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "SIZE", "MEASURE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, size, how = args.child
+        child(mode, int(size), how)
+        return
+
+    for size in args.sizes:
+        print(f"\n📦 {size} 条数据")
+        print(f"{'表示方式':<36}{'tracemalloc':>14}{'RSS 增量':>14}{'每条(字节)':>12}")
+        for mode, label in MODES.items():
+            traced = measure(mode, size, "tracemalloc")
+            rss = measure(mode, size, "rss")
+            print(f"{label:<36}{traced / 2**20:>12.1f}MB{rss / 2**20:>12.1f}MB{traced / size:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""抓取流水线的吞吐量随分析进程数的变化
+
+先在本地桩服务上用流水线抓取一遍（流水线会加载全部候选页面，串行抓取只加载
+用到的页面），把搜索结果和页面录制到持久化缓存中，再从缓存按常规方式
+（get_food_calories）得到期望结果；之后以离线模式回放同一份缓存，抓取阶段只读
+本地缓存，比较：
+
+- serial：get_food_data_batch 逐个食物串行抓取和分析
+- processes=0：流水线，分析在主线程中执行
+- processes=N：流水线，分析交给 N 个进程
+
+页面正文前补足到指定字数（真实条目通常有几万字），每个食物的结果都与 serial 一致。
+加速比受 CPU 核数限制，报告中记录了 cpu_count。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_pipeline --foods 400 --processes 0 1 2 4 --output pipeline.json
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from crawl_pipeline import CrawlPipeline
+from scrape_cache import ScrapeCache
+from scraper import WikipediaFoodScraper
+
+from benchmarks.bench_crawl import FOODS
+from benchmarks.bench_extract import FILLER
+from benchmarks.report import compare, write_report
+from benchmarks.stub_wiki import StubWiki, load_fixture_pages
+
+
+def padded_pages(page_chars: int) -> List[Dict[str, Any]]:
+    """录制页面的正文前补足到约 page_chars 个字符"""
+    pages = []
+    for page in load_fixture_pages():
+        padding = FILLER * max(0, (page_chars - len(page["content"])) // len(FILLER))
+        pages.append({**page, "content": padding + page["content"]})
+    return pages
+
+
+def record(cache_path: str, page_chars: int) -> Dict[str, Optional[Dict]]:
+    """在桩服务上抓取一遍并写入缓存，返回每个食物的结果"""
+    with StubWiki(pages=padded_pages(page_chars)) as stub:
+        cache = ScrapeCache(cache_path)
+        scraper = WikipediaFoodScraper(api_url=stub.api_url, requests_per_second=0, host_interval=0, cache=cache)
+        with contextlib.redirect_stdout(io.StringIO()):
+            CrawlPipeline(scraper, processes=0).run(FOODS, lambda food, result: None)
+            expected = {food: scraper.get_food_calories(food) for food in FOODS}
+        cache.close()
+    return expected
+
+
+def replay(cache_path: str, foods: List[str], processes: Optional[int], fetch_workers: int,
+           expected: Dict[str, Optional[Dict]]) -> Dict[str, Any]:
+    cache = ScrapeCache(cache_path, offline=True)
+    scraper = WikipediaFoodScraper(requests_per_second=0, host_interval=0, cache=cache)
+    results: Dict[str, Optional[Dict]] = {}
+
+    def sink(food: str, result: Optional[Dict]):
+        results[food] = result
+
+    stats: Dict[str, int] = {}
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if processes is None:
+            for food, result in scraper.iter_food_data(foods, workers=1):
+                sink(food, result)
+        else:
+            stats = CrawlPipeline(scraper, fetch_workers=fetch_workers, processes=processes).run(foods, sink)
+    elapsed = time.perf_counter() - start
+    cache.close()
+    assert results == expected, processes
+    return {
+        "mode": "serial" if processes is None else "pipeline",
+        "processes": processes,
+        "foods": len(foods),
+        "seconds": round(elapsed, 3),
+        "foods_per_sec": round(len(foods) / elapsed, 1),
+        "pages_analyzed": stats.get("pages"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--foods", type=int, default=400, help="抓取的食物数（循环使用录制的食物清单）")
+    parser.add_argument("--page-chars", type=int, default=50000, help="每个页面正文补足到的字数")
+    parser.add_argument("--processes", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--fetch-workers", type=int, default=4)
+    parser.add_argument("--output", help="结果 JSON 文件路径，- 表示输出到标准输出")
+    parser.add_argument("--baseline", help="与之前保存的结果 JSON 比较")
+    args = parser.parse_args()
+
+    foods = list(itertools.islice(itertools.cycle(FOODS), args.foods))
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "cache.sqlite3")
+        print(f"📼 录制 {len(FOODS)} 个食物的页面（正文约 {args.page_chars} 字）...")
+        expected = record(cache_path, args.page_chars)
+
+        print(f"🧪 回放 {len(foods)} 个食物，CPU 核数 {os.cpu_count()}")
+        print(f"{'模式':<10}{'进程数':>8}{'耗时(s)':>10}{'食物/s':>10}{'加速比':>8}")
+        results = []
+        for processes in [None, *args.processes]:
+            result = replay(cache_path, foods, processes, args.fetch_workers, expected)
+            result["speedup"] = round(result["foods_per_sec"] / results[0]["foods_per_sec"], 2) if results else 1.0
+            results.append(result)
+            print(f"{result['mode']:<10}{'' if processes is None else processes:>8}{result['seconds']:>10.2f}"
+                  f"{result['foods_per_sec']:>10.1f}{result['speedup']:>7.2f}x")
+
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    write_report("pipeline", params, results, args.output)
+    if args.baseline:
+        compare(args.baseline, results, ("mode", "processes"), "foods_per_sec")
+
+
+if __name__ == "__main__":
+    main()
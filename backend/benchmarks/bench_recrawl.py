@@ -0,0 +1,91 @@
+"""增量刷新与完整重新抓取的请求数和耗时对比
+
+在本地桩服务上依次执行：
+- 首次抓取：所有食物都是新加入的
+- 完整重新抓取：不使用抓取状态，重新搜索和提取全部食物
+- 无变化刷新：只批量核对修订号
+- 部分更新刷新：修改 --edits 个来源页面（修订号加一、热量数值改变），只重新提取这些食物
+
+每次刷新后的结果都与在当前页面上完整抓取的结果一致。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_recrawl --latency 0.05 --edits 2
+"""
+import argparse
+import contextlib
+import io
+import os
+import re
+import tempfile
+import time
+from typing import Dict, Optional
+
+from crawl_state import CrawlState, refresh
+from scraper import WikipediaFoodScraper
+
+from benchmarks.bench_crawl import FOODS
+from benchmarks.stub_wiki import StubWiki
+
+
+def make_scraper(stub: StubWiki) -> WikipediaFoodScraper:
+    return WikipediaFoodScraper(api_url=stub.api_url, requests_per_second=0, host_interval=0, backoff=0.05)
+
+
+def full_crawl(stub: StubWiki) -> Dict[str, Optional[Dict]]:
+    scraper = make_scraper(stub)
+    return {food: result for food, result in scraper.iter_food_data(FOODS, workers=4)}
+
+
+def edit_page(stub: StubWiki, title: str):
+    """模拟页面编辑：修订号加一，正文中的热量数值加 10"""
+    page = stub.pages[title]
+    page["revid"] += 1
+    page["content"] = re.sub(r"(\d+)(\s*(?:大卡|千卡|卡路里|kcal))", lambda m: f"{int(m.group(1)) + 10}{m.group(2)}",
+                             page["content"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="桩服务每个请求的延迟（秒）")
+    parser.add_argument("--edits", type=int, default=2, help="部分更新场景中修改的页面数")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with StubWiki(latency=args.latency) as stub, tempfile.TemporaryDirectory() as tmp:
+        state = CrawlState(os.path.join(tmp, "state.sqlite3"))
+        print(f"🧪 {len(FOODS)} 个食物，单请求延迟 {args.latency * 1000:.0f}ms")
+        print(f"{'场景':<16}{'耗时(s)':>10}{'请求数':>8}{'找到':>6}  统计")
+
+        def run(label: str, func):
+            stub.request_count = 0
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = func()
+            elapsed = time.perf_counter() - start
+            found = stats.get("found", "")
+            detail = " ".join(f"{key}={value}" for key, value in stats.items() if key not in ("foods", "found"))
+            print(f"{label:<16}{elapsed:>10.2f}{stub.request_count:>8}{found:>6}  {detail}")
+
+        def check():
+            # 刷新后保存的结果与在当前页面上完整抓取的结果一致
+            with contextlib.redirect_stdout(io.StringIO()):
+                expected = full_crawl(stub)
+            records = state.records(FOODS)
+            assert {food: records[food].result for food in FOODS} == expected
+
+        run("首次抓取", lambda: refresh(make_scraper(stub), state, FOODS, args.workers))
+        check()
+        run("完整重新抓取", lambda: {"found": sum(1 for r in full_crawl(stub).values() if r)})
+        run("无变化刷新", lambda: refresh(make_scraper(stub), state, FOODS, args.workers))
+        check()
+
+        sources = sorted({record.title for record in state.records(FOODS).values() if record.title})
+        for title in sources[:args.edits]:
+            edit_page(stub, title)
+        run(f"修改 {min(args.edits, len(sources))} 个页面", lambda: refresh(make_scraper(stub), state, FOODS, args.workers))
+        check()
+        state.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""爬虫热点函数的微基准：热量提取、页面过滤、食物分类和标准分量查找
+
+- _extract_calories_from_content / _is_food_related_page：录制的维基百科页面
+  （benchmarks/fixtures），正文前补足到指定字数，另有只含摘要、没有热量信息的页面
+- categorize_food / _get_standard_portion：页面标题加上合成数据中的食物名称
+- _is_irrelevant_page / _find_best_disambiguation_option：页面标题与食物名称的组合
+
+每一轮把全部输入各调用一次，按轮计算单次调用的平均耗时，
+报告各轮之间的 p50/p95/p99（微秒）和每秒调用次数。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_scraper --output scraper.json
+    python -m benchmarks.bench_scraper --baseline scraper.json
+"""
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+from scraper import WikipediaFoodScraper, categorize_food
+
+from benchmarks.bench_extract import build_corpus
+from benchmarks.report import compare, latency_summary, write_report
+from benchmarks.stub_wiki import load_fixture_pages
+from benchmarks.synthetic import generate_catalog
+
+
+def measure(name: str, func: Callable[..., Any], inputs: Sequence[tuple], rounds: int,
+            **params: Any) -> Dict[str, Any]:
+    """每轮依次以 inputs 中的参数调用 func，返回单次调用耗时的统计"""
+    # 预热一轮
+    for args in inputs:
+        func(*args)
+    per_call: List[float] = []
+    total = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for args in inputs:
+            func(*args)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        per_call.append(elapsed / len(inputs))
+    summary = latency_summary(per_call, scale=1e6)
+    return {
+        "function": name,
+        **params,
+        "inputs": len(inputs),
+        "rounds": rounds,
+        "calls_per_sec": round(len(inputs) * rounds / total, 1),
+        **{f"{key}_us": value for key, value in summary.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-chars", type=int, nargs="+", default=[2000, 20000],
+                        help="热量提取测试中每个页面补足到的字数")
+    parser.add_argument("--names", type=int, default=2000, help="分类和分量查找使用的合成食物名称数")
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="结果 JSON 文件路径，- 表示输出到标准输出")
+    parser.add_argument("--baseline", help="与之前保存的结果 JSON 比较")
+    args = parser.parse_args()
+
+    scraper = WikipediaFoodScraper()
+    names = [page["title"] for page in load_fixture_pages()]
+    names += [food["name"] for food in generate_catalog(args.names, args.seed)]
+    name_inputs = [(name,) for name in names]
+
+    results = []
+    for page_chars in args.page_chars:
+        corpus = build_corpus(page_chars)
+        results.append(measure("_extract_calories_from_content", scraper._extract_calories_from_content,
+                               corpus, args.rounds, page_chars=page_chars))
+        results.append(measure("_is_food_related_page", scraper._is_food_related_page,
+                               corpus, args.rounds, page_chars=page_chars))
+    results.append(measure("categorize_food", categorize_food, name_inputs, args.rounds))
+    results.append(measure("_get_standard_portion", scraper._get_standard_portion, name_inputs, args.rounds))
+
+    rng = random.Random(args.seed)
+    titles = [page["title"] for page in load_fixture_pages()]
+    pairs = [(rng.choice(titles), name) for name in names]
+    results.append(measure("_is_irrelevant_page", scraper._is_irrelevant_page, pairs, args.rounds))
+    option_inputs = [(rng.sample(names, 5), name) for name in names]
+    results.append(measure("_find_best_disambiguation_option", scraper._find_best_disambiguation_option,
+                           option_inputs, args.rounds))
+
+    print(f"{'函数':<34}{'页面字数':>8}{'调用/s':>12}{'p50(us)':>10}{'p95(us)':>10}{'p99(us)':>10}")
+    for result in results:
+        print(f"{result['function']:<34}{result.get('page_chars', ''):>8}{result['calls_per_sec']:>12.0f}"
+              f"{result['p50_us']:>10.2f}{result['p95_us']:>10.2f}{result['p99_us']:>10.2f}")
+
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    write_report("scraper", params, results, args.output)
+    if args.baseline:
+        compare(args.baseline, results, ("function", "page_chars"), "calls_per_sec")
+
+
+if __name__ == "__main__":
+    main()
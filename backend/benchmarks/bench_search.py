@@ -0,0 +1,71 @@
+"""对比线性扫描与 n-gram 倒排索引的搜索性能
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_search --sizes 1000 100000 1000000
+"""
+import argparse
+import time
+from typing import Any, Dict, List
+
+from search_index import NgramIndex
+
+from benchmarks.synthetic import generate_catalog
+
+QUERIES = ["鸡", "奶茶", "巧克力蛋糕", "mc", "香辣鸡腿套餐", "不存在的食物"]
+
+
+def linear_scan(foods: List[Dict[str, Any]], query: str, limit: int) -> List[Dict[str, Any]]:
+    """原 search_foods 的实现：逐条比较小写名称"""
+    query_lower = query.lower()
+    result = [food for food in foods if query_lower in food['name'].lower()]
+    return result[:limit] if limit else result
+
+
+def indexed_search(foods: List[Dict[str, Any]], index: NgramIndex, query: str, limit: int) -> List[Dict[str, Any]]:
+    result = []
+    for row in index.search(query.lower()):
+        result.append(foods[row])
+        if limit and len(result) >= limit:
+            break
+    return result
+
+
+def timeit(func, repeat: int) -> float:
+    """返回单次调用的平均耗时（毫秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        foods = generate_catalog(size)
+        start = time.perf_counter()
+        index = NgramIndex([food['name'] for food in foods])
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"\n📦 {size} 条数据，索引构建耗时 {build_ms:.1f}ms")
+        print(f"{'查询':<12}{'线性扫描(ms)':>14}{'倒排索引(ms)':>14}{'加速比':>10}")
+
+        for query in QUERIES:
+            for limit in (args.limit, 0):
+                expected = linear_scan(foods, query, limit)
+                actual = indexed_search(foods, index, query, limit)
+                assert expected == actual, f"结果不一致: {query!r}"
+
+            # 大数据量下线性扫描很慢，减少重复次数
+            repeat = max(1, args.repeat * 1000 // size) if size > 1000 else args.repeat
+            scan_ms = timeit(lambda: linear_scan(foods, query, args.limit), repeat)
+            index_ms = timeit(lambda: indexed_search(foods, index, query, args.limit), args.repeat)
+            speedup = scan_ms / index_ms if index_ms else float("inf")
+            print(f"{query:<12}{scan_ms:>14.3f}{index_ms:>14.3f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
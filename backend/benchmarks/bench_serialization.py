@@ -0,0 +1,87 @@
+"""对比逐条构建 FoodItem 与拼接预序列化片段的接口吞吐量
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_serialization --sizes 509 10000
+"""
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+
+from fastapi import FastAPI, Query
+
+import main
+from dataset import FoodDataset
+from models import FoodItem
+
+from benchmarks import asgi
+from benchmarks.synthetic import generate_catalog
+
+URLS = [
+    "/api/foods",
+    "/api/foods?limit=100",
+    "/api/foods/search?q=%E9%B8%A1&limit=50",
+]
+
+
+def legacy_app(foods) -> FastAPI:
+    """复刻优化前的实现：每次请求构建模型并由 FastAPI 再次校验和序列化"""
+    app = FastAPI()
+
+    @app.get("/api/foods", response_model=List[FoodItem])
+    async def get_all_foods(limit: Optional[int] = Query(None), offset: Optional[int] = Query(0)):
+        result = foods[offset:] if limit is None else foods[offset:offset + limit]
+        return [FoodItem(**food) for food in result]
+
+    @app.get("/api/foods/search", response_model=List[FoodItem])
+    async def search_foods(q: str = Query(...), category: Optional[str] = Query(None),
+                           limit: Optional[int] = Query(20)):
+        query_lower = q.lower()
+        filtered = [food for food in foods if query_lower in food['name'].lower()
+                    and (category is None or food['category'] == category)]
+        if limit:
+            filtered = filtered[:limit]
+        return [FoodItem(**food) for food in filtered]
+
+    return app
+
+
+async def throughput(app, url: str, seconds: float) -> float:
+    """在给定时长内串行发送请求，返回每秒请求数"""
+    count = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        status, _, _ = await asgi.get(app, url)
+        assert status == 200, url
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+async def run(sizes: List[int], seconds: float):
+    for size in sizes:
+        foods = generate_catalog(size)
+        main.dataset = FoodDataset(foods)
+        before = legacy_app(foods)
+        print(f"\n📦 {size} 条数据")
+        print(f"{'接口':<44}{'优化前(req/s)':>14}{'优化后(req/s)':>14}{'提升':>8}")
+        for url in URLS:
+            # 两种实现的响应体必须逐字节一致
+            _, _, expected = await asgi.get(before, url)
+            _, _, actual = await asgi.get(main.app, url)
+            assert expected == actual, url
+            old_rps = await throughput(before, url, seconds)
+            new_rps = await throughput(main.app, url, seconds)
+            print(f"{url:<44}{old_rps:>14.1f}{new_rps:>14.1f}{new_rps / old_rps:>7.1f}x")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[509, 10000])
+    parser.add_argument("--seconds", type=float, default=2.0, help="每个接口的测试时长")
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.seconds))
+
+
+if __name__ == "__main__":
+    main_cli()
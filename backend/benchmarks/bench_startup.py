@@ -0,0 +1,81 @@
+"""对比从 data.json 启动与从二进制快照启动的首个请求响应时间
+
+每种场景启动一个真实的 uvicorn 进程，从启动进程开始计时，轮询
+/api/foods?limit=1 直到返回完整数据集的总数为止。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_startup --sizes 10000 1000000
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict
+
+from benchmarks.synthetic import generate_catalog
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(env: Dict[str, str], expected_rows: int, timeout: float = 600) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/foods?limit=1"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError("服务启动失败")
+            try:
+                with urllib.request.urlopen(url, timeout=5) as response:
+                    if int(response.headers["X-Total-Count"]) == expected_rows:
+                        return time.perf_counter() - start
+            except OSError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError("等待服务就绪超时")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 1000000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_file = os.path.join(tmp, "data.json")
+            snapshot_file = os.path.join(tmp, "data.snapshot")
+            with open(data_file, "w", encoding="utf-8") as f:
+                json.dump(generate_catalog(size), f, ensure_ascii=False)
+            env = {**os.environ, "CALORIE_DATA_FILE": data_file}
+            env.pop("CALORIE_WATCH_INTERVAL", None)
+
+            print(f"\n📦 {size} 条数据，data.json {os.path.getsize(data_file) / 2**20:.1f}MB")
+            json_time = time_to_first_request({**env, "CALORIE_SNAPSHOT_FILE": ""}, size)
+            print(f"{'仅 JSON':<16}{json_time:>8.2f}s")
+            build_time = time_to_first_request({**env, "CALORIE_SNAPSHOT_FILE": snapshot_file}, size)
+            print(f"{'快照（首次编译）':<16}{build_time:>8.2f}s")
+            snapshot_time = time_to_first_request({**env, "CALORIE_SNAPSHOT_FILE": snapshot_file}, size)
+            print(f"{'快照':<16}{snapshot_time:>8.2f}s   "
+                  f"快照 {os.path.getsize(snapshot_file) / 2**20:.1f}MB，加速 {json_time / snapshot_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""自动补全索引的构建耗时和查询延迟
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_suggest --sizes 10000 1000000
+"""
+import argparse
+import time
+
+from food_store import StringTable
+from suggest import Popularity, SuggestIndex
+
+from benchmarks.report import latency_summary
+from benchmarks.synthetic import BASE_FOODS, PREFIXES, generate_catalog
+
+# 单字、常见前缀、完整名称和不存在的前缀
+QUERIES = sorted({base[:1] for base, _, _ in BASE_FOODS}) + [p for p in PREFIXES if p] + \
+    [base for base, _, _ in BASE_FOODS] + ["mc", "k", "不存在"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 1000000])
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        names = StringTable.build(food["name"].encode('utf-8') for food in generate_catalog(size))
+        start = time.perf_counter()
+        index = SuggestIndex(names, "bench", Popularity())
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        index.warm()
+        warm = time.perf_counter() - start
+        print(f"\n📦 {size} 条名称，{len(index)} 个补全键，构建 {build:.2f}s，预计算 {warm:.2f}s")
+
+        samples = []
+        for _ in range(args.repeat):
+            for query in QUERIES:
+                start = time.perf_counter()
+                index.suggest(query, args.limit)
+                samples.append(time.perf_counter() - start)
+        summary = latency_summary(samples, scale=1e6)
+        print(f"查询 {len(samples)} 次: 平均 {summary['mean']:.1f}us, p50 {summary['p50']:.1f}us, "
+              f"p99 {summary['p99']:.1f}us, 最大 {summary['max']:.1f}us")
+
+        # 热度更新：每次更新沿路节点的 top-k
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for base, _, _ in BASE_FOODS:
+                index.record_hit(base)
+        per_hit = (time.perf_counter() - start) / (args.repeat * len(BASE_FOODS)) * 1e6
+        print(f"记录一次搜索热度: {per_hit:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""对比多 worker 下各自解析 data.json 与共享 mmap 快照的内存占用和启动耗时
+
+每个 worker 是一个独立进程，执行与服务启动相同的 load_food_data()，
+并输出一次完整的 /api/foods 响应体（访问全部记录）。全部就绪后读取
+/proc/<pid>/smaps_rollup：RSS 会把共享页重复计入每个进程，PSS 按共享
+进程数分摊，所以各 worker 的 PSS 之和才是真实的总内存占用。
+
+用法（在 backend 目录下，仅 Linux）:
+    python -m benchmarks.bench_workers --size 200000 --workers 1 4 16
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.synthetic import generate_catalog
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child():
+    import main
+    main.load_food_data()
+    data = main.dataset
+    size = len(data.json_array(range(len(data))))
+    print(json.dumps({"rows": len(data), "bytes": size}), flush=True)
+    # 保持进程存活，等待父进程读取内存信息
+    sys.stdin.read()
+
+
+def memory_of(pid: int) -> Dict[str, int]:
+    """进程的 RSS 和 PSS（字节）"""
+    result = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                result[key] = int(value.split()[0]) * 1024
+    return result
+
+
+def run_workers(count: int, env: Dict[str, str]):
+    """同时启动 count 个 worker，返回 (全部就绪耗时, 各进程内存)"""
+    start = time.perf_counter()
+    procs = [
+        subprocess.Popen([sys.executable, "-m", "benchmarks.bench_workers", "--child"],
+                         cwd=BACKEND_DIR, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        for _ in range(count)
+    ]
+    for proc in procs:
+        # 跳过加载过程中的日志，读到就绪信息为止
+        while not proc.stdout.readline().startswith(b"{"):
+            if proc.poll() is not None:
+                raise RuntimeError("worker 启动失败")
+    elapsed = time.perf_counter() - start
+    memory = [memory_of(proc.pid) for proc in procs]
+    for proc in procs:
+        proc.stdin.close()
+        proc.wait()
+    return elapsed, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "data.json")
+        snapshot_file = os.path.join(tmp, "foods.snapshot")
+        with open(data_file, "w", encoding="utf-8") as f:
+            json.dump(generate_catalog(args.size), f, ensure_ascii=False)
+
+        base_env = {**os.environ, "CALORIE_DATA_FILE": data_file, "CALORIE_SNAPSHOT_FILE": ""}
+        snapshot_env = {**base_env, "CALORIE_SNAPSHOT_FILE": snapshot_file}
+
+        print(f"📦 {args.size} 条数据，data.json {os.path.getsize(data_file) / 2**20:.1f}MB")
+        # 不加载任何数据的 worker（解释器和依赖本身的内存），作为参照
+        _, idle = run_workers(1, {**base_env, "CALORIE_DATA_FILE": os.path.join(tmp, "missing.json")})
+        print(f"空载 worker: RSS {idle[0]['Rss'] / 2**20:.0f}MB, PSS {idle[0]['Pss'] / 2**20:.0f}MB")
+        print(f"{'模式':<14}{'worker':>7}{'启动(s)':>9}{'单个RSS':>11}{'单个PSS':>11}{'PSS合计':>11}")
+        for count in args.workers:
+            scenarios: List = [("各自解析JSON", base_env, False), ("快照(需编译)", snapshot_env, True),
+                               ("快照(已存在)", snapshot_env, False)]
+            for label, env, fresh in scenarios:
+                if fresh and os.path.exists(snapshot_file):
+                    os.remove(snapshot_file)
+                elapsed, memory = run_workers(count, env)
+                rss = sum(m["Rss"] for m in memory) / count
+                pss = sum(m["Pss"] for m in memory)
+                print(f"{label:<14}{count:>7}{elapsed:>9.2f}{rss / 2**20:>9.0f}MB"
+                      f"{pss / count / 2**20:>9.0f}MB{pss / 2**20:>9.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
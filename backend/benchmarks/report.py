@@ -0,0 +1,94 @@
+"""基准测试结果的统计和 JSON 报告，便于在不同提交之间比较"""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """已排序数据的百分位数（最近秩法）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * percent / 100))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(samples: List[float], scale: float = 1000) -> Dict[str, float]:
+    """一组耗时（秒）的均值、p50/p95/p99 和最大值，默认换算为毫秒"""
+    samples = sorted(samples)
+    if not samples:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "mean": round(sum(samples) / len(samples) * scale, 4),
+        "p50": round(percentile(samples, 50) * scale, 4),
+        "p95": round(percentile(samples, 95) * scale, 4),
+        "p99": round(percentile(samples, 99) * scale, 4),
+        "max": round(samples[-1] * scale, 4),
+    }
+
+
+def git_commit() -> Optional[str]:
+    """当前提交的哈希，不在 git 仓库中时返回 None"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def environment() -> Dict[str, Any]:
+    """运行环境信息，写入报告便于判断结果是否可比"""
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_report(benchmark: str, params: Dict[str, Any], results: List[Dict[str, Any]],
+                 output: Optional[str]) -> Dict[str, Any]:
+    """生成报告；output 为文件路径时写入文件，为 "-" 时输出到标准输出"""
+    report = {"benchmark": benchmark, "environment": environment(), "params": params, "results": results}
+    if output == "-":
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    elif output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已写入 {output}")
+    return report
+
+
+def compare(baseline_path: str, results: List[Dict[str, Any]], key_fields: Sequence[str], metric: str,
+            higher_is_better: bool = True, threshold: float = 0.1):
+    """与基线报告逐项比较 metric，变化超过 threshold（比例）的项目标记为回退或提升"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {tuple(item.get(k) for k in key_fields): item
+                    for item in json.load(f)["results"]}
+
+    print(f"\n📊 与基线 {baseline_path} 比较（{metric}）")
+    regressions = 0
+    for item in results:
+        key = tuple(item.get(k) for k in key_fields)
+        before = baseline.get(key)
+        if before is None or not before.get(metric):
+            continue
+        change = item[metric] / before[metric] - 1
+        better = change > 0 if higher_is_better else change < 0
+        mark = ""
+        if abs(change) > threshold:
+            mark = "✅ 提升" if better else "❌ 回退"
+            regressions += not better
+        label = " ".join(str(part) for part in key if part is not None)
+        print(f"{label:<56}{before[metric]:>12.2f}{item[metric]:>12.2f}{change:>+9.1%}  {mark}")
+    if regressions:
+        print(f"⚠️ {regressions} 项回退超过 {threshold:.0%}")
@@ -0,0 +1,196 @@
+"""本地 MediaWiki API 桩服务，用录制好的页面代替真实维基百科
+
+支持 wikipedia 库用到的 list=search 以及 prop=info/pageprops/extracts/revisions
+查询（可以一次查询多个标题，或以 generator=search 的搜索结果作为页面），
+并支持 ETag 条件请求，可以模拟网络延迟和随机故障，用于离线验证和
+压测爬虫。
+
+与真实的 TextExtracts 扩展一样，全文正文（没有 exintro）每次请求只返回一个
+页面的，其余页面通过 continue 中的 excontinue 翻页取得；只取摘要（exintro）
+时一次可以返回多个页面。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.stub_wiki --port 8765 --latency 0.05
+    然后 WikipediaFoodScraper(api_url="http://127.0.0.1:8765/w/api.php")
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, quote, urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "wiki_pages.json")
+
+
+def load_fixture_pages(path: str = FIXTURES) -> List[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class StubWiki:
+    """在后台线程中运行的 MediaWiki API 桩服务"""
+
+    def __init__(self, pages: Optional[List[Dict[str, Any]]] = None, latency: float = 0.0,
+                 fail_rate: float = 0.0, port: int = 0):
+        pages = load_fixture_pages() if pages is None else pages
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        for pageid, page in enumerate(pages, 1):
+            self.pages[page["title"]] = {"pageid": pageid, "revid": page.get("revid", 1000 + pageid), **page}
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.request_count = 0
+        self.not_modified_count = 0
+        self._count_lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.base_url}/w/api.php"
+
+    def start(self) -> "StubWiki":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubWiki":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---- MediaWiki API 行为 ----
+
+    def search(self, query: str, limit: int) -> List[str]:
+        """按标题/正文命中的关键词数量打分，标题完全一致的排在最前"""
+        terms = query.split()
+        scored = []
+        for title, page in self.pages.items():
+            if title == query:
+                score = 100
+            else:
+                score = sum(3 for term in terms if term in title)
+                score += sum(1 for term in terms if term in page["content"])
+            if score:
+                scored.append((-score, page["pageid"], title))
+        scored.sort()
+        return [title for _, _, title in scored[:limit]]
+
+    def page_entry(self, title: str, params: Dict[str, str], extract: bool = True) -> Dict[str, Any]:
+        page = self.pages.get(title)
+        if page is None:
+            return {"ns": 0, "title": title, "missing": ""}
+        entry: Dict[str, Any] = {"pageid": page["pageid"], "ns": 0, "title": title}
+        props = params.get("prop", "").split("|")
+        if "info" in props:
+            entry["fullurl"] = f"{self.base_url}/wiki/{quote(title)}"
+            entry["lastrevid"] = page["revid"]
+        if "extracts" in props and extract:
+            entry["extract"] = page["summary"] if "exintro" in params else page["content"]
+        if "revisions" in props:
+            entry["revisions"] = [{"revid": page["revid"], "parentid": page["revid"] - 1}]
+        return entry
+
+    def handle(self, params: Dict[str, str]) -> Dict[str, Any]:
+        if params.get("list") == "search":
+            titles = self.search(params.get("srsearch", ""), int(params.get("srlimit", 10)))
+            query: Dict[str, Any] = {"search": [{"title": title} for title in titles]}
+            if params.get("srinfo") == "suggestion":
+                query["searchinfo"] = {}
+            return {"query": query}
+        if params.get("generator") == "search":
+            titles = self.search(params.get("gsrsearch", ""), int(params.get("gsrlimit", 10)))
+            if not titles:
+                # 与真实 API 一样，没有搜索结果时不返回 query
+                return {"batchcomplete": ""}
+            result = self.query_pages(titles, params, "gsroffset||")
+            for index, title in enumerate(titles, 1):
+                if title in self.pages:
+                    result["query"]["pages"][str(self.pages[title]["pageid"])]["index"] = index
+            return result
+        if "titles" in params:
+            return self.query_pages(params["titles"].split("|"), params, "||")
+        return {"error": {"code": "badparams", "info": "unsupported request"}}
+
+    def query_pages(self, titles: List[str], params: Dict[str, str], continue_token: str) -> Dict[str, Any]:
+        """一组页面的 prop 查询；全文正文按页面 ID 顺序每次只返回 excontinue 处的一个"""
+        full_extracts = "extracts" in params.get("prop", "").split("|") and "exintro" not in params
+        found = sorted({self.pages[title]["pageid"] for title in titles if title in self.pages})
+        offset = int(params.get("excontinue", 0))
+        pages = {}
+        for missing_id, title in enumerate(titles, 1):
+            page = self.pages.get(title)
+            extract = not full_extracts or (page is not None and found.index(page["pageid"]) == offset)
+            entry = self.page_entry(title, params, extract)
+            pages[str(entry.get("pageid", -missing_id))] = entry
+        result: Dict[str, Any] = {"query": {"pages": pages}}
+        if full_extracts and len(found) > 1:
+            result["warnings"] = {"extracts": {"*": '"exlimit" was too large for a whole article extracts request, lowered to 1.'}}
+        if full_extracts and offset + 1 < len(found):
+            result["continue"] = {"excontinue": offset + 1, "continue": continue_token}
+        else:
+            result["batchcomplete"] = ""
+        return result
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub._count_lock:
+                    stub.request_count += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub.fail_rate and random.random() < stub.fail_rate:
+                    self.send_response(503)
+                    self.send_header("Content-Type", "text/html")
+                    self.end_headers()
+                    self.wfile.write(b"<html>Service Unavailable</html>")
+                    return
+                query = parse_qs(urlsplit(self.path).query, keep_blank_values=True)
+                params = {key: values[-1] for key, values in query.items()}
+                body = json.dumps(stub.handle(params), ensure_ascii=False).encode("utf-8")
+                # 与真实站点一样支持 ETag 条件请求
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    stub.not_modified_count += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的模拟延迟（秒）")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="随机返回 503 的比例")
+    args = parser.parse_args()
+    stub = StubWiki(latency=args.latency, fail_rate=args.fail_rate, port=args.port)
+    print(f"🧪 MediaWiki 桩服务已启动: {stub.api_url}")
+    stub._server.serve_forever()
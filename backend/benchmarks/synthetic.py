@@ -0,0 +1,97 @@
+"""生成与 data.json 结构一致的合成食物数据，用于基准测试"""
+import json
+import random
+import sys
+from typing import Any, Dict, List
+
+# 常见食物主体及其类别、参考热量
+BASE_FOODS = [
+    ("鸡腿", "meat", 260), ("鸡翅", "meat", 240), ("牛排", "meat", 420),
+    ("排骨", "meat", 380), ("香肠", "meat", 310), ("牛肉面", "staples", 520),
+    ("米饭", "staples", 170), ("炒饭", "staples", 480), ("汉堡", "staples", 560),
+    ("三明治", "staples", 350), ("担担面", "staples", 460), ("饺子", "staples", 300),
+    ("奶茶", "drinks", 360), ("可乐", "drinks", 140), ("咖啡", "drinks", 90),
+    ("果汁", "drinks", 120), ("豆浆", "drinks", 80), ("苹果", "fruits", 80),
+    ("香蕉", "fruits", 105), ("西瓜", "fruits", 60), ("草莓", "fruits", 40),
+    ("菠菜", "vegetables", 25), ("西兰花", "vegetables", 35), ("土豆", "vegetables", 115),
+    ("薯片", "snacks", 540), ("饼干", "snacks", 450), ("爆米花", "snacks", 380),
+    ("牛奶", "dairy", 150), ("酸奶", "dairy", 120), ("奶酪", "dairy", 400),
+    ("蛋糕", "desserts", 430), ("布丁", "desserts", 210), ("甜甜圈", "desserts", 450),
+]
+
+PREFIXES = [
+    "", "", "香辣", "黑椒", "红烧", "麻辣", "奶油", "巧克力", "低脂", "全麦",
+    "日式", "韩式", "川味", "广式", "芝士", "抹茶", "草莓", "蜂蜜", "烤", "炸",
+    "MC", "KFC", "经典", "超大",
+]
+
+SUFFIXES = ["", "", "", "套餐", "大份", "小份", "Big", "Plus", "（冷）", "（热）", "组合"]
+
+CATEGORY_INFO = {
+    "staples": ("🍚", "主食类食品"),
+    "drinks": ("🥤", "饮料类食品"),
+    "fruits": ("🍎", "水果类食品"),
+    "vegetables": ("🥬", "蔬菜类食品"),
+    "meat": ("🥩", "肉类食品"),
+    "snacks": ("🍿", "零食类食品"),
+    "dairy": ("🥛", "乳制品食品"),
+    "desserts": ("🍰", "甜品类食品"),
+    "other": ("🍽️", "其他类食品"),
+}
+
+PORTIONS = ["100g", "100g", "250ml", "330ml", "1份", "1个", "150g"]
+
+
+def calorie_level(calories: int) -> int:
+    """与 scraper.calculate_calorie_level 相同的热量分级"""
+    if calories <= 100:
+        return 1
+    elif calories <= 200:
+        return 2
+    elif calories <= 300:
+        return 3
+    elif calories <= 450:
+        return 4
+    return 5
+
+
+def generate_catalog(size: int, seed: int = 42, unique_descriptions: bool = False) -> List[Dict[str, Any]]:
+    """生成 size 条合成食物记录
+
+    unique_descriptions 为 True 时每条记录的描述各不相同，与爬虫发布的目录一致
+    （scraper.to_food_item 以页面摘要作为描述）；否则按类别取固定描述。
+    """
+    rng = random.Random(seed)
+    foods = []
+    for i in range(1, size + 1):
+        base, category, calories = rng.choice(BASE_FOODS)
+        if rng.random() < 0.05:
+            category = "other"
+        name = f"{rng.choice(PREFIXES)}{base}{rng.choice(SUFFIXES)}"
+        if rng.random() < 0.3:
+            # 追加编号，让名称更分散，接近真实大表的基数
+            name += str(rng.randint(1, 999))
+        calories = max(1, int(calories * rng.uniform(0.6, 1.4)))
+        emoji, description = CATEGORY_INFO[category]
+        portion = rng.choice(PORTIONS)
+        if unique_descriptions:
+            description = f"{name}（编号 {i}）是一种{description}，每{portion}约含 {calories} 千卡热量。"
+        foods.append({
+            "id": str(i),
+            "name": name,
+            "category": category,
+            "calories": calories,
+            "calorie_level": calorie_level(calories),
+            "portion": portion,
+            "emoji": emoji,
+            "description": description,
+            "source": "",
+            "summary": "",
+        })
+    return foods
+
+
+if __name__ == "__main__":
+    # 用法: python -m benchmarks.synthetic 100000 > data.json
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    json.dump(generate_catalog(count), sys.stdout, ensure_ascii=False, indent=2)
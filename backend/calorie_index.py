@@ -0,0 +1,94 @@
+"""按热量排序的索引：热量区间查询和按热量排序"""
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import abc
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+# (类别, 热量等级)，None 表示不限
+BucketKey = Tuple[Optional[str], Optional[int]]
+
+
+class CalorieRange(abc.Sequence):
+    """某个分组中热量在给定区间内的行号，按 (热量, 行号) 升序或降序排列
+
+    只记录在排序数组中的起止位置，取值和切片时才读取数组。
+    """
+
+    __slots__ = ("_rows", "_calories", "_lo", "_hi", "_descending")
+
+    def __init__(self, rows: Sequence[int], calories: Sequence[int], lo: int, hi: int, descending: bool):
+        self._rows = rows
+        self._calories = calories
+        self._lo = lo
+        self._hi = hi
+        self._descending = descending
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("只支持连续切片")
+            stop = max(start, stop)
+            if self._descending:
+                return self._rows[self._hi - stop:self._hi - start][::-1]
+            return self._rows[self._lo + start:self._lo + stop]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._rows[self._hi - 1 - index] if self._descending else self._rows[self._lo + index]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self[0:len(self)])
+
+    def position_after(self, calories: int, row: int) -> int:
+        """排序键为 (calories, row) 的记录之后的位置（该记录不必在本区间内）"""
+        # 先按热量定位相同热量的一段，段内行号升序，再按行号二分
+        same_lo = bisect_left(self._calories, calories, self._lo, self._hi)
+        same_hi = bisect_right(self._calories, calories, same_lo, self._hi)
+        if self._descending:
+            return self._hi - bisect_left(self._rows, row, same_lo, same_hi)
+        return bisect_right(self._rows, row, same_lo, same_hi) - self._lo
+
+
+class CalorieIndex:
+    """每个 (类别, 热量等级) 分组各有一份按 (热量, 行号) 升序排列的行号数组
+    和对应的热量数组，区间查询只需两次二分查找
+
+    类别或等级为 None 的分组表示不限，因此任意组合的筛选都直接对应一个分组。
+    """
+
+    def __init__(self, buckets: Dict[BucketKey, Tuple[Sequence[int], Sequence[int]]]):
+        self._buckets = buckets
+
+    @classmethod
+    def build(cls, calories: Sequence[int], categories: Sequence[str], levels: Sequence[int]) -> "CalorieIndex":
+        # 稳定排序，热量相同的行保持行号升序
+        order = sorted(range(len(calories)), key=calories.__getitem__)
+        buckets: Dict[BucketKey, Tuple[array, array]] = {}
+        for row in order:
+            value = calories[row]
+            category, level = categories[row], levels[row]
+            for key in ((None, None), (category, None), (None, level), (category, level)):
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = (array('I'), array('i'))
+                bucket[0].append(row)
+                bucket[1].append(value)
+        return cls(buckets)
+
+    def buckets(self) -> Dict[BucketKey, Tuple[Sequence[int], Sequence[int]]]:
+        """全部分组，用于写入快照文件"""
+        return self._buckets
+
+    def query(self, category: Optional[str] = None, level: Optional[int] = None,
+              min_calories: Optional[int] = None, max_calories: Optional[int] = None,
+              descending: bool = False) -> CalorieRange:
+        """热量在 [min_calories, max_calories] 内的行号，按热量排序"""
+        rows, calories = self._buckets.get((category, level), ((), ()))
+        lo = 0 if min_calories is None else bisect_left(calories, min_calories)
+        hi = len(calories) if max_calories is None else bisect_right(calories, max_calories)
+        return CalorieRange(rows, calories, lo, max(lo, hi), descending)
@@ -0,0 +1,209 @@
+"""可断点续传的批量抓取任务，完成后原子发布 data.json
+
+每个食物抓取完成后立即把结果追加到 JSONL 日志（每行一个食物）。任务中断
+（崩溃、被限流封禁、超时）后重新运行同样的命令，会从日志恢复已完成的食物，
+只抓取剩下的和上次出错的。全部完成后把结果转换为 data.json 的格式，校验
+通过后先写入临时文件再重命名替换，API 不会读到写了一半的文件；配置了
+CALORIE_WATCH_INTERVAL 的服务会自动加载，也可以用 --reload-url 通知服务重新加载。
+
+用法（在 backend 目录下）:
+    python crawl_job.py foods.txt --journal crawl_job.jsonl --output data.json
+    python crawl_job.py foods.txt --reload-url http://127.0.0.1:8000/api/admin/reload
+"""
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from crawl_pipeline import CrawlPipeline
+from models import FoodItem
+from scrape_cache import ScrapeCache
+from scraper import WikipediaFoodScraper, to_food_item
+
+# 日志中每个食物的状态；出错的食物在下次运行时重新抓取
+FOUND = "found"
+NOT_FOUND = "not_found"
+ERROR = "error"
+
+
+def read_journal(path: str) -> Tuple[Dict[str, Dict[str, Any]], int, int]:
+    """读取日志，返回 (食物名 -> 最后一条记录, 完整行的总字节数, 文件大小)"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}, 0, 0
+    outcomes: Dict[str, Dict[str, Any]] = {}
+    # 崩溃时可能只写了半行，忽略最后一个换行符之后的内容
+    end = data.rfind(b"\n") + 1
+    for number, line in enumerate(data[:end].splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            print(f"⚠️ 日志第 {number} 行无法解析，已跳过")
+            continue
+        outcomes[entry['name']] = entry
+    return outcomes, end, len(data)
+
+
+class CrawlJournal:
+    """追加写入的 JSONL 日志，同一食物以最后一行为准"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.outcomes, end, size = read_journal(path)
+        if end < size:
+            # 截掉写了一半的最后一行，新记录从完整的行之后开始
+            with open(path, 'r+b') as f:
+                f.truncate(end)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def append(self, name: str, status: str, result: Optional[Dict[str, Any]]):
+        entry = {"name": name, "status": status, "result": result, "at": round(time.time(), 3)}
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        # 每行写完立即交给操作系统，进程崩溃也不会丢失
+        self._file.flush()
+        self.outcomes[name] = entry
+
+    def close(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+
+def write_json_atomic(path: str, data: Any):
+    """先写同目录下的临时文件并落盘，再重命名替换目标文件"""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CrawlJob:
+    """foods 的抓取任务；processes / fetch_workers 与 CrawlPipeline 相同"""
+
+    def __init__(self, scraper: WikipediaFoodScraper, foods: Sequence[str], journal_path: str,
+                 processes: Optional[int] = 0, fetch_workers: int = 4):
+        self.scraper = scraper
+        self.foods = list(dict.fromkeys(foods))
+        self.journal_path = journal_path
+        self.processes = processes
+        self.fetch_workers = fetch_workers
+
+    def _outcomes(self) -> Dict[str, Dict[str, Any]]:
+        return read_journal(self.journal_path)[0]
+
+    def pending(self, outcomes: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
+        """还没有最终结果（未抓取或上次出错）的食物"""
+        outcomes = self._outcomes() if outcomes is None else outcomes
+        return [food for food in self.foods
+                if food not in outcomes or outcomes[food]['status'] == ERROR]
+
+    def run(self) -> Dict[str, int]:
+        """抓取所有未完成的食物，每完成一个就写入日志，返回各状态的食物数"""
+        journal = CrawlJournal(self.journal_path)
+        pending = self.pending(journal.outcomes)
+        if len(pending) < len(self.foods):
+            print(f"📒 从日志恢复 {len(self.foods) - len(pending)} 个已完成的食物，剩余 {len(pending)} 个")
+        pipeline = CrawlPipeline(self.scraper, fetch_workers=self.fetch_workers, processes=self.processes)
+
+        def record(food: str, result: Optional[Dict]):
+            status = FOUND if result else ERROR if food in pipeline.failed else NOT_FOUND
+            journal.append(food, status, result)
+            mark = {FOUND: "✅", NOT_FOUND: "❌", ERROR: "⚠️"}[status]
+            print(f"{mark} {food}" + (f": {result['calories']}卡/{result['portion']}" if result else ""))
+
+        try:
+            if pending:
+                pipeline.run(pending, record)
+        finally:
+            journal.close()
+        return self.summary(journal.outcomes)
+
+    def summary(self, outcomes: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, int]:
+        outcomes = self._outcomes() if outcomes is None else outcomes
+        counts = {FOUND: 0, NOT_FOUND: 0, ERROR: 0, "pending": 0}
+        for food in self.foods:
+            counts[outcomes[food]['status'] if food in outcomes else "pending"] += 1
+        return counts
+
+    def publish(self, output_path: str, allow_errors: bool = False) -> int:
+        """把日志中找到的数据按食物清单顺序原子写入 output_path，返回写入的条数
+
+        还有出错或未抓取的食物时抛出 RuntimeError（allow_errors 为 True 时照常发布）。
+        """
+        outcomes = self._outcomes()
+        counts = self.summary(outcomes)
+        if (counts[ERROR] or counts["pending"]) and not allow_errors:
+            raise RuntimeError(f"还有 {counts[ERROR]} 个食物出错、{counts['pending']} 个未抓取，请重新运行任务")
+        crawled = [outcomes[food]['result'] for food in self.foods
+                   if food in outcomes and outcomes[food]['status'] == FOUND]
+        records = [to_food_item(i, food) for i, food in enumerate(crawled, 1)]
+        # 与服务加载时相同的校验，避免发布服务无法加载的文件
+        for record in records:
+            FoodItem(**record)
+        write_json_atomic(output_path, records)
+        return len(records)
+
+
+def notify_reload(url: str, token: Optional[str]):
+    """调用服务的 /api/admin/reload 接口加载新发布的数据"""
+    headers = {'X-Admin-Token': token} if token else {}
+    response = requests.post(url, headers=headers, timeout=120)
+    response.raise_for_status()
+    body = response.json()
+    print(f"🔄 服务已重新加载 {body['total_foods']} 条食物数据 (版本 {body['version']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="可断点续传的批量抓取任务")
+    parser.add_argument("food_list", help="食物清单文件，每行一个名称")
+    parser.add_argument("--journal", default="crawl_job.jsonl", help="任务日志，重新运行时从这里恢复")
+    parser.add_argument("--output", default="data.json", help="全部完成后发布的数据文件")
+    parser.add_argument("--cache", default="scrape_cache.sqlite3", help="搜索结果和页面缓存，空字符串表示不用缓存")
+    parser.add_argument("--processes", type=int, default=None, help="分析进程数，默认 CPU 核数，0 表示不用进程池")
+    parser.add_argument("--workers", type=int, default=4, help="抓取线程数")
+    parser.add_argument("--allow-errors", action="store_true", help="有食物出错时也发布")
+    parser.add_argument("--reload-url", help="发布后调用的重新加载接口，如 http://127.0.0.1:8000/api/admin/reload")
+    parser.add_argument("--admin-token", default=os.environ.get("CALORIE_ADMIN_TOKEN"), help="重新加载接口的管理令牌")
+    args = parser.parse_args()
+
+    with open(args.food_list, encoding="utf-8") as f:
+        foods = [line.strip() for line in f if line.strip()]
+
+    cache = ScrapeCache(args.cache) if args.cache else None
+    scraper = WikipediaFoodScraper(cache=cache)
+    job = CrawlJob(scraper, foods, args.journal, processes=args.processes, fetch_workers=args.workers)
+    start = time.perf_counter()
+    try:
+        counts = job.run()
+    finally:
+        if cache:
+            cache.close()
+    print(f"📊 耗时 {time.perf_counter() - start:.1f}s：找到 {counts[FOUND]}，未找到 {counts[NOT_FOUND]}，"
+          f"出错 {counts[ERROR]}")
+
+    try:
+        written = job.publish(args.output, allow_errors=args.allow_errors)
+    except RuntimeError as e:
+        print(f"⏸️ 暂不发布: {e}")
+        raise SystemExit(1)
+    print(f"💾 已发布 {written} 条食物数据到 {args.output}")
+    if args.reload_url:
+        notify_reload(args.reload_url, args.admin_token)
+
+
+if __name__ == "__main__":
+    main()
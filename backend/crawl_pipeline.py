@@ -0,0 +1,233 @@
+"""批量抓取流水线：网络 I/O 与页面分析分开执行
+
+- 抓取线程（I/O）：搜索并批量加载候选页面、处理歧义页、获取摘要
+- 分析进程池（CPU）：相关性过滤、热量提取和分量换算
+- 每个食物完成后立即把结果交给输出 sink，按完成顺序
+
+抓取线程取到的候选页面最多积压 queue_size 批等待分析，分析跟不上时抓取线程
+阻塞，内存占用不随食物数量增长。一个搜索词的候选页面都没有热量数据时，再把
+下一个搜索词交给抓取线程，因此每个食物的搜索顺序和结果与 get_food_calories
+相同。页面按搜索结果整批加载，适合搭配批量加载的 api 抓取后端。
+
+用法:
+    scraper = WikipediaFoodScraper(cache=ScrapeCache("cache.sqlite3"))
+    with open("crawled.jsonl", "w", encoding="utf-8") as f:
+        CrawlPipeline(scraper, processes=4).run(foods, JsonLinesSink(f))
+"""
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, TextIO, Tuple
+
+from scraper import WikiPage, WikipediaFoodScraper
+
+# 发给分析进程的候选页面：(标题, 正文, 是否做相关性过滤)
+# 歧义页选出的页面不做过滤，与 get_food_calories 一致
+Candidate = Tuple[str, str, bool]
+
+# 接收每个食物的结果（未找到时为 None）；只在调用 run 的线程中调用
+Sink = Callable[[str, Optional[Dict]], None]
+
+# 分析进程中用于过滤和提取的爬虫实例（不会发出请求）
+_analyzer: Optional[WikipediaFoodScraper] = None
+
+
+def _init_analyzer(standard_portions: Dict[str, Any]):
+    global _analyzer
+    _analyzer = WikipediaFoodScraper(requests_per_second=0, host_interval=0)
+    _analyzer.standard_portions = standard_portions
+
+
+def analyze_candidates(food_name: str, candidates: List[Candidate],
+                       analyzer: Optional[WikipediaFoodScraper] = None) -> Optional[Tuple[int, Dict]]:
+    """按搜索结果顺序分析候选页面，返回第一个提取到热量的 (候选序号, 热量信息)"""
+    analyzer = analyzer or _analyzer
+    for index, (title, content, check) in enumerate(candidates):
+        if check and (analyzer._is_irrelevant_page(title, food_name)
+                      or not analyzer._is_food_related_page(content, food_name)):
+            continue
+        calories_info = analyzer._extract_calories_from_content(content, food_name)
+        if calories_info:
+            return index, calories_info
+    return None
+
+
+class JsonLinesSink:
+    """把每个找到数据的食物写成一行 JSON，写完立即 flush"""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.written = 0
+
+    def __call__(self, food: str, result: Optional[Dict]):
+        if result:
+            self.f.write(json.dumps(result, ensure_ascii=False) + "\n")
+            self.f.flush()
+            self.written += 1
+
+
+class CrawlPipeline:
+    """fetch_workers 为抓取线程数；processes 为分析进程数（None 为 CPU 核数，0 表示在调用线程中分析）"""
+
+    def __init__(self, scraper: WikipediaFoodScraper, fetch_workers: int = 4,
+                 processes: Optional[int] = None, queue_size: Optional[int] = None):
+        self.scraper = scraper
+        self.fetch_workers = max(1, fetch_workers)
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        # 默认让每个分析进程手头都有下一批，同时不让抓取领先太多
+        self.queue_size = queue_size or 2 * max(1, self.processes)
+        self.stats: Dict[str, int] = {}
+        # 因网络或分析出错而没有试完全部搜索词的食物（sink 收到 None，但不代表确实没有数据）
+        self.failed: Set[str] = set()
+
+    def run(self, foods: Sequence[str], sink: Sink) -> Dict[str, int]:
+        """抓取全部食物，每完成一个就调用 sink(食物名, 结果或 None)，返回统计"""
+        self.stats = {"foods": len(foods), "found": 0, "searches": 0, "pages": 0, "errors": 0}
+        self.failed = set()
+        errored: Set[int] = set()
+        terms = [self.scraper._get_optimized_search_terms(food) for food in foods]
+        # 抓取任务：(优先级, 序号, 任务)。换搜索词和取摘要优先于开始新的食物，
+        # 已开始的食物尽快完成，结果才能及时输出
+        tasks: "queue.PriorityQueue[Tuple[int, int, Optional[Tuple]]]" = queue.PriorityQueue()
+        sequence = itertools.count()
+        events: "queue.Queue[Tuple]" = queue.Queue()
+        slots = threading.BoundedSemaphore(self.queue_size)
+
+        threads = [
+            threading.Thread(target=self._fetch_loop, args=(foods, terms, tasks, events, slots),
+                             name=f"crawl-fetch-{i}", daemon=True)
+            for i in range(self.fetch_workers)
+        ]
+        pool = None
+        if self.processes > 0:
+            # 抓取线程已在运行，fork 出的子进程可能继承被这些线程持有的锁，因此用 spawn
+            pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_analyzer, initargs=(self.scraper.standard_portions,))
+        for thread in threads:
+            thread.start()
+        for index in range(len(foods)):
+            tasks.put((1, next(sequence), ("search", index, 0)))
+
+        def next_term(index: int, term: int) -> bool:
+            """换下一个搜索词，全部搜索词都试过时返回 False"""
+            if term + 1 < len(terms[index]):
+                tasks.put((0, next(sequence), ("search", index, term + 1)))
+                return True
+            return False
+
+        remaining = len(foods)
+        try:
+            while remaining:
+                kind, index, term, *payload = events.get()
+                food = foods[index]
+                if kind == "pages":
+                    candidates: List[Tuple[WikiPage, bool]] = payload[0]
+                    self.stats["searches"] += 1
+                    self.stats["pages"] += len(candidates)
+                    batch = [(page.title, page.content, check) for page, check in candidates]
+                    if pool is None:
+                        outcome: Future = Future()
+                        try:
+                            outcome.set_result(analyze_candidates(food, batch, self.scraper))
+                        except Exception as e:
+                            outcome.set_exception(e)
+                        events.put(("analyzed", index, term, candidates, outcome))
+                    else:
+                        outcome = pool.submit(analyze_candidates, food, batch)
+                        outcome.add_done_callback(
+                            lambda f, index=index, term=term, candidates=candidates:
+                            events.put(("analyzed", index, term, candidates, f)))
+                    continue
+
+                if kind == "analyzed":
+                    slots.release()
+                    candidates, outcome = payload
+                    try:
+                        found = outcome.result()
+                    except Exception as e:
+                        print(f"   分析错误 '{terms[index][term]}': {e}")
+                        self.stats["errors"] += 1
+                        errored.add(index)
+                        found = None
+                    if found:
+                        position, calories_info = found
+                        tasks.put((0, next(sequence), ("summary", index, term, candidates[position][0], calories_info)))
+                        continue
+                    if next_term(index, term):
+                        continue
+                    result = None
+                elif kind == "failed":
+                    self.stats["errors"] += 1
+                    errored.add(index)
+                    if next_term(index, term):
+                        continue
+                    result = None
+                else:  # done
+                    result = payload[0]
+                    self.stats["found"] += 1
+
+                remaining -= 1
+                if result is None and index in errored:
+                    self.failed.add(food)
+                sink(food, result)
+        finally:
+            # 出错提前结束时，抓取线程不再处理剩余任务
+            for _ in threads:
+                tasks.put((-1, next(sequence), None))
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        return self.stats
+
+    def _fetch_loop(self, foods: Sequence[str], terms: List[List[str]], tasks: "queue.Queue",
+                    events: "queue.Queue", slots: threading.BoundedSemaphore):
+        while True:
+            _, _, task = tasks.get()
+            if task is None:
+                return
+            kind, index, term, *payload = task
+            food = foods[index]
+            if kind == "search":
+                try:
+                    candidates = self._candidates(food, terms[index][term])
+                except Exception as e:
+                    print(f"   搜索错误 '{terms[index][term]}': {e}")
+                    events.put(("failed", index, term))
+                    continue
+                # 等待分析的批数达到上限时在这里阻塞
+                slots.acquire()
+                events.put(("pages", index, term, candidates))
+            else:
+                page, calories_info = payload
+                try:
+                    result = self.scraper._food_result(food, page, calories_info)
+                except Exception as e:
+                    print(f"   页面访问错误: {e}")
+                    events.put(("failed", index, term))
+                    continue
+                events.put(("done", index, term, result))
+
+    def _candidates(self, food: str, search_term: str) -> List[Tuple[WikiPage, bool]]:
+        """搜索并加载全部结果页面；歧义页换成最佳选项，不存在的页面跳过"""
+        scraper = self.scraper
+        titles, pages = scraper._search_pages(search_term, results=5)
+        if len(pages) < len(titles):
+            # 不支持批量加载的后端只返回了搜索结果
+            pages = scraper._load_pages(titles)
+        candidates = []
+        for title in titles:
+            entry = pages[title]
+            if 'disambiguation' in entry:
+                best_option = scraper._find_best_disambiguation_option(entry['disambiguation'], food)
+                if not best_option:
+                    continue
+                try:
+                    candidates.append((scraper._load_page(best_option), False))
+                except Exception:
+                    continue
+            elif not entry.get('missing'):
+                candidates.append((WikiPage(**entry), True))
+        return candidates
@@ -0,0 +1,181 @@
+"""按维基百科修订号增量刷新抓取结果
+
+每个食物的抓取结果连同来源页面的标题和修订号保存在 SQLite 中。刷新时：
+
+1. 已有结果的食物按来源标题批量查询当前修订号（每 50 个标题一次请求）
+2. 修订号未变化的直接沿用保存的结果
+3. 页面有更新的批量重新加载这些页面并在原页面上重新提取，提取不到时再完整抓取
+4. 之前没有找到数据的和新加入的食物完整抓取（搜索 + 提取）
+
+用法（在 backend 目录下）:
+    python crawl_state.py foods.txt                     # 每行一个食物名称
+    python crawl_state.py foods.txt --state crawl_state.sqlite3 --output crawled_foods.json
+"""
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from scrape_cache import ScrapeCache
+from scraper import WikiPage, WikipediaFoodScraper, calculate_calorie_level
+
+
+class FoodRecord(NamedTuple):
+    name: str
+    # 来源页面的标题和修订号，没有找到数据时为 None
+    title: Optional[str]
+    revision_id: Optional[int]
+    result: Optional[Dict[str, Any]]
+    checked_at: float
+
+
+class CrawlState:
+    """每个食物最近一次的抓取结果（SQLite），可以在多个线程中使用"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS foods (
+                name TEXT PRIMARY KEY,
+                title TEXT,
+                revision_id INTEGER,
+                result TEXT,
+                checked_at REAL NOT NULL
+            );
+        """)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM foods").fetchone()[0]
+
+    def get(self, name: str) -> Optional[FoodRecord]:
+        return self.records([name]).get(name)
+
+    def records(self, names: Sequence[str]) -> Dict[str, FoodRecord]:
+        """批量读取，没有记录的食物不出现在结果中"""
+        found: Dict[str, FoodRecord] = {}
+        names = list(dict.fromkeys(names))
+        with self._lock:
+            # SQLite 单条语句的参数个数有限，分批查询
+            for start in range(0, len(names), 500):
+                chunk = names[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT name, title, revision_id, result, checked_at FROM foods "
+                    f"WHERE name IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for name, title, revision_id, result, checked_at in rows:
+                    found[name] = FoodRecord(name, title, revision_id,
+                                             json.loads(result) if result else None, checked_at)
+        return found
+
+    def put(self, name: str, result: Optional[Dict[str, Any]]):
+        """保存一个食物的抓取结果（None 表示没有找到数据）"""
+        title = result.get('source_title') if result else None
+        revision_id = result.get('source_revision') if result else None
+        data = json.dumps(result, ensure_ascii=False) if result else None
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO foods VALUES (?, ?, ?, ?, ?)",
+                             (name, title, revision_id, data, time.time()))
+            self._db.commit()
+
+    def touch(self, names: Sequence[str]):
+        """这些食物的来源页面确认未变化"""
+        now = time.time()
+        with self._lock:
+            self._db.executemany("UPDATE foods SET checked_at = ? WHERE name = ?", [(now, name) for name in names])
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def refresh(scraper: WikipediaFoodScraper, state: CrawlState, foods: Sequence[str],
+            workers: int = 4) -> Dict[str, int]:
+    """增量刷新 foods 的抓取结果并写入 state，返回各类食物的数量"""
+    foods = list(dict.fromkeys(foods))
+    records = state.records(foods)
+    known = {name: record for name, record in records.items() if record.title and record.revision_id}
+    stats = {"foods": len(foods), "unchanged": 0, "reextracted": 0, "recrawled": 0, "new": 0, "found": 0}
+
+    # 1. 批量核对来源页面的修订号
+    titles = sorted({record.title for record in known.values()})
+    current = scraper.fetcher.revisions(titles) if titles else {}
+    unchanged = {name for name, record in known.items() if current.get(record.title) == record.revision_id}
+    state.touch(sorted(unchanged))
+    stats["unchanged"] = len(unchanged)
+
+    # 2. 页面有更新：重新加载（跳过页面缓存中的旧内容）后在原页面上重新提取
+    changed = {name: record for name, record in known.items() if name not in unchanged}
+    not_extracted: List[str] = []
+    if changed:
+        pages = scraper.fetcher.fetch(sorted({record.title for record in changed.values()}))
+        for name, record in changed.items():
+            entry = pages.get(record.title, {})
+            result = None
+            if 'content' in entry:
+                if scraper.cache:
+                    scraper.cache.put(f"page:{record.title}", entry)
+                page = WikiPage(**entry)
+                calories_info = scraper._extract_calories_from_content(page.content, name)
+                if calories_info:
+                    result = scraper._food_result(name, page, calories_info)
+            if result:
+                state.put(name, result)
+                stats["reextracted"] += 1
+            else:
+                not_extracted.append(name)
+
+    # 3. 在原页面上提取不到的、之前没有找到数据（或没有记录来源修订号）的和新加入的食物，完整抓取
+    failed = [name for name in foods if name in records and name not in known]
+    new = [name for name in foods if name not in records]
+    stats["recrawled"] = len(not_extracted) + len(failed)
+    stats["new"] = len(new)
+    for name, result in scraper.iter_food_data(not_extracted + failed + new, workers=workers):
+        state.put(name, result)
+
+    stats["found"] = sum(1 for record in state.records(foods).values() if record.result)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按维基百科修订号增量刷新食物热量数据")
+    parser.add_argument("food_list", help="食物清单文件，每行一个名称")
+    parser.add_argument("--state", default="crawl_state.sqlite3", help="抓取状态数据库")
+    parser.add_argument("--cache", default="scrape_cache.sqlite3", help="搜索结果和页面缓存，空字符串表示不用缓存")
+    parser.add_argument("--output", default="crawled_foods.json", help="输出全部找到数据的食物（load_crawled_data 的格式）")
+    parser.add_argument("--workers", type=int, default=4, help="完整抓取时的并发数")
+    args = parser.parse_args()
+
+    with open(args.food_list, encoding="utf-8") as f:
+        foods = [line.strip() for line in f if line.strip()]
+
+    cache = ScrapeCache(args.cache) if args.cache else None
+    scraper = WikipediaFoodScraper(cache=cache)
+    state = CrawlState(args.state)
+    start = time.perf_counter()
+    stats = refresh(scraper, state, foods, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    records = state.records(foods)
+    results = [{**records[name].result, 'calorie_level': calculate_calorie_level(records[name].result['calories'])}
+               for name in dict.fromkeys(foods) if records.get(name) and records[name].result]
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    state.close()
+    if cache:
+        cache.close()
+
+    print(f"🔄 刷新完成，耗时 {elapsed:.1f}s：{stats['foods']} 个食物，"
+          f"{stats['unchanged']} 个未变化，{stats['reextracted']} 个重新提取，"
+          f"{stats['recrawled']} 个重新抓取，{stats['new']} 个新增")
+    print(f"💾 {len(results)} 个食物的数据已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""食物数据快照及其只读索引"""
+import hashlib
+import itertools
+import json
+import time
+from array import array
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+from calorie_index import CalorieIndex
+from food_store import ColumnarFoodStore, FoodStoreBuilder
+from models import FoodItem
+from search_index import NgramIndex
+
+# /api/stats 中返回的百分位点
+PERCENTILES = (25, 50, 75, 90, 95, 99)
+
+# 进程内的加载顺序编号
+_generations = itertools.count(1)
+
+
+def file_version(path: str) -> str:
+    """数据文件内容的摘要，用作数据版本（分块读取，不把整个文件读入内存）"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _percentile(sorted_values: Sequence[int], percent: float) -> float:
+    """对已排序的数据按线性插值计算百分位数"""
+    if len(sorted_values) == 1:
+        return float(sorted_values[0])
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def _summarize(calories: List[int]) -> Dict[str, Any]:
+    """计算一组热量值的均值、中位数和极值"""
+    calories.sort()
+    return {
+        "count": len(calories),
+        "average": round(sum(calories) / len(calories), 2),
+        "median": round(_percentile(calories, 50), 2),
+        "max": calories[-1],
+        "min": calories[0],
+    }
+
+
+class FoodDataset:
+    """一次加载得到的只读数据快照
+
+    所有索引和聚合统计在构造时一次性建好，之后不再修改。重新加载数据时会
+    构造新的实例并整体替换全局引用，请求处理期间持有的旧实例始终保持一致。
+    ``version`` 是数据内容的摘要，用于生成 ETag；``generation`` 是进程内的加载
+    顺序编号，越大越新（内容相同的两次加载版本相同，编号不同），用于查询缓存。
+    ``index_build_seconds`` 是构建索引和统计所用的时间（从快照映射时为 0）。
+
+    每条记录在加载时经 ``FoodItem`` 校验一次，写入列式存储 ``foods``，
+    并缓存其 JSON 字节串，列表类接口直接拼接这些片段作为响应体。各索引中
+    保存的是记录的行号。
+    """
+
+    __slots__ = ("foods", "version", "generation", "by_id", "by_name", "by_category",
+                 "search_index", "calorie_index", "category_counts", "stats", "index_build_seconds")
+
+    def __init__(self, foods: Iterable[Dict[str, Any]], version: str = "empty"):
+        self.version = version
+        self.generation = next(_generations)
+
+        by_id: Dict[str, int] = {}
+        by_name: Dict[str, int] = {}
+        by_category: Dict[str, array] = {}
+        calories_by_category: Dict[str, List[int]] = {}
+        level_distribution: Dict[int, int] = {}
+        calories_list: List[int] = []
+
+        # 单次遍历同时完成校验、列式存储、索引和统计所需的数据
+        builder = FoodStoreBuilder()
+        for row, raw in enumerate(foods):
+            # 校验失败会抛出 ValueError（含 pydantic.ValidationError），由调用方决定如何处理
+            if not isinstance(raw, dict):
+                raise ValueError(f"第 {row + 1} 条食物数据不是对象")
+            item = FoodItem(**raw)
+            food = item.model_dump()
+            builder.append(food, item.model_dump_json().encode())
+            # 与原先的线性查找一致，重复 ID 以第一条为准
+            by_id.setdefault(food['id'], row)
+            by_name.setdefault(food['name'], row)
+            by_category.setdefault(food['category'], array('I')).append(row)
+            calories_by_category.setdefault(food['category'], []).append(food['calories'])
+            level = food['calorie_level']
+            level_distribution[level] = level_distribution.get(level, 0) + 1
+            calories_list.append(food['calories'])
+
+        self.foods: ColumnarFoodStore = builder.finish()
+        self.by_id: Mapping[str, int] = MappingProxyType(by_id)
+        # 按名称精确查找，同名时同样以第一条为准
+        self.by_name: Mapping[str, int] = MappingProxyType(by_name)
+        # 各类别的行号按原顺序存放在紧凑数组中，分页即切片
+        self.by_category: Mapping[str, array] = MappingProxyType(by_category)
+        index_start = time.perf_counter()
+        self.search_index = NgramIndex(self.foods.names)
+        self.calorie_index = CalorieIndex.build(self.foods.calories, self.foods.categories,
+                                                self.foods.calorie_levels)
+
+        self.category_counts: Mapping[str, int] = MappingProxyType(
+            {category: len(rows) for category, rows in by_category.items()}
+        )
+        self.stats = self._build_stats(calories_list, level_distribution, calories_by_category)
+        self.index_build_seconds = time.perf_counter() - index_start
+
+    @classmethod
+    def from_json_file(cls, path: str) -> "FoodDataset":
+        """读取并校验 JSON 数据文件（失败时抛出异常）"""
+        with open(path, 'rb') as f:
+            raw = f.read()
+        foods_data = json.loads(raw)
+        if not isinstance(foods_data, list):
+            raise ValueError("数据文件的顶层必须是数组")
+        # 以文件内容摘要作为数据版本，内容不变则 ETag 不变（多进程间也一致）
+        return cls(foods_data, hashlib.sha1(raw).hexdigest()[:16])
+
+    @classmethod
+    def from_parts(cls, foods: ColumnarFoodStore, version: str, by_id: Mapping[str, int],
+                   by_name: Mapping[str, int], by_category: Mapping[str, Sequence[int]],
+                   search_index: NgramIndex, calorie_index: CalorieIndex,
+                   stats: Dict[str, Any]) -> "FoodDataset":
+        """由已经建好的存储、索引和统计直接组装（用于从快照文件加载）"""
+        data = cls.__new__(cls)
+        data.foods = foods
+        data.version = version
+        data.generation = next(_generations)
+        data.by_id = by_id
+        data.by_name = by_name
+        data.by_category = MappingProxyType(dict(by_category))
+        data.search_index = search_index
+        data.calorie_index = calorie_index
+        data.category_counts = MappingProxyType(
+            {category: len(rows) for category, rows in by_category.items()}
+        )
+        data.stats = stats
+        data.index_build_seconds = 0.0
+        return data
+
+    def __len__(self) -> int:
+        return len(self.foods)
+
+    def json_array(self, rows: Iterable[int]) -> bytes:
+        """把指定行的缓存 JSON 片段拼接成一个 JSON 数组"""
+        return self.foods.json_array(rows)
+
+    def json_row(self, row: int) -> bytes:
+        """单条记录的缓存 JSON"""
+        return self.foods.json_row(row)
+
+    def _build_stats(self, calories_list: List[int], level_distribution: Dict[int, int],
+                     calories_by_category: Dict[str, List[int]]) -> Dict[str, Any]:
+        """生成 /api/stats 的响应内容"""
+        if not calories_list:
+            return {"message": "暂无数据"}
+
+        summary = _summarize(calories_list)
+        return {
+            "total_foods": summary["count"],
+            "calories_stats": {
+                "average": summary["average"],
+                "max": summary["max"],
+                "min": summary["min"],
+                "median": summary["median"],
+                "percentiles": {
+                    f"p{percent}": round(_percentile(calories_list, percent), 2)
+                    for percent in PERCENTILES
+                },
+            },
+            "calorie_level_distribution": level_distribution,
+            "category_distribution": dict(self.category_counts),
+            "category_stats": {
+                category: _summarize(calories)
+                for category, calories in calories_by_category.items()
+            },
+        }
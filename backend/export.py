@@ -0,0 +1,50 @@
+"""全量食物数据的流式导出（NDJSON / JSON 数组）"""
+from typing import Iterator, Optional, Sequence
+
+from dataset import FoodDataset
+from pagination import position_after_id
+
+# 每次向客户端写出的记录条数
+EXPORT_CHUNK_ROWS = 1000
+
+
+def export_rows(data: FoodDataset, category: Optional[str] = None) -> Sequence[int]:
+    """要导出的行号（升序），不复制行号数组"""
+    if category is None:
+        return range(len(data))
+    return data.by_category.get(category, range(0))
+
+
+def resume_position(data: FoodDataset, rows: Sequence[int], after: Optional[str]) -> int:
+    """断点续传：返回 ID 为 after 的记录之后的位置，after 不存在时抛出 InvalidCursor"""
+    if after is None:
+        return 0
+    return position_after_id(data, rows, after)
+
+
+def _chunks(rows: Sequence[int], start: int, chunk_rows: int) -> Iterator[Sequence[int]]:
+    # range 切片不占内存，类别行号数组每次只复制一块
+    for i in range(start, len(rows), chunk_rows):
+        yield rows[i:i + chunk_rows]
+
+
+def iter_ndjson(data: FoodDataset, rows: Sequence[int], start: int = 0,
+                chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """逐块生成 NDJSON，每行一条记录"""
+    for chunk in _chunks(rows, start, chunk_rows):
+        yield data.foods.ndjson(chunk)
+
+
+def iter_json_array(data: FoodDataset, rows: Sequence[int], start: int = 0,
+                    chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """逐块生成一个完整的 JSON 数组"""
+    yield b"["
+    previous = None
+    for chunk in _chunks(rows, start, chunk_rows):
+        if previous is not None:
+            yield previous
+        previous = data.foods.json_fragments(chunk)
+    if previous is not None:
+        # 去掉最后一条记录末尾的逗号
+        yield previous[:-1]
+    yield b"]"
@@ -0,0 +1,288 @@
+"""紧凑的列式食物数据存储"""
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+def _offset_typecode(total: int) -> str:
+    """按缓冲区总长度选择偏移量数组的元素宽度"""
+    return 'I' if total < 2 ** 32 else 'Q'
+
+
+# 表示 None 的字节串：0xff 不会出现在 UTF-8 编码中，与任何字符串（包括空串）都不冲突
+NULL = b"\xff"
+
+
+class StringTable:
+    """把一列字符串按 UTF-8 编码连续存放在同一块字节缓冲区中
+
+    第 i 个字符串位于 ``blob[offsets[i]:offsets[i + 1]]``，每行只额外占用
+    一个偏移量，而不是一个完整的 str 对象。None 存为 NULL，取出时还原为 None。
+    """
+
+    __slots__ = ("_blob", "_offsets")
+
+    def __init__(self, blob: bytes, offsets: Sequence[int]):
+        self._blob = blob
+        self._offsets = offsets
+
+    @classmethod
+    def build(cls, values: Iterable[bytes]) -> "StringTable":
+        """由已编码的字节串构建"""
+        builder = _StringTableBuilder()
+        for value in values:
+            builder.append(value)
+        return builder.finish()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        value = self.get_bytes(row)
+        return None if value == NULL else value.decode('utf-8')
+
+    def get_bytes(self, row: int) -> bytes:
+        offsets = self._offsets
+        return bytes(self._blob[offsets[row]:offsets[row + 1]])
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def span(self, start: int, stop: int) -> bytes:
+        """连续若干行拼接后的字节串，只需一次切片"""
+        offsets = self._offsets
+        return bytes(self._blob[offsets[start]:offsets[stop]])
+
+    def concat(self, rows: Iterable[int]) -> bytes:
+        """任意若干行按给定顺序拼接后的字节串"""
+        blob, offsets = self._blob, self._offsets
+        return b"".join([blob[offsets[row]:offsets[row + 1]] for row in rows])
+
+    def lines(self, rows: Iterable[int], trim: int = 0) -> bytes:
+        """若干行各去掉末尾 trim 个字节后，逐行加换行符拼接"""
+        blob, offsets = self._blob, self._offsets
+        parts = [blob[offsets[row]:offsets[row + 1] - trim] for row in rows]
+        parts.append(b"")
+        return b"\n".join(parts)
+
+    def buffers(self):
+        """底层的 (字节缓冲区, 偏移量数组)，用于写入快照文件"""
+        return self._blob, self._offsets
+
+    def nbytes(self) -> int:
+        """数据本身占用的字节数（缓冲区加偏移量数组）"""
+        return len(self._blob) + len(self._offsets) * self._offsets.itemsize
+
+
+class InternedColumn:
+    """低基数的字符串列：取值去重后只存一份，每行保存一个整数编码
+
+    values 可以是 list，也可以是快照中映射的 StringTable（不必为每个取值创建 str 对象）。
+    """
+
+    __slots__ = ("values", "codes", "_code_of")
+
+    def __init__(self, values: Sequence[str], codes: Sequence[int]):
+        self.values = values
+        self.codes = codes
+        # 取值到编码的映射在第一次 code_of 时才建立
+        self._code_of: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def build(cls, column: Iterable[str]) -> "InternedColumn":
+        builder = _InternedColumnBuilder()
+        for value in column:
+            builder.append(value)
+        return builder.finish()
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> str:
+        return self.values[self.codes[row]]
+
+    def code_of(self, value: str) -> Optional[int]:
+        """取值对应的编码，数据中不存在该取值时返回 None"""
+        if self._code_of is None:
+            self._code_of = {value: code for code, value in enumerate(self.values)}
+        return self._code_of.get(value)
+
+    def nbytes(self) -> int:
+        if isinstance(self.values, StringTable):
+            values = self.values.nbytes()
+        else:
+            values = sum(len(v.encode('utf-8')) for v in self.values)
+        return len(self.codes) * self.codes.itemsize + values
+
+
+class _StringTableBuilder:
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self):
+        self.blob = bytearray()
+        self.offsets = array('Q', [0])
+
+    def append(self, value: bytes):
+        self.blob += value
+        self.offsets.append(len(self.blob))
+
+    def finish(self) -> StringTable:
+        typecode = _offset_typecode(len(self.blob))
+        offsets = self.offsets if typecode == 'Q' else array(typecode, self.offsets)
+        return StringTable(bytes(self.blob), offsets)
+
+
+class _InternedColumnBuilder:
+    __slots__ = ("values", "code_of", "codes")
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.code_of: Dict[str, int] = {}
+        self.codes = array('I')
+
+    def append(self, value: str):
+        code = self.code_of.get(value)
+        if code is None:
+            code = self.code_of[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def finish(self) -> InternedColumn:
+        codes = array('H', self.codes) if len(self.values) <= 0xFFFF else self.codes
+        return InternedColumn(self.values, codes)
+
+
+# 以字符串表和去重编码列存储的字段
+# 描述来自页面摘要时每行各不相同，去重编码反而要为每行保留一个 str 对象，因此存为字符串表
+STRING_FIELDS = ("id", "name", "source", "summary", "description")
+INTERNED_FIELDS = ("category", "portion", "emoji")
+
+
+class ColumnarFoodStore:
+    """列式存储的食物数据
+
+    - ``calories`` / ``calorie_levels``：定长整数数组
+    - 类别、份量、emoji：去重编码列
+    - ID、名称、来源、摘要、描述：连续字符串表
+    - ``json``：每条记录预先序列化好的 JSON（每条末尾带一个逗号），用于
+      直接拼接响应体；连续的行对应缓冲区中连续的一段，整页只需一次切片
+
+    行号即记录在原始数据中的位置。按行号取记录时才会临时构造 dict。
+    """
+
+    __slots__ = ("ids", "names", "sources", "summaries", "categories", "portions",
+                 "emojis", "descriptions", "calories", "calorie_levels", "json")
+
+    def __init__(self, ids: StringTable, names: StringTable, sources: StringTable,
+                 summaries: StringTable, categories: InternedColumn, portions: InternedColumn,
+                 emojis: InternedColumn, descriptions: StringTable,
+                 calories: Sequence[int], calorie_levels: Sequence[int], json: StringTable):
+        self.ids = ids
+        self.names = names
+        self.sources = sources
+        self.summaries = summaries
+        self.categories = categories
+        self.portions = portions
+        self.emojis = emojis
+        self.descriptions = descriptions
+        self.calories = calories
+        self.calorie_levels = calorie_levels
+        self.json = json
+
+    @classmethod
+    def build(cls, records: Iterable[Dict[str, Any]], json_rows: Iterable[bytes]) -> "ColumnarFoodStore":
+        builder = FoodStoreBuilder()
+        for record, json_row in zip(records, json_rows):
+            builder.append(record, json_row)
+        return builder.finish()
+
+    def __len__(self) -> int:
+        return len(self.calories)
+
+    def __getitem__(self, row: int) -> Dict[str, Any]:
+        return self.record(row)
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """把一行还原为与 FoodItem 字段一致的 dict"""
+        return {
+            "id": self.ids[row],
+            "name": self.names[row],
+            "category": self.categories[row],
+            "calories": self.calories[row],
+            "calorie_level": self.calorie_levels[row],
+            "portion": self.portions[row],
+            "emoji": self.emojis[row],
+            "description": self.descriptions[row],
+            "source": self.sources[row],
+            "summary": self.summaries[row],
+        }
+
+    def json_row(self, row: int) -> bytes:
+        """单条记录的 JSON（去掉末尾的逗号）"""
+        return self.json.get_bytes(row)[:-1]
+
+    def json_fragments(self, rows: Iterable[int]) -> bytes:
+        """指定行的 JSON 片段直接拼接（每条末尾都带逗号）"""
+        if isinstance(rows, range) and rows.step == 1:
+            return self.json.span(rows.start, rows.stop) if rows else b""
+        return self.json.concat(rows)
+
+    def json_array(self, rows: Iterable[int]) -> bytes:
+        """把指定行的 JSON 片段拼接成一个 JSON 数组"""
+        body = self.json_fragments(rows)
+        # 去掉最后一条记录末尾的逗号
+        return b"".join((b"[", memoryview(body)[:-1], b"]"))
+
+    def ndjson(self, rows: Iterable[int]) -> bytes:
+        """指定行的 NDJSON（每行一条记录，以换行符结尾）"""
+        return self.json.lines(rows, trim=1)
+
+    def nbytes(self) -> int:
+        """各列数据本身占用的字节数（不含 Python 对象头）"""
+        columns = (self.ids, self.names, self.sources, self.summaries, self.categories,
+                   self.portions, self.emojis, self.descriptions, self.json)
+        return (sum(column.nbytes() for column in columns)
+                + len(self.calories) * self.calories.itemsize
+                + len(self.calorie_levels) * self.calorie_levels.itemsize)
+
+
+class FoodStoreBuilder:
+    """逐条追加记录来构建 ColumnarFoodStore，构建过程中不保留 dict"""
+
+    def __init__(self):
+        self._strings = {field: _StringTableBuilder() for field in STRING_FIELDS}
+        self._interned = {field: _InternedColumnBuilder() for field in INTERNED_FIELDS}
+        self._calories = array('i')
+        self._calorie_levels = array('b')
+        self._json = _StringTableBuilder()
+
+    def append(self, record: Dict[str, Any], json_row: bytes):
+        """追加一条已校验的记录及其 JSON 片段"""
+        try:
+            self._calories.append(record['calories'])
+            self._calorie_levels.append(record['calorie_level'])
+        except OverflowError:
+            raise ValueError(f"食物 {record['id']!r} 的热量或热量等级超出范围")
+        for field, builder in self._strings.items():
+            value = record[field]
+            builder.append(NULL if value is None else value.encode('utf-8'))
+        for field, builder in self._interned.items():
+            builder.append(record[field])
+        self._json.append(json_row + b",")
+
+    def finish(self) -> ColumnarFoodStore:
+        strings = {field: builder.finish() for field, builder in self._strings.items()}
+        interned = {field: builder.finish() for field, builder in self._interned.items()}
+        return ColumnarFoodStore(
+            ids=strings["id"],
+            names=strings["name"],
+            sources=strings["source"],
+            summaries=strings["summary"],
+            categories=interned["category"],
+            portions=interned["portion"],
+            emojis=interned["emoji"],
+            descriptions=strings["description"],
+            calories=self._calories,
+            calorie_levels=self._calorie_levels,
+            json=self._json.finish(),
+        )
@@ -0,0 +1,114 @@
+"""读接口的 HTTP 条件缓存（ETag/304）和预压缩响应体
+
+所有读接口的响应都只取决于当前数据版本和请求参数，因此 ETag 由接口名和
+数据版本组成；同一资源的压缩版本内容不同，ETag 再加上编码后缀。
+热点响应体（类别、统计、常见搜索）以 EncodedBody 的形式存入查询缓存，
+连同其 gzip/brotli 版本一起缓存，每个版本只压缩一次。
+"""
+import gzip
+from typing import Dict, Optional
+
+try:
+    import brotli  # 可选依赖，未安装时只提供 gzip
+except ImportError:
+    brotli = None
+
+# 小于该大小的响应体压缩收益不大，直接原样返回
+MIN_COMPRESS_SIZE = 512
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+
+# 每种编码对应的 ETag 后缀
+_ETAG_SUFFIXES = {"gzip": "-gzip", "br": "-br"}
+
+
+def make_etag(name: str, version: str, encoding: Optional[str] = None) -> str:
+    """根据接口名和数据版本生成强 ETag，压缩版本带编码后缀"""
+    return f'"{name}-{version}{_ETAG_SUFFIXES.get(encoding, "")}"'
+
+
+def _normalize_tag(tag: str) -> str:
+    """去掉弱标记和编码后缀（nginx 压缩时会把强 ETag 改成弱 ETag）"""
+    tag = tag.strip().removeprefix("W/")
+    for suffix in _ETAG_SUFFIXES.values():
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """If-None-Match 中与 etag 相同的那个标签（任一编码版本都视为同一份内容），没有时返回 None
+
+    304 响应应带上客户端缓存的那个版本的 ETag，因此返回客户端发来的标签。
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    normalized = _normalize_tag(etag)
+    for tag in if_none_match.split(","):
+        if _normalize_tag(tag) == normalized:
+            return tag.strip()
+    return None
+
+
+def is_not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 是否命中 etag（任一编码版本都视为同一份内容）"""
+    return matching_etag(if_none_match, etag) is not None
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """按 Accept-Encoding 选择压缩方式（优先 brotli），不接受压缩时返回 None"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    for coding in ("br", "gzip"):
+        if coding == "br" and brotli is None:
+            continue
+        if weights.get(coding, weights.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class EncodedBody:
+    """一个响应体及其按需生成、生成后缓存的压缩版本"""
+
+    __slots__ = ("body", "_variants")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._variants: Dict[str, bytes] = {}
+
+    @property
+    def size(self) -> int:
+        """原始响应体和已生成的压缩版本的总字节数"""
+        return len(self.body) + sum(len(variant) for variant in self._variants.values())
+
+    def needs_encoding(self, encoding: Optional[str]) -> bool:
+        """encoded(encoding) 是否需要先压缩（尚未生成该压缩版本）"""
+        return (encoding is not None and len(self.body) >= MIN_COMPRESS_SIZE
+                and encoding not in self._variants)
+
+    def encoded(self, encoding: Optional[str]) -> Optional[bytes]:
+        """指定编码的响应体；不压缩或不值得压缩时返回 None"""
+        if encoding is None or len(self.body) < MIN_COMPRESS_SIZE:
+            return None
+        variant = self._variants.get(encoding)
+        if variant is None:
+            if encoding == "br":
+                variant = brotli.compress(self.body, quality=BROTLI_QUALITY)
+            else:
+                # 固定 mtime，同一内容的压缩结果逐字节相同，强 ETag 才成立
+                variant = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+            self._variants[encoding] = variant
+        return variant
@@ -0,0 +1,136 @@
+"""关键词规则表：一次扫描完成多组关键词的包含判断
+
+分类和过滤规则都是 "文本包含某组关键词中的任意一个" 的有序列表，多条规则同时
+命中时取最靠前的。KeywordRules 把整张规则表编译成一个 Aho-Corasick 自动机，
+文本只需从头到尾扫描一遍（每个字符一次字典查找），与关键词数量无关。
+
+自动机在 Python 中逐字符执行，而 str 的子串查找是 C 实现：每个字符的开销约等于
+2.5 次短文本上的子串查找。因此只有文本较短、关键词较多时（食物名称、页面标题）
+才走自动机，否则按规则顺序逐个查找关键词，命中即停。两种方式结果相同。
+
+    rules = KeywordRules([('drinks', ['可乐', '果汁']), ('snacks', ['薯片'])], default='other')
+    rules.classify('冰可乐')       # 'drinks'
+    rules.count('可乐配薯片')      # 2（命中的规则数）
+"""
+import sys
+from collections import deque
+from typing import Dict, FrozenSet, Generic, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar('T')
+
+# 没有关键词结束的状态
+_NO_RULE = sys.maxsize
+
+# 文本长度小于 关键词数 × AUTOMATON_CHARS_PER_KEYWORD 时使用自动机（实测的分界点）
+AUTOMATON_CHARS_PER_KEYWORD = 0.4
+
+
+class KeywordAutomaton:
+    """(关键词, 规则序号) 编译成的确定自动机，每个状态已合并失败转移的出边"""
+
+    def __init__(self, keywords: Iterable[Tuple[str, int]]):
+        goto: List[Dict[str, int]] = [{}]
+        rules: List[set] = [set()]
+        for keyword, rule in keywords:
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    rules.append(set())
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            rules[state].add(rule)
+
+        # 按层次遍历计算失败转移，同时把失败状态的出边和命中的规则并入当前状态
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        pending = deque(goto[0].values())
+        while pending:
+            state = pending.popleft()
+            rules[state] |= rules[fail[state]]
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0)
+                pending.append(child)
+
+        self._delta = delta
+        self._rules: List[FrozenSet[int]] = [frozenset(found) for found in rules]
+        self._first = [min(found, default=_NO_RULE) for found in rules]
+
+    def first(self, text: str) -> Optional[int]:
+        """text 中出现的关键词所属规则的最小序号，没有命中时返回 None"""
+        delta, first = self._delta, self._first
+        state = 0
+        best = first[0]
+        for char in text:
+            state = delta[state].get(char, 0)
+            if first[state] < best:
+                best = first[state]
+                if best == 0:
+                    break
+        return None if best == _NO_RULE else best
+
+    def rules(self, text: str, limit: Optional[int] = None) -> FrozenSet[int]:
+        """text 中出现的关键词所属的全部规则序号；命中 limit 条规则后提前结束"""
+        delta, rules = self._delta, self._rules
+        state = 0
+        found = rules[0]
+        for char in text:
+            state = delta[state].get(char, 0)
+            if rules[state] and not rules[state] <= found:
+                found = found | rules[state]
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+
+class KeywordRules(Generic[T]):
+    """有序规则表：[(结果, 关键词列表), ...]，文本包含某条规则的任一关键词即命中"""
+
+    def __init__(self, rules: Sequence[Tuple[T, Sequence[str]]], default: Optional[T] = None):
+        self.values = [value for value, _ in rules]
+        self.default = default
+        self._keywords = [(keyword, index) for index, (_, keywords) in enumerate(rules) for keyword in keywords]
+        self._automaton = KeywordAutomaton(self._keywords)
+        self._automaton_chars = len(self._keywords) * AUTOMATON_CHARS_PER_KEYWORD
+
+    def first(self, text: str) -> Optional[int]:
+        """最靠前的命中规则的序号，没有命中时返回 None"""
+        if len(text) < self._automaton_chars:
+            return self._automaton.first(text)
+        # 关键词按规则顺序排列，第一个命中的就属于最靠前的规则
+        for keyword, index in self._keywords:
+            if keyword in text:
+                return index
+        return None
+
+    def classify(self, text: str) -> T:
+        """最靠前的命中规则的结果，没有命中时返回 default"""
+        index = self.first(text)
+        return self.default if index is None else self.values[index]
+
+    def matches(self, text: str) -> bool:
+        return self.first(text) is not None
+
+    def count(self, text: str, limit: Optional[int] = None) -> int:
+        """命中的规则数，最多数到 limit 条"""
+        if len(text) >= self._automaton_chars:
+            found = set()
+            for keyword, index in self._keywords:
+                if index not in found and keyword in text:
+                    found.add(index)
+                    if limit is not None and len(found) >= limit:
+                        break
+            return len(found)
+        found = len(self._automaton.rules(text, limit))
+        return found if limit is None else min(found, limit)
+
+
+def any_of(keywords: Sequence[str]) -> KeywordRules[bool]:
+    """只有一条规则的规则表，用于 "包含其中任一关键词" 的判断"""
+    return KeywordRules([(True, keywords)], default=False)
+
+
+def each_of(keywords: Sequence[str]) -> KeywordRules[str]:
+    """每个关键词各为一条规则，count 返回出现的不同关键词个数"""
+    return KeywordRules([(keyword, [keyword]) for keyword in keywords])
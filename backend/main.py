@@ -1,10 +1,24 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from typing import List, Optional, Dict, Any, Callable, Sequence
 import uvicorn
 import json
 import os
+import threading
+import time
+
+from dataset import FoodDataset
+from export import export_rows, iter_json_array, iter_ndjson, resume_position
+from http_cache import EncodedBody, choose_encoding, is_not_modified, make_etag, matching_etag
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Metrics, MetricsMiddleware
+from models import FoodItem, MealRequest, SearchQuery
+from pagination import InvalidCursor, cursor_position, next_cursor
+from portions import rescale_calories
+from query_cache import QueryCache
+from snapshot import load_snapshot
+from suggest import PINYIN_ENABLED, TOP_K as SUGGEST_TOP_K, Popularity, SuggestIndex
 
 app = FastAPI(title="卡路里小助手 API", description="可爱的食物热量查询API", version="2.0.0")
 
@@ -15,27 +29,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 分页信息通过响应头返回，需要允许前端读取
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
-# 数据模型
-class FoodItem(BaseModel):
-    id: str
-    name: str
-    category: str
-    calories: int
-    calorie_level: int
-    portion: str
-    emoji: str
-    description: str
-    source: Optional[str] = ""
-    summary: Optional[str] = ""
-
-class SearchQuery(BaseModel):
-    query: str
-    category: Optional[str] = None
+# 请求指标，通过 /metrics 以 Prometheus 格式输出
+metrics = Metrics()
+app.add_middleware(MetricsMiddleware, metrics=metrics)
 
 # 全局变量
-foods_data: List[Dict[str, Any]] = []
+DATA_FILE = os.environ.get("CALORIE_DATA_FILE", os.path.join(os.path.dirname(__file__), "data.json"))
+# 大于 0 时启用数据文件监听（轮询间隔，单位秒）
+WATCH_INTERVAL = float(os.environ.get("CALORIE_WATCH_INTERVAL", "0"))
+# 管理接口令牌；未配置时只允许本机访问
+ADMIN_TOKEN = os.environ.get("CALORIE_ADMIN_TOKEN")
+# 数据快照文件：启动时优先映射快照，多个 worker 进程共享同一份只读数据；设为空字符串则只用 JSON
+SNAPSHOT_FILE = os.environ.get("CALORIE_SNAPSHOT_FILE", os.path.splitext(DATA_FILE)[0] + ".snapshot")
+# 内存中缓存的热点响应体（类别、统计等）条数，每条连同其压缩版本
+BODY_CACHE_SIZE = int(os.environ.get("CALORIE_BODY_CACHE_SIZE", "256"))
+# 搜索结果缓存的条数和有效期（秒）；数据重新加载时整体失效
+SEARCH_CACHE_SIZE = int(os.environ.get("CALORIE_SEARCH_CACHE_SIZE", "1024"))
+SEARCH_CACHE_TTL = float(os.environ.get("CALORIE_SEARCH_CACHE_TTL", "300"))
+# 两个缓存各自的总字节数上限（响应体连同压缩版本），不限数量的宽泛搜索可能返回整个目录
+BODY_CACHE_BYTES = int(os.environ.get("CALORIE_BODY_CACHE_BYTES", str(32 * 1024 * 1024)))
+SEARCH_CACHE_BYTES = int(os.environ.get("CALORIE_SEARCH_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# 当前生效的数据快照，重新加载时整体替换
+dataset = FoodDataset([])
+_reload_lock = threading.Lock()
+_watch_stop = threading.Event()
+_body_cache = QueryCache(BODY_CACHE_SIZE, max_bytes=BODY_CACHE_BYTES or None, sizeof=lambda entry: entry.size)
+search_cache = QueryCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL or None,
+                          max_bytes=SEARCH_CACHE_BYTES or None, sizeof=lambda entry: entry.size)
+metrics.register_cache("body", _body_cache)
+metrics.register_cache("search", search_cache)
+# 自动补全索引（与 dataset 对应，在后台线程中构建）和各名称的搜索次数
+popularity = Popularity()
+suggest_index: Optional[SuggestIndex] = None
+_suggest_lock = threading.Lock()
 categories_mapping = {
     "staples": {"name": "主食", "emoji": "🍚"},
     "drinks": {"name": "饮料", "emoji": "🥤"},
@@ -48,168 +79,469 @@ categories_mapping = {
     "other": {"name": "其他", "emoji": "🍽️"}
 }
 
+def build_dataset(data_file: str) -> FoodDataset:
+    """加载数据，优先使用快照文件，快照缺失或过期时解析 JSON（失败时抛出异常）"""
+    if SNAPSHOT_FILE:
+        return load_snapshot(SNAPSHOT_FILE, data_file)
+    return FoodDataset.from_json_file(data_file)
+
+def _record_load(data: FoodDataset, start: float):
+    metrics.dataset_loaded(len(data), data.version, time.perf_counter() - start, data.index_build_seconds)
+
 def load_food_data():
-    """加载食物数据"""
-    global foods_data
-    data_file = os.path.join(os.path.dirname(__file__), "data.json")
+    """加载食物数据（启动时调用，失败时使用空数据）"""
+    global dataset
     
+    start = time.perf_counter()
     try:
-        with open(data_file, 'r', encoding='utf-8') as f:
-            foods_data = json.load(f)
-        print(f"✅ 成功加载 {len(foods_data)} 条食物数据")
+        new_dataset = build_dataset(DATA_FILE)
+        print(f"✅ 成功加载 {len(new_dataset)} 条食物数据")
     except FileNotFoundError:
         print("❌ data.json 文件未找到")
-        foods_data = []
+        new_dataset = FoodDataset([])
     except json.JSONDecodeError as e:
         print(f"❌ JSON 解析错误: {e}")
-        foods_data = []
+        new_dataset = FoodDataset([])
+    except ValueError as e:
+        print(f"❌ 食物数据校验失败: {e}")
+        new_dataset = FoodDataset([])
+    
+    # 先完整构建新快照及其索引和统计，再一次性替换引用
+    dataset = new_dataset
+    _record_load(new_dataset, start)
+
+def reload_food_data() -> FoodDataset:
+    """重新加载数据文件；读取或校验失败时抛出异常，当前数据保持不变"""
+    global dataset
+    with _reload_lock:
+        start = time.perf_counter()
+        new_dataset = build_dataset(DATA_FILE)
+        dataset = new_dataset
+        _record_load(new_dataset, start)
+    _schedule_suggest_index(new_dataset)
+    print(f"🔄 已重新加载 {len(new_dataset)} 条食物数据 (版本 {new_dataset.version})")
+    return new_dataset
+
+def build_suggest_index(data: FoodDataset) -> SuggestIndex:
+    """构建 data 对应的自动补全索引（已建好时直接返回）；data 仍是当前数据时替换全局索引"""
+    global suggest_index
+    with _suggest_lock:
+        index = suggest_index
+        if index is None or index.version != data.version:
+            index = SuggestIndex(data.foods.names, data.version, popularity)
+            if data is dataset:
+                suggest_index = index
+    return index
+
+def _schedule_suggest_index(data: FoodDataset):
+    """在后台线程中构建自动补全索引并预先计算热门前缀，不阻塞启动和重新加载"""
+    def build():
+        start = time.perf_counter()
+        build_suggest_index(data).warm()
+        print(f"🔤 自动补全索引已就绪，耗时 {time.perf_counter() - start:.2f}s")
+        if not PINYIN_ENABLED:
+            print("⚠️ 未安装 pypinyin，自动补全只匹配名称前缀，不支持拼音和首字母")
+    threading.Thread(target=build, name="suggest-index", daemon=True).start()
+
+def _data_file_signature():
+    """数据文件的修改时间和大小，文件不存在时返回 None"""
+    try:
+        stat = os.stat(DATA_FILE)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _watch_data_file(interval: float):
+    """后台线程：轮询数据文件，发生变化时自动重新加载"""
+    last_signature = _data_file_signature()
+    while not _watch_stop.wait(interval):
+        signature = _data_file_signature()
+        if signature is None or signature == last_signature:
+            continue
+        last_signature = signature
+        try:
+            reload_food_data()
+        except Exception as e:
+            # 文件可能正在写入或内容有误，保留当前数据，等待下一次变化
+            print(f"❌ 数据文件更新被拒绝: {e}")
+
+def _cache_headers(data: FoodDataset, name: str) -> Dict[str, str]:
+    """根据数据版本生成某个接口的 ETag；客户端每次使用前都需向服务端校验"""
+    return {"ETag": make_etag(name, data.version), "Cache-Control": "no-cache"}
+
+def _not_modified(request: Request, headers: Dict[str, str]) -> Optional[Response]:
+    """客户端缓存仍然有效时返回 304 响应，跳过生成响应体"""
+    if is_not_modified(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return None
+
+def _json_bytes(content: Any) -> bytes:
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+async def _encoded_response(request: Request, data: FoodDataset, name: str, key: Any,
+                            build: Callable[[], bytes], cache: QueryCache = _body_cache,
+                            offload: bool = False) -> Response:
+    """热点响应：响应体及其压缩版本缓存在内存中，按 Accept-Encoding 选择，缓存有效时返回 304
+
+    offload 为 True 时，生成响应体和压缩都在线程池中执行，不阻塞事件循环。
+    """
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    # ETag 只取决于接口名、数据版本和编码，先校验，命中时不必生成或压缩响应体
+    matched = matching_etag(request.headers.get("if-none-match"), make_etag(name, data.version))
+    if matched is not None:
+        return Response(status_code=304, headers={"ETag": matched, "Cache-Control": "no-cache",
+                                                  "Vary": "Accept-Encoding"})
+
+    def compute() -> EncodedBody:
+        entry = EncodedBody(build())
+        # 未命中时顺便生成本次请求需要的压缩版本
+        entry.encoded(encoding)
+        return entry
+
+    entry = await cache.get(data.generation, key, compute, offload)
+    if entry.needs_encoding(encoding):
+        # 缓存的响应体还没有这种压缩版本
+        if offload:
+            await run_in_threadpool(entry.encoded, encoding)
+        else:
+            entry.encoded(encoding)
+        # 按新的大小计入缓存容量
+        cache.update_size(data.generation, key)
+    body = entry.encoded(encoding)
+    if body is None:
+        encoding, body = None, entry.body
+    
+    headers = {"ETag": make_etag(name, data.version, encoding), "Cache-Control": "no-cache",
+               "Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+def _json_rows_response(data: FoodDataset, rows, headers: Optional[Dict[str, str]] = None) -> Response:
+    """直接拼接预先序列化好的记录，跳过逐条构建 FoodItem"""
+    return Response(data.json_array(rows), media_type="application/json", headers=headers)
+
+def _select_rows(data: FoodDataset, category: Optional[str], min_calories: Optional[int],
+                 max_calories: Optional[int], calorie_level: Optional[int], sort: Optional[str]) -> Sequence[int]:
+    """按筛选条件选出行号；有热量条件或排序时使用按热量排好序的索引，只需二分和切片"""
+    if min_calories is None and max_calories is None and calorie_level is None and sort is None:
+        return range(len(data)) if category is None else data.by_category.get(category, range(0))
+    return data.calorie_index.query(category, calorie_level, min_calories, max_calories,
+                                    descending=sort == "-calories")
+
+def _paged_response(data: FoodDataset, rows: Sequence[int], offset: int, limit: Optional[int],
+                    cursor: Optional[str], headers: Dict[str, str]) -> Response:
+    """按偏移量或游标取一页，总数和下一页游标放在响应头中"""
+    if cursor is not None:
+        try:
+            offset = cursor_position(data, rows, cursor)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    start, stop, _ = slice(offset, None if limit is None else offset + limit).indices(len(rows))
+    # 总数即行号序列的长度，无需重新统计
+    headers = {**headers, "X-Total-Count": str(len(rows))}
+    if stop > start:
+        cursor = next_cursor(data, rows, stop)
+        if cursor is not None:
+            headers["X-Next-Cursor"] = cursor
+    return _json_rows_response(data, rows[start:stop], headers)
 
 @app.on_event("startup")
 async def startup_event():
     """应用启动时初始化数据"""
     load_food_data()
+    _schedule_suggest_index(dataset)
+    if WATCH_INTERVAL > 0:
+        _watch_stop.clear()
+        threading.Thread(target=_watch_data_file, args=(WATCH_INTERVAL,),
+                         name="data-file-watcher", daemon=True).start()
+        print(f"👀 正在监听数据文件变化: {DATA_FILE}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时停止后台任务"""
+    _watch_stop.set()
 
 # API 路由
 @app.get("/", summary="欢迎页面")
-async def root():
-    return {
+async def root(request: Request):
+    data = dataset
+    headers = _cache_headers(data, "root")
+    not_modified = _not_modified(request, headers)
+    if not_modified is not None:
+        return not_modified
+    return JSONResponse({
         "message": "🎉 欢迎使用卡路里小助手 API!",
         "description": "可爱的食物热量查询API",
         "docs_url": "/docs",
-        "total_foods": len(foods_data)
-    }
+        "total_foods": len(data)
+    }, headers=headers)
 
 @app.get("/api/foods", response_model=List[FoodItem], summary="获取所有食物")
 async def get_all_foods(
+    request: Request,
     limit: Optional[int] = Query(None, description="限制返回数量"),
-    offset: Optional[int] = Query(0, description="偏移量")
+    offset: Optional[int] = Query(0, description="偏移量"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 X-Next-Cursor，提供时忽略 offset"),
+    min_calories: Optional[int] = Query(None, description="最低热量"),
+    max_calories: Optional[int] = Query(None, description="最高热量"),
+    calorie_level: Optional[int] = Query(None, description="热量等级"),
+    sort: Optional[str] = Query(None, pattern="^-?calories$", description="calories 按热量升序，-calories 降序")
 ):
-    """获取所有食物列表"""
-    total = len(foods_data)
+    """获取所有食物列表（指定热量条件时默认按热量升序）"""
+    data = dataset
+    headers = _cache_headers(data, "foods")
+    not_modified = _not_modified(request, headers)
+    if not_modified is not None:
+        return not_modified
+    
+    rows = _select_rows(data, None, min_calories, max_calories, calorie_level, sort)
+    return _paged_response(data, rows, offset, limit, cursor, headers)
+
+def _search_rows(data: FoodDataset, query_lower: str, category: Optional[str], limit: Optional[int]) -> List[int]:
+    """通过倒排索引查找名称匹配的食物行号"""
+    filtered_rows = []
     
-    if limit is None:
-        result = foods_data[offset:]
-    else:
-        result = foods_data[offset:offset + limit]
+    # 类别比较转换为整数编码比较；数据中不存在的类别不会有任何结果
+    category_codes = data.foods.categories.codes
+    category_code = None if category is None else data.foods.categories.code_of(category)
+    if category is not None and category_code is None:
+        return filtered_rows
     
-    return [FoodItem(**food) for food in result]
+    for row in data.search_index.search(query_lower):
+        # 如果指定了类别，再过滤类别
+        if category_code is None or category_codes[row] == category_code:
+            filtered_rows.append(row)
+            # 已凑够数量即可提前结束
+            if limit and limit > 0 and len(filtered_rows) >= limit:
+                break
+    
+    # 限制返回数量
+    if limit:
+        filtered_rows = filtered_rows[:limit]
+    return filtered_rows
 
 @app.get("/api/foods/search", response_model=List[FoodItem], summary="搜索食物")
 async def search_foods(
+    request: Request,
     q: str = Query(..., description="搜索关键词"),
     category: Optional[str] = Query(None, description="类别筛选"),
     limit: Optional[int] = Query(20, description="限制返回数量")
 ):
-    """搜索食物"""
+    """搜索食物（常见搜索的结果及其压缩版本缓存在内存中）"""
     if not q.strip():
         raise HTTPException(status_code=400, detail="搜索关键词不能为空")
     
-    # 过滤数据
-    filtered_foods = []
+    data = dataset
     query_lower = q.lower()
+    # 搜索词与某个食物名称完全相同时计入该食物的热度（自动补全按热度排序）
+    index = suggest_index
+    if index is not None and index.version == data.version:
+        index.record_hit(query_lower.strip())
+    # 搜索本身按小写比较，大小写不同的查询共用一条缓存；limit 为 0 和不传时含义相同
+    limit = limit or None
+    # 未命中时在线程池中计算，不阻塞事件循环；相同查询并发未命中时只计算一次
+    return await _encoded_response(
+        request, data, "search", (query_lower, category, limit),
+        lambda: data.json_array(_search_rows(data, query_lower, category, limit)),
+        cache=search_cache, offload=True
+    )
+
+@app.get("/api/foods/suggest", summary="搜索框自动补全")
+async def suggest_foods(
+    q: str = Query(..., description="已输入的前缀，支持拼音和首字母（依赖 pypinyin，未安装时只匹配名称前缀）"),
+    limit: int = Query(8, ge=1, le=SUGGEST_TOP_K, description="返回数量")
+):
+    """按前缀返回食物名称（只含 ID 和名称），常被搜索的排在前面"""
+    data = dataset
+    index = suggest_index
+    if index is None or index.version != data.version:
+        # 后台构建尚未完成，等待构建（不阻塞事件循环）
+        index = await run_in_threadpool(build_suggest_index, data)
     
-    for food in foods_data:
-        # 搜索名称
-        if query_lower in food['name'].lower():
-            # 如果指定了类别，再过滤类别
-            if category is None or food['category'] == category:
-                filtered_foods.append(food)
-    
-    # 限制返回数量
-    if limit:
-        filtered_foods = filtered_foods[:limit]
-    
-    return [FoodItem(**food) for food in filtered_foods]
+    names = data.foods.names
+    ids = data.foods.ids
+    return JSONResponse([{"id": ids[row], "name": names[row]} for row in index.suggest(q.strip(), limit)])
 
 @app.get("/api/foods/category/{category}", response_model=List[FoodItem], summary="按类别获取食物")
 async def get_foods_by_category(
+    request: Request,
     category: str,
     limit: Optional[int] = Query(20, description="限制返回数量"),
-    offset: Optional[int] = Query(0, description="偏移量")
+    offset: Optional[int] = Query(0, description="偏移量"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 X-Next-Cursor，提供时忽略 offset"),
+    min_calories: Optional[int] = Query(None, description="最低热量"),
+    max_calories: Optional[int] = Query(None, description="最高热量"),
+    calorie_level: Optional[int] = Query(None, description="热量等级"),
+    sort: Optional[str] = Query(None, pattern="^-?calories$", description="calories 按热量升序，-calories 降序")
 ):
-    """按类别获取食物"""
+    """按类别获取食物（指定热量条件时默认按热量升序）"""
     if category not in categories_mapping:
         raise HTTPException(status_code=404, detail=f"类别 '{category}' 不存在")
     
-    # 过滤指定类别的食物
-    category_foods = [food for food in foods_data if food['category'] == category]
+    data = dataset
+    headers = _cache_headers(data, "category")
+    not_modified = _not_modified(request, headers)
+    if not_modified is not None:
+        return not_modified
     
-    # 分页
-    if limit:
-        result = category_foods[offset:offset + limit]
-    else:
-        result = category_foods[offset:]
+    # 直接取预先分好组（及按热量排好序）的类别数据
+    category_rows = _select_rows(data, category, min_calories, max_calories, calorie_level, sort)
     
-    return [FoodItem(**food) for food in result]
+    # 分页（limit 为 0 时返回该类别的全部数据）
+    return _paged_response(data, category_rows, offset, limit or None, cursor, headers)
+
+@app.get("/api/foods/export", summary="流式导出全部食物")
+async def export_foods(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|json)$", description="ndjson（每行一条）或 json（JSON 数组）"),
+    category: Optional[str] = Query(None, description="类别筛选"),
+    after: Optional[str] = Query(None, description="断点续传：上次收到的最后一条记录的 ID")
+):
+    """逐块流式输出食物数据，服务端内存占用与数据量无关"""
+    if category is not None and category not in categories_mapping:
+        raise HTTPException(status_code=404, detail=f"类别 '{category}' 不存在")
+    
+    # 整个导出过程使用同一份快照，期间重新加载数据不影响本次输出
+    data = dataset
+    headers = {**_cache_headers(data, "export"), "X-Dataset-Version": data.version}
+    not_modified = _not_modified(request, headers)
+    if not_modified is not None:
+        return not_modified
+    
+    rows = export_rows(data, category)
+    try:
+        start = resume_position(data, rows, after)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=f"{e}，无法继续导出")
+    
+    if format == "json":
+        return StreamingResponse(iter_json_array(data, rows, start), media_type="application/json",
+                                 headers=headers)
+    return StreamingResponse(iter_ndjson(data, rows, start), media_type="application/x-ndjson",
+                             headers=headers)
+
+@app.post("/api/foods/batch", summary="批量查询食物并计算总热量")
+async def batch_foods(meal: MealRequest):
+    """一次请求按 ID 或名称查询多个食物，按分量换算热量并汇总（例如记录一餐）"""
+    data = dataset
+    items = []
+    total_calories = 0
+    missing = 0
+    
+    for item in meal.items:
+        if item.id is not None:
+            row = data.by_id.get(item.id)
+        elif item.name is not None:
+            row = data.by_name.get(item.name.strip())
+        else:
+            items.append({"found": False, "error": "需要提供 id 或 name"})
+            missing += 1
+            continue
+        
+        if row is None:
+            items.append({"id": item.id, "name": item.name, "found": False, "error": "未找到该食物"})
+            missing += 1
+            continue
+        
+        food = data.foods.record(row)
+        calories, portion = food["calories"], food["portion"]
+        if item.amount is not None:
+            try:
+                calories, portion = rescale_calories(calories, portion, food["name"], item.amount, item.unit)
+            except ValueError as e:
+                items.append({"id": food["id"], "name": food["name"], "found": True,
+                              "error": str(e), "food": food})
+                missing += 1
+                continue
+        
+        calories = int(round(calories * item.quantity))
+        total_calories += calories
+        items.append({
+            "id": food["id"],
+            "name": food["name"],
+            "found": True,
+            "quantity": item.quantity,
+            "portion": portion,
+            "calories": calories,
+            "food": food
+        })
+    
+    return {
+        "items": items,
+        "total_calories": total_calories,
+        "found": len(items) - missing,
+        "missing": missing
+    }
 
 @app.get("/api/foods/{food_id}", response_model=FoodItem, summary="获取单个食物详情")
-async def get_food_by_id(food_id: str):
+async def get_food_by_id(request: Request, food_id: str):
     """根据ID获取食物详情"""
-    for food in foods_data:
-        if food['id'] == food_id:
-            return FoodItem(**food)
+    data = dataset
+    row = data.by_id.get(food_id)
+    if row is not None:
+        headers = _cache_headers(data, "food")
+        not_modified = _not_modified(request, headers)
+        if not_modified is not None:
+            return not_modified
+        return Response(data.json_row(row), media_type="application/json", headers=headers)
     
     raise HTTPException(status_code=404, detail=f"未找到ID为 '{food_id}' 的食物")
 
-@app.get("/api/categories", summary="获取所有类别")
-async def get_categories():
-    """获取所有食物类别"""
-    # 统计每个类别的食物数量
-    category_counts = {}
-    for food in foods_data:
-        category = food['category']
-        category_counts[category] = category_counts.get(category, 0) + 1
-    
-    # 返回类别信息
+def _categories_body(data: FoodDataset) -> bytes:
+    # 类别数量在加载数据时已统计好
     categories = []
     for category, mapping in categories_mapping.items():
         categories.append({
             "id": category,
             "name": mapping["name"],
             "emoji": mapping["emoji"],
-            "count": category_counts.get(category, 0)
+            "count": data.category_counts.get(category, 0)
         })
     
-    return {
+    return _json_bytes({
         "categories": categories,
-        "total": len(foods_data)
-    }
+        "total": len(data)
+    })
+
+@app.get("/api/categories", summary="获取所有类别")
+async def get_categories(request: Request):
+    """获取所有食物类别"""
+    data = dataset
+    return await _encoded_response(request, data, "categories", "categories", lambda: _categories_body(data))
 
 @app.get("/api/stats", summary="获取统计信息")
-async def get_stats():
-    """获取食物数据统计信息"""
-    if not foods_data:
-        return {"message": "暂无数据"}
-    
-    # 计算统计信息
-    total_foods = len(foods_data)
-    calories_list = [food['calories'] for food in foods_data]
-    
-    avg_calories = sum(calories_list) / total_foods
-    max_calories = max(calories_list)
-    min_calories = min(calories_list)
-    
-    # 热量等级分布
-    calorie_levels = {}
-    for food in foods_data:
-        level = food['calorie_level']
-        calorie_levels[level] = calorie_levels.get(level, 0) + 1
-    
-    # 类别分布
-    category_distribution = {}
-    for food in foods_data:
-        category = food['category']
-        category_distribution[category] = category_distribution.get(category, 0) + 1
+async def get_stats(request: Request):
+    """获取食物数据统计信息（包含百分位数和各类别的均值/中位数）"""
+    data = dataset
+    return await _encoded_response(request, data, "stats", "stats", lambda: _json_bytes(data.stats))
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus 格式的接口和数据指标"""
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.post("/api/admin/reload", summary="重新加载数据")
+async def reload_data(request: Request, x_admin_token: Optional[str] = Header(None)):
+    """在后台线程中加载并校验新的 data.json，成功后原子替换当前数据"""
+    if ADMIN_TOKEN:
+        if x_admin_token != ADMIN_TOKEN:
+            raise HTTPException(status_code=403, detail="管理令牌无效")
+    elif request.client is None or request.client.host not in ("127.0.0.1", "::1"):
+        raise HTTPException(status_code=403, detail="未配置管理令牌时只允许本机访问")
+    
+    try:
+        data = await run_in_threadpool(reload_food_data)
+    except FileNotFoundError:
+        raise HTTPException(status_code=422, detail="数据文件未找到，当前数据保持不变")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"数据文件无效，当前数据保持不变: {e}")
     
     return {
-        "total_foods": total_foods,
-        "calories_stats": {
-            "average": round(avg_calories, 2),
-            "max": max_calories,
-            "min": min_calories
-        },
-        "calorie_level_distribution": calorie_levels,
-        "category_distribution": category_distribution
+        "message": "✅ 数据已重新加载",
+        "total_foods": len(data),
+        "version": data.version
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,216 @@
+"""接口指标：按路由统计请求数、延迟和响应大小，以 Prometheus 文本格式输出
+
+所有计数都在事件循环线程中更新（中间件运行在事件循环中），因此不需要加锁；
+直方图的桶在创建时预先分配好，记录一次请求只是几次整数加法和一次二分查找。
+每个 worker 进程各自统计，多 worker 部署时由 Prometheus 分别抓取后汇总。
+"""
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# 延迟直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 响应大小直方图的桶上界（字节）
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608, 33554432)
+
+# 方法标签只保留标准方法，其余归为 OTHER，避免任意方法名产生无限多的时间序列
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+# Response 会自动补上 charset=utf-8
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class Histogram:
+    """固定桶的直方图，counts[i] 为落在第 i 个桶（非累计）中的次数，最后一个桶为 +Inf"""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def samples(self) -> List[Tuple[str, int]]:
+        """(le, 累计次数) 列表，按 Prometheus 的格式输出"""
+        result = []
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            result.append((_format_value(bound), total))
+        result.append(("+Inf", total + self.counts[-1]))
+        return result
+
+
+class RouteMetrics:
+    """一个 (路由, 方法) 的请求计数、延迟和响应大小"""
+
+    __slots__ = ("statuses", "latency", "size")
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+class Metrics:
+    """进程内的全部指标"""
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+        self.started_at = time.time()
+        # 数据集相关的仪表
+        self.dataset_items = 0
+        self.dataset_version = ""
+        self.dataset_generation = 0
+        self.dataset_load_seconds = 0.0
+        self.dataset_index_build_seconds = 0.0
+        self.dataset_loaded_at = 0.0
+        # 名称 -> 提供 stats() 的缓存对象
+        self.caches: Dict[str, Any] = {}
+
+    def observe(self, route: str, method: str, status: int, seconds: float, size: int):
+        """记录一次请求"""
+        metrics = self.routes.get((route, method))
+        if metrics is None:
+            metrics = self.routes[(route, method)] = RouteMetrics()
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+        metrics.latency.observe(seconds)
+        metrics.size.observe(size)
+
+    def dataset_loaded(self, items: int, version: str, load_seconds: float, index_build_seconds: float):
+        """记录一次数据加载（启动或重新加载），数据代数加一"""
+        self.dataset_items = items
+        self.dataset_version = version
+        self.dataset_generation += 1
+        self.dataset_load_seconds = load_seconds
+        self.dataset_index_build_seconds = index_build_seconds
+        self.dataset_loaded_at = time.time()
+
+    def register_cache(self, name: str, cache: Any):
+        """输出该缓存的命中、未命中、淘汰等计数和当前条数"""
+        self.caches[name] = cache
+
+    def render(self) -> str:
+        """Prometheus 文本格式"""
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def gauge(name: str, value: float, help_text: str, labels: Optional[str] = None):
+            header(name, "gauge", help_text)
+            lines.append(f"{name}{labels or ''} {_format_value(value)}")
+
+        # 先复制一份，输出期间新增的路由不影响遍历
+        routes = sorted(self.routes.items())
+
+        header("calorie_http_requests_total", "counter", "HTTP requests by route, method and status")
+        for (route, method), metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                labels = _labels(route=route, method=method, status=status)
+                lines.append(f"calorie_http_requests_total{labels} {count}")
+
+        for name, attr, help_text in (
+            ("calorie_http_request_duration_seconds", "latency", "HTTP request latency in seconds"),
+            ("calorie_http_response_size_bytes", "size", "HTTP response body size in bytes"),
+        ):
+            header(name, "histogram", help_text)
+            for (route, method), metrics in routes:
+                histogram: Histogram = getattr(metrics, attr)
+                samples = histogram.samples()
+                for le, count in samples:
+                    lines.append(f"{name}_bucket{_labels(route=route, method=method, le=le)} {count}")
+                labels = _labels(route=route, method=method)
+                lines.append(f"{name}_sum{labels} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{labels} {samples[-1][1]}")
+
+        caches = sorted((name, cache.stats()) for name, cache in self.caches.items())
+        header("calorie_cache_events_total", "counter", "Cache lookups and maintenance events by cache and event")
+        for name, stats in caches:
+            for event, count in stats.items():
+                if event not in ("entries", "max_entries", "bytes", "max_bytes"):
+                    lines.append(f"calorie_cache_events_total{_labels(cache=name, event=event)} {count}")
+        header("calorie_cache_entries", "gauge", "Number of entries currently cached")
+        for name, stats in caches:
+            lines.append(f"calorie_cache_entries{_labels(cache=name)} {stats['entries']}")
+        header("calorie_cache_max_entries", "gauge", "Configured cache capacity")
+        for name, stats in caches:
+            lines.append(f"calorie_cache_max_entries{_labels(cache=name)} {stats['max_entries']}")
+        header("calorie_cache_bytes", "gauge", "Total size of cached values in bytes")
+        for name, stats in caches:
+            lines.append(f"calorie_cache_bytes{_labels(cache=name)} {stats['bytes']}")
+        header("calorie_cache_max_bytes", "gauge", "Configured cache size limit in bytes (0 means unlimited)")
+        for name, stats in caches:
+            lines.append(f"calorie_cache_max_bytes{_labels(cache=name)} {stats['max_bytes']}")
+
+        gauge("calorie_http_requests_in_flight", self.in_flight, "HTTP requests currently being served")
+        gauge("calorie_process_start_time_seconds", self.started_at, "Process start time as a Unix timestamp")
+        gauge("calorie_dataset_items", self.dataset_items, "Number of foods in the loaded dataset")
+        gauge("calorie_dataset_generation", self.dataset_generation, "Number of times the dataset has been loaded")
+        gauge("calorie_dataset_load_duration_seconds", self.dataset_load_seconds,
+              "Time taken by the last dataset load")
+        gauge("calorie_dataset_index_build_seconds", self.dataset_index_build_seconds,
+              "Time spent building indexes during the last dataset load (0 when mapped from a snapshot)")
+        gauge("calorie_dataset_loaded_timestamp_seconds", self.dataset_loaded_at,
+              "Time of the last dataset load as a Unix timestamp")
+        gauge("calorie_dataset_info", 1, "Version of the loaded dataset",
+              _labels(version=self.dataset_version))
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI 中间件：记录每个请求的路由、状态码、耗时和响应体大小
+
+    路由取 FastAPI 匹配到的路径模板（如 /api/foods/{food_id}），未匹配到任何
+    路由的请求统一记为 "unmatched"，避免标签数量随请求路径无限增长。
+    """
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            method = scope["method"] if scope["method"] in METHODS else "OTHER"
+            metrics.observe(getattr(route, "path", "unmatched"), method, status,
+                            time.perf_counter() - start, size)
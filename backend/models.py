@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+# 批量查询一次最多包含的条目数
+MAX_BATCH_ITEMS = 500
+
+# 数据模型
+class FoodItem(BaseModel):
+    id: str
+    name: str
+    category: str
+    calories: int
+    calorie_level: int
+    portion: str
+    emoji: str
+    description: str
+    source: Optional[str] = ""
+    summary: Optional[str] = ""
+
+class SearchQuery(BaseModel):
+    query: str
+    category: Optional[str] = None
+
+class MealItem(BaseModel):
+    id: Optional[str] = None
+    name: Optional[str] = None  # 按名称精确匹配，同时提供 id 时以 id 为准
+    quantity: float = Field(1.0, gt=0)  # 份数
+    amount: Optional[float] = Field(None, gt=0)  # 实际分量，如 500，不提供时按记录中的分量
+    unit: Optional[str] = None  # 分量单位，如 g、ml、个，不提供时与记录一致
+
+class MealRequest(BaseModel):
+    items: List[MealItem] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
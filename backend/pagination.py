@@ -0,0 +1,71 @@
+"""列表接口的游标分页
+
+游标是不透明的字符串，内含生成它时的数据版本、最后一条记录的行号和 ID。
+行号（按热量排序时为 (热量, 行号)）在同一版本内是稳定的排序键，续页只需二分定位；
+数据重新加载后版本不同，改用 ID 在新数据中重新定位。
+"""
+import base64
+import json
+from bisect import bisect_right
+from typing import Optional, Sequence
+
+from calorie_index import CalorieRange
+from dataset import FoodDataset
+
+
+class InvalidCursor(ValueError):
+    """游标格式错误，或其指向的记录在当前数据中已不存在"""
+
+
+def encode_cursor(data: FoodDataset, row: int) -> str:
+    """生成指向第 row 行之后的游标"""
+    payload = json.dumps([data.version, row, data.foods.ids[row]], ensure_ascii=False,
+                         separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """解析游标，返回 (版本, 行号, ID)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, row, food_id = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(version, str) or not isinstance(row, int) or not isinstance(food_id, str):
+            raise TypeError
+    except (ValueError, TypeError):
+        raise InvalidCursor("游标格式错误")
+    return version, row, food_id
+
+
+def _position_after(data: FoodDataset, rows: Sequence[int], row: int) -> int:
+    """第 row 行之后的记录在 rows 中的起始位置（该行不必属于 rows，例如不在所选类别中）"""
+    if isinstance(rows, CalorieRange):
+        # 按热量排序的结果以 (热量, 行号) 为排序键
+        return rows.position_after(data.foods.calories[row], row)
+    # 其余行号序列按行号升序排列
+    return bisect_right(rows, row)
+
+
+def position_after_id(data: FoodDataset, rows: Sequence[int], food_id: str) -> int:
+    """ID 为 food_id 的记录在 rows 中之后的位置"""
+    row = data.by_id.get(food_id)
+    if row is None:
+        raise InvalidCursor(f"未找到ID为 '{food_id}' 的食物")
+    return _position_after(data, rows, row)
+
+
+def cursor_position(data: FoodDataset, rows: Sequence[int], cursor: Optional[str]) -> int:
+    """游标在 rows 中对应的起始位置，没有游标时从头开始"""
+    if cursor is None:
+        return 0
+    version, row, food_id = decode_cursor(cursor)
+    if version == data.version and 0 <= row < len(data) and data.foods.ids[row] == food_id:
+        return _position_after(data, rows, row)
+    # 数据已更新，按 ID 重新定位
+    return position_after_id(data, rows, food_id)
+
+
+def next_cursor(data: FoodDataset, rows: Sequence[int], end: int) -> Optional[str]:
+    """本页结束位置为 end 时的下一页游标，已到末尾时返回 None"""
+    if 0 < end < len(rows):
+        return encode_cursor(data, rows[end - 1])
+    return None
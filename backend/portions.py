@@ -0,0 +1,159 @@
+"""食物标准分量与热量换算（爬虫和后端接口共用）"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from keyword_rules import KeywordRules
+
+# 常见食物的标准分量
+STANDARD_PORTIONS: Dict[str, Dict[str, Any]] = {
+    '可乐': {'amount': 330, 'unit': 'ml'},
+    '雪碧': {'amount': 330, 'unit': 'ml'},
+    '果汁': {'amount': 250, 'unit': 'ml'},
+    '奶茶': {'amount': 500, 'unit': 'ml'},
+    '咖啡': {'amount': 240, 'unit': 'ml'},
+    '牛奶': {'amount': 250, 'unit': 'ml'},
+    '酸奶': {'amount': 150, 'unit': 'g'},
+    '鸡腿': {'amount': 100, 'unit': 'g'},
+    '鸡翅': {'amount': 100, 'unit': 'g'},
+    '牛排': {'amount': 150, 'unit': 'g'},
+    '排骨': {'amount': 100, 'unit': 'g'},
+    '热狗': {'amount': 1, 'unit': '根'},
+    '香肠': {'amount': 100, 'unit': 'g'},
+    '汉堡': {'amount': 1, 'unit': '个'},
+    '三明治': {'amount': 1, 'unit': '个'},
+    '薯片': {'amount': 50, 'unit': 'g'},
+    '饼干': {'amount': 100, 'unit': 'g'},
+    '巧克力': {'amount': 50, 'unit': 'g'},
+    '蛋糕': {'amount': 1, 'unit': '块'},
+    '甜甜圈': {'amount': 1, 'unit': '个'},
+    '面条': {'amount': 100, 'unit': 'g'},
+    '米饭': {'amount': 150, 'unit': 'g'},
+    '面包': {'amount': 100, 'unit': 'g'},
+    '苹果': {'amount': 1, 'unit': '个'},
+    '香蕉': {'amount': 1, 'unit': '根'},
+    '橙子': {'amount': 1, 'unit': '个'},
+    '土豆': {'amount': 150, 'unit': 'g'},
+    '玉米': {'amount': 150, 'unit': 'g'},
+    '沙拉': {'amount': 200, 'unit': 'g'},
+}
+
+# 单位别名：(标准单位, 倍数)
+_UNIT_ALIASES = {
+    'g': ('g', 1), '克': ('g', 1), 'kg': ('g', 1000), '千克': ('g', 1000), '公斤': ('g', 1000),
+    'ml': ('ml', 1), '毫升': ('ml', 1), 'l': ('ml', 1000), '升': ('ml', 1000),
+}
+
+_PORTION_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([^\d\s.]+)\s*$')
+
+
+# 分量表中没有的食物按类型推断标准分量，按顺序取第一条命中的规则
+PORTION_RULES: List[Tuple[Dict[str, Any], List[str]]] = [
+    ({'amount': 330, 'unit': 'ml'}, ['可乐', '汽水', '饮料', '果汁']),
+    ({'amount': 100, 'unit': 'g'}, ['肉', '鸡', '牛', '猪', '鱼']),
+    ({'amount': 50, 'unit': 'g'}, ['薯片', '饼干', '巧克力']),
+    ({'amount': 150, 'unit': 'g'}, ['面', '饭', '粥']),
+]
+DEFAULT_PORTION: Dict[str, Any] = {'amount': 100, 'unit': 'g'}
+
+
+class PortionMatcher:
+    """一张分量表的模糊匹配和类型推断，编译后分量表不能再修改
+
+    名称包含分量表的某个键、或是某个键的一部分时，取表中最靠前的键；都不满足时
+    按 PORTION_RULES 推断。分量表的键（序号 0..n-1）和推断规则（序号 n 起）编译在
+    同一张规则表中，名称只需扫描一遍。
+    """
+
+    def __init__(self, portions: Dict[str, Dict[str, Any]]):
+        self.portions = portions
+        self.keys = list(portions)
+        self._rules = KeywordRules([(key, [key]) for key in self.keys] + PORTION_RULES)
+        # 键的所有子串 -> 包含它的第一个键的序号
+        self._containing: Dict[str, int] = {}
+        for index, key in enumerate(self.keys):
+            for start in range(len(key) + 1):
+                for end in range(start, len(key) + 1):
+                    self._containing.setdefault(key[start:end], index)
+
+    def match(self, food_name: str) -> Dict[str, Any]:
+        if food_name in self.portions:
+            return self.portions[food_name]
+        index = self._rules.first(food_name)
+        containing = self._containing.get(food_name)
+        if containing is not None and (index is None or containing < index):
+            index = containing
+        if index is None:
+            return dict(DEFAULT_PORTION)
+        if index < len(self.keys):
+            return self.portions[self.keys[index]]
+        return dict(self._rules.values[index])
+
+
+# STANDARD_PORTIONS 视为常量，模块加载时编译
+_STANDARD_MATCHER = PortionMatcher(STANDARD_PORTIONS)
+_INFERENCE_RULES = KeywordRules(PORTION_RULES, default=DEFAULT_PORTION)
+
+
+def get_standard_portion(food_name: str, portions: Dict[str, Dict[str, Any]] = STANDARD_PORTIONS) -> Dict[str, Any]:
+    """获取食物的标准分量"""
+    if portions is STANDARD_PORTIONS:
+        return _STANDARD_MATCHER.match(food_name)
+
+    # 调用方传入的分量表随时可能被修改，不做预编译，按顺序查找
+    # 精确匹配
+    if food_name in portions:
+        return portions[food_name]
+
+    # 模糊匹配
+    for key in portions:
+        if key in food_name or food_name in key:
+            return portions[key]
+
+    # 根据食物类型推断标准分量
+    return dict(_INFERENCE_RULES.classify(food_name))
+
+
+def normalize_unit(unit: str, amount: float = 1) -> Tuple[float, str]:
+    """把分量换算成标准单位：克/千克 -> g，毫升/升 -> ml，其余单位（份、个等）保持不变"""
+    key = unit.strip()
+    canonical, factor = _UNIT_ALIASES.get(key.lower(), (key, 1))
+    return amount * factor, canonical
+
+
+def parse_portion(portion: str) -> Optional[Tuple[float, str]]:
+    """解析 "350ml"、"100g"、"1份" 这类分量描述，无法解析时返回 None"""
+    match = _PORTION_PATTERN.match(portion or "")
+    if not match:
+        return None
+    return normalize_unit(match.group(2), float(match.group(1)))
+
+
+def rescale_calories(calories: int, portion: str, food_name: str,
+                     amount: float, unit: Optional[str] = None) -> Tuple[float, str]:
+    """把记录中 portion 分量对应的热量换算到 amount（单位 unit，缺省时与记录一致）
+
+    返回 (换算后的热量, 换算后的分量描述)。单位不同时（如记录为 "1份"、
+    请求按克计），按该食物的标准分量把记录的每一份折算成克或毫升。
+    无法换算时抛出 ValueError。
+    """
+    base = parse_portion(portion)
+    if base is not None and base[0] <= 0:
+        raise ValueError(f"分量 '{portion}' 无效")
+    if unit:
+        amount, target_unit = normalize_unit(unit, amount)
+    elif base is not None:
+        target_unit = base[1]
+    else:
+        raise ValueError(f"无法解析分量 '{portion}'，请指定单位")
+
+    label = f"{amount:g}{target_unit}"
+    if base is not None and base[1] == target_unit:
+        return calories * amount / base[0], label
+
+    standard = get_standard_portion(food_name)
+    standard_amount, standard_unit = normalize_unit(standard['unit'], standard['amount'])
+    # 只有 "1份"、"2个" 这类按份计的分量可以借助标准分量换算
+    counted = 1.0 if base is None else base[0]
+    if (base is not None and base[1] in ('g', 'ml')) or standard_unit != target_unit:
+        raise ValueError(f"无法把 '{portion}' 换算为 {target_unit}")
+    return calories * amount / (counted * standard_amount), label
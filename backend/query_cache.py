@@ -0,0 +1,151 @@
+"""按查询参数缓存计算结果：LRU + TTL，相同查询并发未命中时只计算一次
+
+缓存与数据版本（FoodDataset.generation，越大越新）绑定，出现更新的版本（重新
+加载数据）时整体失效；重新加载前开始的请求仍持有旧版本，这些请求直接计算，
+既不清空也不写入缓存。除条数外还可以按
+总字节数限制（max_bytes，每条的大小由 sizeof 计算），超出时淘汰最久未用的条目，
+单条超过 max_bytes 的结果不缓存。所有方法都在
+事件循环线程中调用，因此不需要加锁；计算本身可以放到线程池中执行，
+期间到达的相同查询等待同一个 Future（single-flight），不会重复计算。
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+# 统计计数的名称
+COUNTERS = ("hits", "misses", "coalesced", "evictions", "expirations", "invalidations", "oversized", "stale")
+
+
+class QueryCache:
+    """max_entries 为最多缓存的条数，ttl 为每条的有效期（秒，None 表示不过期），
+    max_bytes 为全部条目的总大小上限（None 表示不限制），sizeof 返回一条结果的字节数"""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, max_bytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = lambda value: 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._clock = clock
+        # 键 -> (值, 过期时间, 字节数)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._bytes = 0
+        self._pending: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self._version: Optional[int] = None
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _sync_version(self, version: int) -> bool:
+        """遇到更新的版本时清空缓存；version 比当前版本旧时返回 False"""
+        if self._version is None or version > self._version:
+            if self._entries:
+                self.counters["invalidations"] += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+        return version == self._version
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, expires, size = entry
+        if expires is not None and expires <= self._clock():
+            del self._entries[key]
+            self._bytes -= size
+            self.counters["expirations"] += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any):
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # 单条就超过总上限，缓存它会挤掉其他全部条目
+            self.counters["oversized"] += 1
+            return
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        old = self._entries.get(key)
+        if old is not None:
+            self._bytes -= old[2]
+        self._entries[key] = (value, expires, size)
+        self._bytes += size
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.counters["evictions"] += 1
+
+    def update_size(self, version: int, key: Hashable):
+        """缓存的结果在原地变大（如新增了压缩版本）后重新计算其大小，必要时淘汰其他条目"""
+        entry = self._entries.get(key) if version == self._version else None
+        if entry is None:
+            return
+        value, expires, size = entry
+        new_size = self._sizeof(value)
+        if self.max_bytes is not None and new_size > self.max_bytes:
+            del self._entries[key]
+            self._bytes -= size
+            self.counters["oversized"] += 1
+            return
+        self._entries[key] = (value, expires, new_size)
+        self._bytes += new_size - size
+        self._evict()
+
+    async def get(self, version: int, key: Hashable, compute: Callable[[], Any], offload: bool = False) -> Any:
+        """取出缓存结果，未命中时调用 compute 计算（offload 为 True 时在线程池中执行）"""
+        if not self._sync_version(version):
+            # 旧数据上的请求：缓存中是新版本的结果，直接计算且不写入
+            self.counters["stale"] += 1
+            return await run_in_threadpool(compute) if offload else compute()
+        found, value = self._lookup(key)
+        if found:
+            self.counters["hits"] += 1
+            return value
+
+        pending = self._pending.get((version, key))
+        if pending is not None:
+            # 相同查询正在计算，等待其结果；shield 避免本请求取消时连带取消计算
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        self.counters["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[(version, key)] = future
+        try:
+            value = await run_in_threadpool(compute) if offload else compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有其他请求在等待时，避免事件循环报告“异常未被获取”
+            future.exception()
+            raise
+        finally:
+            del self._pending[(version, key)]
+
+        # 计算期间数据可能已重新加载，旧版本的结果不再写入
+        if version == self._version:
+            self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self._version = None
+
+    def stats(self) -> Dict[str, int]:
+        """各项计数以及当前条数、字节数和容量，用于调整缓存大小"""
+        return {**self.counters, "entries": len(self._entries), "max_entries": self.max_entries,
+                "bytes": self._bytes, "max_bytes": self.max_bytes or 0}
@@ -0,0 +1,80 @@
+"""按当前的分类规则重新计算目录中每个食物的类别、emoji 和分量
+
+调整 scraper.CATEGORY_RULES 后用它更新已有的 data.json，不需要重新抓取。分类
+规则预先编译，每个名称只扫描一遍，十万条记录不到一秒，可以放在每次数据
+刷新的流程里。结果与服务加载时一样先校验，再原子替换目标文件。
+
+data.json 中手工整理的记录可能与规则不一致，先用 --dry-run 查看会改动哪些记录，
+或用 --fields 只更新部分字段。
+
+用法（在 backend 目录下）:
+    python reclassify.py data.json --dry-run
+    python reclassify.py data.json                              # 原地更新
+    python reclassify.py data.json --output new.json --fields category emoji
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+from crawl_job import write_json_atomic
+from models import FoodItem
+from scraper import categorize_food
+
+# categorize_food 返回值的顺序
+FIELDS = ('category', 'emoji', 'portion')
+
+
+def reclassify(records: List[Dict[str, Any]], fields: Sequence[str] = FIELDS
+               ) -> Tuple[Dict[str, int], List[Tuple[str, Dict[str, Any], Dict[str, Any]]]]:
+    """原地更新 records 中的 fields，返回 (每个字段改动的记录数, [(名称, 原值, 新值), ...])"""
+    counts = {field: 0 for field in fields}
+    changed = []
+    for record in records:
+        derived = dict(zip(FIELDS, categorize_food(record['name'])))
+        before = {field: record.get(field) for field in fields if record.get(field) != derived[field]}
+        if before:
+            for field in before:
+                record[field] = derived[field]
+                counts[field] += 1
+            changed.append((record['name'], before, {field: record[field] for field in before}))
+    return counts, changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按当前的分类规则重新计算食物的类别、emoji 和分量")
+    parser.add_argument("catalog", help="食物数据文件（data.json 格式）")
+    parser.add_argument("--output", help="输出文件，默认覆盖输入文件")
+    parser.add_argument("--fields", nargs="+", choices=FIELDS, default=list(FIELDS), help="要更新的字段")
+    parser.add_argument("--dry-run", action="store_true", help="只显示会改动的记录，不写文件")
+    args = parser.parse_args()
+
+    with open(args.catalog, encoding="utf-8") as f:
+        records = json.load(f)
+
+    start = time.perf_counter()
+    counts, changed = reclassify(records, args.fields)
+    elapsed = time.perf_counter() - start
+    summary = "，".join(f"{field} {count} 条" for field, count in counts.items())
+    print(f"🏷️ {len(records)} 条记录重新分类，耗时 {elapsed * 1000:.0f}ms：{len(changed)} 条有变化（{summary}）")
+
+    if args.dry_run:
+        for name, before, after in changed[:20]:
+            print(f"   {name}: " + "，".join(f"{field} {before[field]} -> {after[field]}" for field in before))
+        if len(changed) > 20:
+            print(f"   ... 还有 {len(changed) - 20} 条")
+        return
+
+    output = args.output or args.catalog
+    if not changed and output == args.catalog:
+        print("✅ 没有需要更新的记录")
+        return
+    # 与服务加载时相同的校验，避免写出服务无法加载的文件
+    for record in records:
+        FoodItem(**record)
+    write_json_atomic(output, records)
+    print(f"💾 已写入 {output}")
+
+
+if __name__ == "__main__":
+    main()
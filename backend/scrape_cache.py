@@ -0,0 +1,111 @@
+"""爬虫的持久化缓存（SQLite），按搜索词和页面标题缓存维基百科的响应"""
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, NamedTuple, Optional
+
+
+class CacheMiss(Exception):
+    """离线模式下缓存中没有需要的数据"""
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    fresh: bool
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class ScrapeCache:
+    """带过期时间和容量上限的持久化缓存
+
+    - 超过 ``ttl`` 秒的条目视为过期：在线时需要重新验证或重新获取，
+      离线模式下仍然可以使用
+    - 总大小超过 ``max_bytes`` 时按最近访问时间淘汰最旧的条目
+    - 条目可以附带 ETag / Last-Modified，用于条件请求
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, max_bytes: int = 512 * 2 ** 20,
+                 offline: bool = False):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+        """)
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """读取条目（无论是否过期），不存在时返回 None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, etag, last_modified, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = time.time()
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        value, etag, last_modified, stored_at = row
+        return CacheEntry(json.loads(value), now - stored_at < self.ttl, etag, last_modified)
+
+    def put(self, key: str, value: Any, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """写入条目并在超出容量时淘汰最久未访问的条目"""
+        if self.offline:
+            return
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(key) + len(data.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, data, etag, last_modified, now, now, size),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict()
+            self._db.commit()
+
+    def touch(self, key: str):
+        """重新验证通过（内容未变），刷新条目的存储时间"""
+        if self.offline:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self._db.commit()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def close(self):
+        with self._lock:
+            self._db.close()
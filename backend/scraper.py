@@ -2,51 +2,140 @@ import requests
 import wikipedia
 from bs4 import BeautifulSoup
 import re
-from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterator, List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
 import json
 import os
 
+from keyword_rules import KeywordRules, any_of, each_of
+from portions import STANDARD_PORTIONS, PortionMatcher
+from scrape_cache import CacheMiss, ScrapeCache
+from throttle import HostThrottle, RateLimiter, retry_with_backoff
+from wiki_fetch import MediaWikiFetcher, WikipediaLibFetcher
+
+# 可以通过重试解决的临时性错误（网络异常、超时、限流时返回的非 JSON 页面等）
+TRANSIENT_ERRORS = (requests.exceptions.RequestException, wikipedia.exceptions.HTTPTimeoutError)
+
+# 基于真实页面分析的热量提取模式，按优先级排列：(正则, 单位类型, 必需关键词)
+# 模块加载时编译一次；必需关键词是任何匹配都一定包含的子串，用于快速预检
+_CALORIE_PATTERN_SPECS = [
+    # 基于牛奶页面的成功模式："一杯500毫升的纯牛乳，热量在300大卡左右"
+    (r'一[杯瓶罐份块个]\s*(\d+)\s*[毫升克ml g]*[^，。]*?热量[在约为]*\s*(\d+)\s*[千大]*卡', 'specific_portion', '热量'),
+    (r'(\d+)\s*[毫升克ml g]+[^，。]*?热量[在约为]*\s*(\d+)\s*[千大]*卡', 'specific_portion', '热量'),
+    
+    # 基于巧克力页面的成功模式："100克的牛奶巧克力可以提供540卡路里的能量"
+    (r'(\d+)\s*克[^，。]*?提供\s*(\d+)\s*卡路里', '100g_energy', '卡路里'),
+    (r'(\d+)\s*克[^，。]*?含有\s*(\d+)\s*[千大]*卡', '100g_energy', '含有'),
+    (r'(\d+)\s*克[^，。]*?能量\s*(\d+)\s*[千大]*卡', '100g_energy', '能量'),
+    
+    # 专门的热量章节模式
+    (r'==\s*热量\s*==[^=]*?(\d+)\s*[千大]*卡', 'calorie_section', '热量'),
+    (r'热量\s*[:：]\s*(\d+)', 'calorie_label', '热量'),
+    (r'能量\s*[:：]\s*(\d+)', 'energy_label', '能量'),
+    
+    # 营养成分表格模式
+    (r'营养成分[^。]*?热量[^。]*?(\d+)', 'nutrition_table', '营养成分'),
+    (r'每100[克毫升gml][^。]*?(\d+)\s*[千大]*卡', '100g', '每100'),
+    (r'(\d+)\s*[千大]*卡[^。]*?每100[克毫升gml]', '100g', '每100'),
+    
+    # 通用模式（优先级较低）
+    (r'热量[约大概为是在]*\s*(\d+)\s*[千大]*卡', 'general', '热量'),
+    (r'能量[约大概为是在]*\s*(\d+)\s*[千大]*卡', 'general', '能量'),
+    # kcal 不区分大小写，不做子串预检
+    (r'(\d+)\s*kcal', 'kcal', None),
+]
+
+CALORIE_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), unit_type, keyword)
+    for pattern, unit_type, keyword in _CALORIE_PATTERN_SPECS
+]
+
+# 关键词规则表，模块加载时编译成自动机（见 keyword_rules）
+
+# 食物分类，按顺序取第一条命中的规则：((类别, emoji, 分量), 关键词)
+CATEGORY_RULES: KeywordRules[Tuple[str, str, str]] = KeywordRules([
+    (('drinks', '🥤', '250ml'), ['可乐', '奶茶', '咖啡', '果汁', '牛奶', '酸奶', '豆浆', '烧仙草']),
+    (('snacks', '🍿', '100g'), ['薯片', '饼干', '爆米花', '坚果', '炸春卷', '油条', '甜甜圈']),
+    (('meat', '🍖', '1份'), ['鸡腿', '牛排', '排骨', '猪蹄', '鳗鱼', '牛肉', '虾仁', '香肠', '热狗']),
+    (('desserts', '🍰', '1块'), ['蛋糕', '巧克力', '甜甜圈', '布丁']),
+    (('fruits', '🥬', '1份'), ['苹果', '香蕉', '西瓜', '菠菜', '苦瓜', '茄子', '玉米', '土豆']),
+    (('staples', '🍚', '1份'), ['面', '饭', '汉堡', '三明治', '咖喱', '沙拉', '热干面', '担担面', '拌面']),
+], default=('other', '🍽️', '1份'))
+
+# 标题包含这些关键词的页面与食物无关
+IRRELEVANT_TITLE_KEYWORDS = any_of([
+    '公司', '集团', '企业', '品牌', '商标', '历史', '文化',
+    '节日', '传说', '故事', '电影', '小说', '歌曲', '游戏',
+    '地名', '人名', '化学', '医学', '药物', '疾病'
+])
+
+# 歧义页中优先选择包含这些关键词的选项
+FOOD_OPTION_KEYWORDS = any_of(['食品', '食物', '菜', '饮料', '饮品', '小吃', '点心', '料理'])
+
+# 正文中出现其中两个以上的关键词时认为页面与食物相关
+# 关键词只含汉字和数字，不受大小写影响，直接在原文中查找
+FOOD_PAGE_KEYWORDS = each_of([
+    '营养', '热量', '卡路里', '蛋白质', '脂肪', '碳水化合物',
+    '维生素', '矿物质', '食用', '食品', '饮食', '烹饪',
+    '每100克', '每100毫升', '能量', '膳食', '营养成分',
+    '食谱', '制作', '原料', '配料', '口感', '味道'
+])
+
+class WikiPage:
+    """可缓存的页面数据，提供 get_food_calories 用到的 wikipedia.WikipediaPage 属性"""
+    
+    def __init__(self, title: str, url: str, content: str, revision_id: Optional[int] = None,
+                 summary: Optional[str] = None):
+        self.title = title
+        self.url = url
+        self.content = content
+        self.revision_id = revision_id
+        self.summary = summary
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'title': self.title, 'url': self.url, 'content': self.content,
+                'revision_id': self.revision_id}
+
 class WikipediaFoodScraper:
-    def __init__(self):
+    def __init__(self, api_url: Optional[str] = None, requests_per_second: float = 5.0,
+                 host_interval: float = 0.2, max_retries: int = 3, backoff: float = 1.0,
+                 cache: Optional[ScrapeCache] = None, backend: str = 'api'):
+        """
+        api_url: MediaWiki API 地址，默认中文维基百科，测试时可指向本地桩服务
+        requests_per_second: 所有线程合计的请求速率上限（<= 0 不限速）
+        host_interval: 对同一站点相邻两次请求的最小间隔（秒）
+        max_retries / backoff: 临时性错误的重试次数与初始退避时间（秒）
+        cache: 搜索结果和页面的持久化缓存；缓存为离线模式时不会发出任何请求
+        backend: 'api' 直接调用 MediaWiki API，一次请求批量加载全部搜索结果；
+                 'wikipedia' 通过 wikipedia 库逐页加载
+        """
         # 设置中文维基百科
         wikipedia.set_lang("zh")
+        if api_url:
+            # set_lang 修改的是 wikipedia.wikipedia 模块内的全局变量
+            wikipedia.wikipedia.API_URL = api_url
+        self.api_url = wikipedia.wikipedia.API_URL
+        self.host = urlsplit(self.api_url).netloc
+        self.cache = cache
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.host_throttle = HostThrottle(host_interval)
+        self.max_retries = max_retries
+        self.backoff = backoff
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'CalorieChecker/1.0 (Educational Purpose)'
         })
+        if backend == 'api':
+            self.fetcher = MediaWikiFetcher(self._get_json)
+        elif backend == 'wikipedia':
+            self.fetcher = WikipediaLibFetcher(self._get_json, self._request)
+        else:
+            raise ValueError(f"未知的抓取后端 '{backend}'")
         
-        # 常见食物的标准分量定义
-        self.standard_portions = {
-            '可乐': {'amount': 330, 'unit': 'ml'},
-            '雪碧': {'amount': 330, 'unit': 'ml'},
-            '果汁': {'amount': 250, 'unit': 'ml'},
-            '奶茶': {'amount': 500, 'unit': 'ml'},
-            '咖啡': {'amount': 240, 'unit': 'ml'},
-            '牛奶': {'amount': 250, 'unit': 'ml'},
-            '酸奶': {'amount': 150, 'unit': 'g'},
-            '鸡腿': {'amount': 100, 'unit': 'g'},
-            '鸡翅': {'amount': 100, 'unit': 'g'},
-            '牛排': {'amount': 150, 'unit': 'g'},
-            '排骨': {'amount': 100, 'unit': 'g'},
-            '热狗': {'amount': 1, 'unit': '根'},
-            '香肠': {'amount': 100, 'unit': 'g'},
-            '汉堡': {'amount': 1, 'unit': '个'},
-            '三明治': {'amount': 1, 'unit': '个'},
-            '薯片': {'amount': 50, 'unit': 'g'},
-            '饼干': {'amount': 100, 'unit': 'g'},
-            '巧克力': {'amount': 50, 'unit': 'g'},
-            '蛋糕': {'amount': 1, 'unit': '块'},
-            '甜甜圈': {'amount': 1, 'unit': '个'},
-            '面条': {'amount': 100, 'unit': 'g'},
-            '米饭': {'amount': 150, 'unit': 'g'},
-            '面包': {'amount': 100, 'unit': 'g'},
-            '苹果': {'amount': 1, 'unit': '个'},
-            '香蕉': {'amount': 1, 'unit': '根'},
-            '橙子': {'amount': 1, 'unit': '个'},
-            '土豆': {'amount': 150, 'unit': 'g'},
-            '玉米': {'amount': 150, 'unit': 'g'},
-            '沙拉': {'amount': 200, 'unit': 'g'},
-        }
+        # 常见食物的标准分量定义；编译成 PortionMatcher，整体替换（重新赋值）后自动重新编译
+        self.standard_portions = dict(STANDARD_PORTIONS)
+        self._portion_matcher = PortionMatcher(self.standard_portions)
         
         # 基于真实页面分析的搜索策略优化
         self.search_strategies = {
@@ -66,11 +155,14 @@ class WikipediaFoodScraper:
             for search_term in search_terms:
                 try:
                     print(f"   尝试搜索: {search_term}")
-                    search_results = wikipedia.search(search_term, results=5)
+                    search_results, pages = self._search_pages(search_term, results=5)
                     
                     for result in search_results:
                         try:
-                            page = wikipedia.page(result)
+                            if result in pages:
+                                page = self._page_from_entry(result, pages[result])
+                            else:
+                                page = self._load_page(result)
                             
                             # 跳过明显不相关的页面
                             if self._is_irrelevant_page(page.title, food_name):
@@ -84,32 +176,17 @@ class WikipediaFoodScraper:
                             calories_info = self._extract_calories_from_content(page.content, food_name)
                             if calories_info:
                                 print(f"   ✅ 找到数据: {calories_info['calories']}卡/{calories_info['portion']}")
-                                return {
-                                    'name': food_name,
-                                    'calories': calories_info['calories'],
-                                    'portion': calories_info['portion'],
-                                    'original_data': calories_info['original_data'],
-                                    'source': page.url,
-                                    'summary': page.summary[:200] + "..."
-
-                                }
+                                return self._food_result(food_name, page, calories_info)
                                 
                         except wikipedia.exceptions.DisambiguationError as e:
                             # 智能处理歧义页面
                             best_option = self._find_best_disambiguation_option(e.options, food_name)
                             if best_option:
                                 try:
-                                    page = wikipedia.page(best_option)
+                                    page = self._load_page(best_option)
                                     calories_info = self._extract_calories_from_content(page.content, food_name)
                                     if calories_info:
-                                        return {
-                                            'name': food_name,
-                                            'calories': calories_info['calories'],
-                                            'portion': calories_info['portion'],
-                                            'original_data': calories_info['original_data'],
-                                            'source': page.url,
-                                            'summary': page.summary[:200] + "..."
-                                        }
+                                        return self._food_result(food_name, page, calories_info)
                                 except:
                                     continue
                         except Exception as e:
@@ -126,6 +203,183 @@ class WikipediaFoodScraper:
             print(f"获取 {food_name} 信息时出错: {e}")
             return None
     
+    def _food_result(self, food_name: str, page: WikiPage, calories_info: Dict) -> Dict:
+        """由提取到的热量信息和来源页面组成一个食物的抓取结果"""
+        return {
+            'name': food_name,
+            'calories': calories_info['calories'],
+            'portion': calories_info['portion'],
+            'original_data': calories_info['original_data'],
+            'source': page.url,
+            # 来源页面的标题和修订号，用于增量刷新时判断页面是否有更新
+            'source_title': page.title,
+            'source_revision': page.revision_id,
+            'summary': self._get_summary(page)[:200] + "..."
+        }
+    
+    def _request(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """经过全局限速、站点礼貌间隔和失败重试后执行一次维基百科调用"""
+        def attempt():
+            self.rate_limiter.acquire()
+            self.host_throttle.wait(self.host)
+            return func(*args, **kwargs)
+        
+        return retry_with_backoff(attempt, retries=self.max_retries,
+                                  base_delay=self.backoff, retry_on=TRANSIENT_ERRORS)
+    
+    def _cached(self, key: str):
+        """读取缓存条目：返回可直接使用的条目，或返回 (None, 过期条目)"""
+        entry = self.cache.get(key) if self.cache else None
+        if entry is None:
+            if self.cache and self.cache.offline:
+                raise CacheMiss(key)
+            return None, None
+        if entry.fresh or self.cache.offline:
+            return entry, None
+        return None, entry
+    
+    def _search(self, search_term: str, results: int = 5) -> List[str]:
+        """搜索维基百科（优先使用缓存）"""
+        key = f"search:{results}:{search_term}"
+        entry, _ = self._cached(key)
+        if entry:
+            return entry.value
+        titles = self.fetcher.search(search_term, results)
+        if self.cache:
+            self.cache.put(key, titles)
+        return titles
+    
+    def _search_pages(self, search_term: str, results: int = 5) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+        """搜索并取回不需额外请求就能得到的结果页面，返回 (标题列表, 标题 -> 页面字典)
+
+        字典中只有缓存中可用的页面和搜索请求顺带返回正文的页面，其余页面由调用方
+        按需加载（全文正文每次请求只能取一个页面，提前全部加载并不省请求）。
+        抓取后端不支持批量加载时只搜索。缓存的搜索结果过期时重新搜索，同时取回
+        修订号，用来核对缓存的页面。
+        """
+        if self.fetcher.batch_size <= 1:
+            return self._search(search_term, results), {}
+        key = f"search:{results}:{search_term}"
+        entry, old = self._cached(key)
+        if entry:
+            return entry.value, self._load_pages(entry.value, fetch=False)
+        if old:
+            # 搜索结果过期时页面大多也已缓存：重新搜索时只取回各页面的修订号，
+            # 交给 _load_pages 核对，未变化的页面不必重新下载正文
+            titles, revisions = self.fetcher.search_revisions(search_term, results)
+            self.cache.put(key, titles)
+            return titles, self._load_pages(titles, revisions, fetch=False)
+        titles, pages = self.fetcher.search_pages(search_term, results)
+        if self.cache:
+            self.cache.put(key, titles)
+            for title, value in pages.items():
+                self.cache.put(f"page:{title}", value)
+        return titles, pages
+    
+    def _load_page(self, title: str) -> WikiPage:
+        """加载页面及正文（优先使用缓存）"""
+        return self._page_from_entry(title, self._load_pages([title])[title])
+    
+    def _load_pages(self, titles: List[str], revisions: Optional[Dict[str, Optional[int]]] = None,
+                    fetch: bool = True) -> Dict[str, Dict[str, Any]]:
+        """批量加载页面，返回 标题 -> 可缓存的页面字典
+
+        优先使用缓存；过期条目先用一次请求批量核对修订号（revisions 中已有的
+        当前修订号直接使用），未变化的继续使用缓存内容，其余标题交给抓取后端批量加载。
+        fetch 为 False 时不加载，结果中只有缓存中可用的页面。
+        """
+        entries: Dict[str, Dict[str, Any]] = {}
+        stale: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for title in dict.fromkeys(titles):
+            try:
+                entry, old = self._cached(f"page:{title}")
+            except CacheMiss:
+                # 离线模式下缓存中没有的页面：需要加载时照常报错，否则留给调用方
+                if fetch:
+                    raise
+                continue
+            if entry:
+                entries[title] = entry.value
+            elif old and old.value.get('revision_id'):
+                stale[title] = old.value
+            else:
+                missing.append(title)
+        
+        if stale:
+            current = dict(revisions or {})
+            unknown = [cached['title'] for cached in stale.values() if cached['title'] not in current]
+            if unknown:
+                try:
+                    current.update(self.fetcher.revisions(unknown))
+                except (KeyError, *TRANSIENT_ERRORS):
+                    pass
+            for title, cached in stale.items():
+                if current.get(cached['title']) == cached['revision_id']:
+                    self.cache.touch(f"page:{title}")
+                    entries[title] = cached
+                else:
+                    missing.append(title)
+        
+        if missing and fetch:
+            for title, value in self.fetcher.fetch(missing).items():
+                if self.cache:
+                    self.cache.put(f"page:{title}", value)
+                entries[title] = value
+        return entries
+    
+    def _page_from_entry(self, title: str, cached: Dict[str, Any]) -> WikiPage:
+        """把页面字典转换为 WikiPage；歧义页和不存在的页面与 wikipedia 库一样抛出异常"""
+        if 'disambiguation' in cached:
+            raise wikipedia.exceptions.DisambiguationError(cached['title'], cached['disambiguation'])
+        if cached.get('missing'):
+            raise wikipedia.exceptions.PageError(title)
+        return WikiPage(**cached)
+    
+    def _get_summary(self, page: WikiPage) -> str:
+        """获取页面摘要（按需请求并缓存）"""
+        if page.summary is None:
+            data = self._get_json(
+                {'prop': 'extracts', 'explaintext': '', 'exintro': '', 'titles': page.title},
+                cache_key=f"summary:{page.title}",
+            )
+            page.summary = next(iter(data['query']['pages'].values())).get('extract', '')
+        return page.summary
+    
+    def _get_json(self, params: Dict[str, Any], cache_key: Optional[str] = None) -> Dict[str, Any]:
+        """用 requests.Session 直接调用 MediaWiki API
+
+        指定 cache_key 时结果会被缓存；过期条目带着 ETag / Last-Modified
+        发起条件请求，服务端返回 304 时直接沿用缓存。
+        """
+        entry, stale = self._cached(cache_key) if cache_key else (None, None)
+        if entry:
+            return entry.value
+        
+        headers = {}
+        if stale and stale.etag:
+            headers['If-None-Match'] = stale.etag
+        if stale and stale.last_modified:
+            headers['If-Modified-Since'] = stale.last_modified
+        
+        def fetch():
+            response = self.session.get(self.api_url, params={**params, 'action': 'query', 'format': 'json'},
+                                        headers=headers, timeout=30)
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+        
+        response = self._request(fetch)
+        if response.status_code == 304:
+            self.cache.touch(cache_key)
+            return stale.value
+        
+        data = response.json()
+        if cache_key and self.cache:
+            self.cache.put(cache_key, data, etag=response.headers.get('ETag'),
+                           last_modified=response.headers.get('Last-Modified'))
+        return data
+    
     def _get_optimized_search_terms(self, food_name: str) -> List[str]:
         """基于真实页面分析获取优化的搜索词"""
         # 如果有特定的搜索策略，使用它
@@ -143,30 +397,47 @@ class WikipediaFoodScraper:
             f"{food_name} 营养信息"
         ]
     
-    def get_food_data_batch(self, food_list: List[str]) -> List[Dict]:
-        """批量获取食物数据"""
-        results = []
-        for food in food_list:
-            print(f"正在处理: {food}")
-            data = self.get_food_calories(food)
+    def get_food_data_batch(self, food_list: List[str], workers: int = 1) -> List[Dict]:
+        """批量获取食物数据，workers > 1 时并发抓取，结果仍按输入顺序返回"""
+        results: Dict[int, Dict] = {}
+        for index, food, data in self._crawl(food_list, workers):
             if data:
-                results.append(data)
+                results[index] = data
                 print(f"✅ {food}: {data['calories']}卡/{data['portion']}")
             else:
                 print(f"❌ {food}: 未找到数据")
-        return results
+        return [results[index] for index in sorted(results)]
+    
+    def iter_food_data(self, food_list: List[str], workers: int = 4) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """并发抓取，每完成一个食物就立即产出 (食物名, 结果或 None)"""
+        for _, food, data in self._crawl(food_list, workers):
+            yield food, data
+    
+    def _crawl(self, food_list: List[str], workers: int) -> Iterator[Tuple[int, str, Optional[Dict]]]:
+        """按完成顺序产出 (输入位置, 食物名, 结果)；请求速率由限速器统一控制"""
+        def crawl_one(food: str) -> Optional[Dict]:
+            print(f"正在处理: {food}")
+            return self.get_food_calories(food)
+        
+        if workers <= 1:
+            for index, food in enumerate(food_list):
+                yield index, food, crawl_one(food)
+            return
+        
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="food-crawler")
+        try:
+            futures = {pool.submit(crawl_one, food): index for index, food in enumerate(food_list)}
+            for future in as_completed(futures):
+                index = futures[future]
+                yield index, food_list[index], future.result()
+        finally:
+            # 调用方提前停止迭代时，取消尚未开始的任务
+            pool.shutdown(wait=False, cancel_futures=True)
 
     def _is_irrelevant_page(self, page_title: str, food_name: str) -> bool:
         """判断页面是否与食物不相关"""
-        irrelevant_keywords = [
-            '公司', '集团', '企业', '品牌', '商标', '历史', '文化', 
-            '节日', '传说', '故事', '电影', '小说', '歌曲', '游戏',
-            '地名', '人名', '化学', '医学', '药物', '疾病'
-        ]
-        
-        for keyword in irrelevant_keywords:
-            if keyword in page_title:
-                return True
+        if IRRELEVANT_TITLE_KEYWORDS.matches(page_title):
+            return True
         
         # 如果页面标题与食物名称相关性很低，也认为是不相关的
         if food_name not in page_title and not any(char in page_title for char in food_name):
@@ -176,11 +447,9 @@ class WikipediaFoodScraper:
     
     def _find_best_disambiguation_option(self, options: List[str], food_name: str) -> Optional[str]:
         """从歧义选项中找到最佳匹配"""
-        food_keywords = ['食品', '食物', '菜', '饮料', '饮品', '小吃', '点心', '料理']
-        
         for option in options:
             # 优先选择包含食物关键词的选项
-            if any(keyword in option for keyword in food_keywords):
+            if FOOD_OPTION_KEYWORDS.matches(option):
                 return option
             # 或者选择与食物名称最相似的选项
             if food_name in option:
@@ -192,42 +461,19 @@ class WikipediaFoodScraper:
     def _extract_calories_from_content(self, content: str, food_name: str) -> Optional[Dict]:
         """从页面内容中提取热量信息并进行份量换算 - 基于真实页面分析优化"""
         
-        # 基于真实页面分析的优化模式
-        calorie_patterns = [
-            # 基于牛奶页面的成功模式："一杯500毫升的纯牛乳，热量在300大卡左右"
-            (r'一[杯瓶罐份块个]\s*(\d+)\s*[毫升克ml g]*[^，。]*?热量[在约为]*\s*(\d+)\s*[千大]*卡', 'specific_portion'),
-            (r'(\d+)\s*[毫升克ml g]+[^，。]*?热量[在约为]*\s*(\d+)\s*[千大]*卡', 'specific_portion'),
-            
-            # 基于巧克力页面的成功模式："100克的牛奶巧克力可以提供540卡路里的能量"
-            (r'(\d+)\s*克[^，。]*?提供\s*(\d+)\s*卡路里', '100g_energy'),
-            (r'(\d+)\s*克[^，。]*?含有\s*(\d+)\s*[千大]*卡', '100g_energy'),
-            (r'(\d+)\s*克[^，。]*?能量\s*(\d+)\s*[千大]*卡', '100g_energy'),
-            
-            # 专门的热量章节模式
-            (r'==\s*热量\s*==[^=]*?(\d+)\s*[千大]*卡', 'calorie_section'),
-            (r'热量\s*[:：]\s*(\d+)', 'calorie_label'),
-            (r'能量\s*[:：]\s*(\d+)', 'energy_label'),
-            
-            # 营养成分表格模式
-            (r'营养成分[^。]*?热量[^。]*?(\d+)', 'nutrition_table'),
-            (r'每100[克毫升gml][^。]*?(\d+)\s*[千大]*卡', '100g'),
-            (r'(\d+)\s*[千大]*卡[^。]*?每100[克毫升gml]', '100g'),
-            
-            # 通用模式（优先级较低）
-            (r'热量[约大概为是在]*\s*(\d+)\s*[千大]*卡', 'general'),
-            (r'能量[约大概为是在]*\s*(\d+)\s*[千大]*卡', 'general'),
-            (r'(\d+)\s*kcal', 'kcal'),
-        ]
-        
-        for pattern, unit_type in calorie_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            if matches:
+        for pattern, unit_type, keyword in CALORIE_PATTERNS:
+            # 正文中没有该模式必需的关键词时直接跳过，省去一次完整的正则扫描
+            if keyword and keyword not in content:
+                continue
+            # 只用到第一个匹配，search 找到后即停止，结果与 findall(...)[0] 相同
+            match = pattern.search(content)
+            if match:
                 try:
                     # 处理不同的匹配结果格式
                     if unit_type in ['specific_portion', '100g_energy']:
                         # 这些模式有两个数字：分量和热量
-                        if len(matches[0]) == 2:
-                            portion_amount, calories_value = matches[0]
+                        if len(match.groups()) == 2:
+                            portion_amount, calories_value = match.groups()
                             portion_amount = int(portion_amount)
                             calories_value = int(calories_value)
                             
@@ -243,7 +489,7 @@ class WikipediaFoodScraper:
                                     return converted
                     else:
                         # 单个数字的模式
-                        calories_value = int(matches[0])
+                        calories_value = int(match.group(1))
                         
                         # 判断数值合理性
                         if self._is_reasonable_calorie_value(calories_value, unit_type, food_name):
@@ -406,47 +652,18 @@ class WikipediaFoodScraper:
     
     def _get_standard_portion(self, food_name: str) -> Dict[str, any]:
         """获取食物的标准分量"""
-        
-        # 精确匹配
-        if food_name in self.standard_portions:
-            return self.standard_portions[food_name]
-        
-        # 模糊匹配
-        for key in self.standard_portions:
-            if key in food_name or food_name in key:
-                return self.standard_portions[key]
-        
-        # 根据食物类型推断标准分量
-        if any(drink in food_name for drink in ['可乐', '汽水', '饮料', '果汁']):
-            return {'amount': 330, 'unit': 'ml'}
-        elif any(meat in food_name for meat in ['肉', '鸡', '牛', '猪', '鱼']):
-            return {'amount': 100, 'unit': 'g'}
-        elif any(snack in food_name for snack in ['薯片', '饼干', '巧克力']):
-            return {'amount': 50, 'unit': 'g'}
-        elif any(staple in food_name for staple in ['面', '饭', '粥']):
-            return {'amount': 150, 'unit': 'g'}
-        else:
-            return {'amount': 100, 'unit': 'g'}  # 默认分量
+        if self._portion_matcher.portions is not self.standard_portions:
+            self._portion_matcher = PortionMatcher(self.standard_portions)
+        return self._portion_matcher.match(food_name)
     
     def _is_food_related_page(self, content: str, food_name: str) -> bool:
         """检查页面内容是否与食物相关"""
-        food_keywords = [
-            '营养', '热量', '卡路里', '蛋白质', '脂肪', '碳水化合物',
-            '维生素', '矿物质', '食用', '食品', '饮食', '烹饪',
-            '每100克', '每100毫升', '能量', '膳食', '营养成分',
-            '食谱', '制作', '原料', '配料', '口感', '味道'
-        ]
-        
-        # 检查内容中是否包含食物相关关键词
-        content_lower = content.lower()
-        food_keyword_count = sum(1 for keyword in food_keywords if keyword in content_lower)
-        
-        # 如果包含多个食物关键词，认为是相关的
-        if food_keyword_count >= 2:
+        # 如果包含多个食物关键词，认为是相关的（数到两个就停止）
+        if FOOD_PAGE_KEYWORDS.count(content, limit=2) >= 2:
             return True
         
         # 检查是否包含食物名称
-        if food_name.lower() in content_lower:
+        if food_name.lower() in content.lower():
             return True
         
         return False
@@ -457,57 +674,33 @@ def load_crawled_data():
         with open('crawled_foods.json', 'r', encoding='utf-8') as f:
             crawled_data = json.load(f)
         
-        converted_foods = []
-        for i, food in enumerate(crawled_data, 1):
-            # 智能分类和emoji分配
-            category, emoji, portion = categorize_food(food['name'])
-            
-            converted_food = {
-                'id': str(i),
-                'name': food['name'],
-                'category': category,
-                'calories': food['calories'],
-                'calorie_level': food['calorie_level'],
-                'portion': portion,
-                'emoji': emoji,
-                'description': food['summary'][:100] + "..." if len(food['summary']) > 100 else food['summary']
-            }
-            converted_foods.append(converted_food)
-        
-        return converted_foods
+        return [to_food_item(i, food) for i, food in enumerate(crawled_data, 1)]
     except FileNotFoundError:
         print("未找到爬取的数据文件，使用空数据")
         return []
 
-def categorize_food(food_name):
-    """根据食物名称智能分类并分配emoji和份量"""
-    
-    # 饮料类
-    if any(drink in food_name for drink in ['可乐', '奶茶', '咖啡', '果汁', '牛奶', '酸奶', '豆浆', '烧仙草']):
-        return 'drinks', '🥤', '250ml'
+def to_food_item(index: int, food: Dict) -> Dict:
+    """把一条爬取结果转换为 data.json 中的食物记录，index 作为 ID"""
+    # 智能分类和emoji分配
+    category, emoji, portion = categorize_food(food['name'])
     
-    # 零食类
-    if any(snack in food_name for snack in ['薯片', '饼干', '爆米花', '坚果', '炸春卷', '油条', '甜甜圈']):
-        return 'snacks', '🍿', '100g'
-    
-    # 肉类
-    if any(meat in food_name for meat in ['鸡腿', '牛排', '排骨', '猪蹄', '鳗鱼', '牛肉', '虾仁', '香肠', '热狗']):
-        return 'meat', '🍖', '1份'
-    
-    # 甜品类
-    if any(dessert in food_name for dessert in ['蛋糕', '巧克力', '甜甜圈', '布丁']):
-        return 'desserts', '🍰', '1块'
-    
-    # 水果蔬菜类
-    if any(fruit in food_name for fruit in ['苹果', '香蕉', '西瓜', '菠菜', '苦瓜', '茄子', '玉米', '土豆']):
-        return 'fruits', '🥬', '1份'
-    
-    # 主食类
-    if any(staple in food_name for staple in ['面', '饭', '汉堡', '三明治', '咖喱', '沙拉', '热干面', '担担面', '拌面']):
-        return 'staples', '🍚', '1份'
-    
-    # 默认分类
-    return 'other', '🍽️', '1份'
+    return {
+        'id': str(index),
+        'name': food['name'],
+        'category': category,
+        'calories': food['calories'],
+        # get_food_calories 的结果中没有热量等级，按热量计算
+        'calorie_level': food.get('calorie_level') or calculate_calorie_level(food['calories']),
+        'portion': portion,
+        'emoji': emoji,
+        'description': food['summary'][:100] + "..." if len(food['summary']) > 100 else food['summary'],
+        'source': food.get('source', ''),
+        'summary': food['summary']
+    }
+
+def categorize_food(food_name):
+    """根据食物名称智能分类并分配emoji和份量（规则见 CATEGORY_RULES）"""
+    return CATEGORY_RULES.classify(food_name)
 
 def calculate_calorie_level(calories: int) -> int:
     """根据热量值计算等级（1-5星）"""
@@ -0,0 +1,80 @@
+"""食物名称的 n-gram 倒排索引"""
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, Mapping, Optional, Sequence
+
+
+def _grams(text: str) -> set:
+    """提取文本中所有的单字和双字片段（按字符切分，天然支持中日韩文字）"""
+    grams = set(text)
+    for i in range(len(text) - 1):
+        grams.add(text[i:i + 2])
+    return grams
+
+
+def _contains(posting: array, row: int) -> bool:
+    """在有序的倒排列表中二分查找行号"""
+    i = bisect_left(posting, row)
+    return i < len(posting) and posting[i] == row
+
+
+class NgramIndex:
+    """基于字符 unigram/bigram 的倒排索引
+
+    每个片段对应一个按行号升序排列的倒排列表。子串查询先对查询词的所有
+    bigram 求交集得到候选行，再逐个校验，结果与线性扫描
+    ``query in name.lower()`` 完全一致且保持原数据顺序。
+
+    传入 ``postings`` 时直接使用已建好的倒排列表（例如从快照文件映射），
+    它只需提供 ``get(gram)``，返回的列表支持下标访问即可。
+    """
+
+    def __init__(self, names: Sequence[str], postings: Optional[Mapping[str, Sequence[int]]] = None):
+        self._names = names
+        if postings is not None:
+            self._postings = postings
+            return
+        postings: Dict[str, array] = {}
+        for row, name in enumerate(names):
+            for gram in _grams(name.lower()):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('I')
+                posting.append(row)
+        # 行号按顺序追加，因此每个倒排列表天然有序且无重复
+        self._postings = postings
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def postings(self) -> Mapping[str, Sequence[int]]:
+        """片段到倒排列表的映射"""
+        return self._postings
+
+    def search(self, query: str) -> Iterator[int]:
+        """按数据顺序返回名称包含 query 的行号（query 需已转为小写）"""
+        if not query:
+            yield from range(len(self._names))
+            return
+
+        # 单字查询直接返回倒排列表，无需校验
+        if len(query) == 1:
+            yield from self._postings.get(query, ())
+            return
+
+        postings = []
+        for gram in {query[i:i + 2] for i in range(len(query) - 1)}:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return
+            postings.append(posting)
+
+        # 从最短的倒排列表出发，在其余列表中二分查找
+        postings.sort(key=len)
+        shortest, others = postings[0], postings[1:]
+        for row in shortest:
+            if all(_contains(posting, row) for posting in others):
+                # bigram 全部命中不代表连续出现，需要校验原文
+                if query in self._names[row].lower():
+                    yield row
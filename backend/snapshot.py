@@ -0,0 +1,426 @@
+"""只读数据快照文件：把 FoodDataset 的存储、索引和统计编译成一个文件，
+启动时直接映射而无需解析 JSON，各个 worker 进程通过 mmap 零拷贝地共享同一份数据
+
+文件结构::
+
+    MAGIC (8 字节) | 格式版本 | 清单长度 | CRC32 (均为 uint32, 小端) | 清单 JSON | 对齐填充 | 数据段...
+
+CRC32 覆盖文件头之后的全部内容。清单中记录数据版本、源文件信息、各数据段的
+位置和元素类型，以及类别划分和统计结果等少量元数据，大小与行数无关。
+数据段包括定长的整数列（热量、热量等级、去重列编码）、字符串池（字符串表，
+包括去重列的取值表）和预先建好的索引，按 8 字节对齐，映射后直接
+``memoryview.cast`` 成整数数组使用，不做任何解析或复制。
+
+用法（在 backend 目录下）:
+    python snapshot.py data.json              # 生成 data.snapshot
+    python snapshot.py --verify data.snapshot
+"""
+import argparse
+import contextlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from calorie_index import CalorieIndex
+from dataset import FoodDataset, file_version
+from food_store import STRING_FIELDS, INTERNED_FIELDS, ColumnarFoodStore, InternedColumn, StringTable
+from search_index import NgramIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+MAGIC = b"CALSNAP\0"
+FORMAT_VERSION = 7
+_HEADER = struct.Struct("<8sIII")
+_ALIGN = 8
+
+# 列式存储中各字段对应的属性名
+_STRING_COLUMNS = {"id": "ids", "name": "names", "source": "sources", "summary": "summaries",
+                   "description": "descriptions"}
+_INTERNED_COLUMNS = {"category": "categories", "portion": "portions", "emoji": "emojis"}
+
+
+class SnapshotError(ValueError):
+    """快照文件损坏、格式不兼容或与当前平台不匹配"""
+
+
+def _typecode(buffer) -> str:
+    """数组的元素类型（兼容 array 和映射得到的 memoryview）"""
+    return getattr(buffer, "typecode", None) or memoryview(buffer).format
+
+
+def _lower_bound(count: int, key_at: Callable[[int], bytes], key: bytes) -> int:
+    """在按字节序升序排列的 count 个键中二分查找 key 的插入位置"""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if key_at(mid) < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class KeyIndex(Mapping):
+    """字符串列（ID、名称）到行号的只读映射：保存按该列排序的行号数组，查找时二分
+
+    重复的键在排序数组中按行号升序相邻，查找返回最前面的一条，
+    与内存中 ``by_id`` / ``by_name`` 以第一条为准的规则一致。
+    """
+
+    def __init__(self, keys: StringTable, order: Sequence[int], unique: int):
+        self._keys = keys
+        self._order = order
+        self._unique = unique
+
+    def __getitem__(self, key: str) -> int:
+        if not isinstance(key, str):
+            raise KeyError(key)
+        encoded = key.encode('utf-8')
+        keys, order = self._keys, self._order
+        i = _lower_bound(len(order), lambda i: keys.get_bytes(order[i]), encoded)
+        if i < len(order) and keys.get_bytes(order[i]) == encoded:
+            return order[i]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        previous = None
+        for row in self._order:
+            key = self._keys[row]
+            if key != previous:
+                yield key
+                previous = key
+
+    def __len__(self) -> int:
+        return self._unique
+
+
+class PostingTable(Mapping):
+    """片段到倒排列表的只读映射：片段按字节序排序，倒排列表首尾相接存放"""
+
+    def __init__(self, grams: StringTable, rows: Sequence[int], offsets: Sequence[int]):
+        self._grams = grams
+        self._rows = rows
+        self._offsets = offsets
+
+    def __getitem__(self, gram: str) -> Sequence[int]:
+        key = gram.encode('utf-8')
+        grams = self._grams
+        i = _lower_bound(len(grams), grams.get_bytes, key)
+        if i < len(grams) and grams.get_bytes(i) == key:
+            return self._rows[self._offsets[i]:self._offsets[i + 1]]
+        raise KeyError(gram)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._grams)
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+
+def _sections(data: FoodDataset) -> Tuple[Dict[str, Any], List[Tuple[str, Any, str]]]:
+    """把数据集拆成清单元数据和 (段名, 缓冲区, 元素类型) 列表"""
+    foods = data.foods
+    sections: List[Tuple[str, Any, str]] = []
+    meta: Dict[str, Any] = {"categories": {}, "unique_ids": len(data.by_id),
+                            "unique_names": len(data.by_name), "calorie_buckets": []}
+
+    def add_table(name: str, table: StringTable):
+        blob, offsets = table.buffers()
+        sections.append((f"{name}.blob", blob, "B"))
+        sections.append((f"{name}.offsets", offsets, _typecode(offsets)))
+
+    for field, attr in _STRING_COLUMNS.items():
+        add_table(field, getattr(foods, attr))
+    add_table("json", foods.json)
+    for field, attr in _INTERNED_COLUMNS.items():
+        column: InternedColumn = getattr(foods, attr)
+        values = column.values
+        if not isinstance(values, StringTable):
+            values = StringTable.build(value.encode('utf-8') for value in values)
+        add_table(f"{field}.values", values)
+        sections.append((f"{field}.codes", column.codes, _typecode(column.codes)))
+    sections.append(("calories", foods.calories, _typecode(foods.calories)))
+    sections.append(("calorie_levels", foods.calorie_levels, _typecode(foods.calorie_levels)))
+
+    # 各类别的行号首尾相接存放，清单中记录每个类别的起止位置
+    category_rows = array('I')
+    for category, rows in data.by_category.items():
+        meta["categories"][category] = [len(category_rows), len(category_rows) + len(rows)]
+        category_rows.extend(rows)
+    sections.append(("category_rows", category_rows, "I"))
+
+    # 按 (ID, 行号) 和 (名称, 行号) 排序的行号，用于二分查找
+    for name, keys in (("id_order", foods.ids), ("name_order", foods.names)):
+        order = array('I', sorted(range(len(foods)), key=lambda row: (keys.get_bytes(row), row)))
+        sections.append((name, order, "I"))
+
+    # 热量索引的各分组首尾相接存放，清单中记录 [类别, 等级, 起, 止]
+    calorie_rows, calorie_values = array('I'), array('i')
+    for (category, level), (rows, values) in data.calorie_index.buckets().items():
+        meta["calorie_buckets"].append([category, level, len(calorie_rows), len(calorie_rows) + len(rows)])
+        calorie_rows.extend(rows)
+        calorie_values.extend(values)
+    sections.append(("calorie_rows", calorie_rows, "I"))
+    sections.append(("calorie_values", calorie_values, "i"))
+
+    postings = data.search_index.postings
+    grams = sorted(postings, key=lambda gram: gram.encode('utf-8'))
+    posting_rows = array('I')
+    posting_offsets = array('Q', [0])
+    for gram in grams:
+        posting_rows.extend(postings[gram])
+        posting_offsets.append(len(posting_rows))
+    add_table("grams", StringTable.build(gram.encode('utf-8') for gram in grams))
+    sections.append(("posting_rows", posting_rows, "I"))
+    sections.append(("posting_offsets", posting_offsets, "Q"))
+    return meta, sections
+
+
+def write_snapshot(data: FoodDataset, path: str, source: Optional[os.stat_result] = None):
+    """把数据集写成快照文件（先写临时文件再原子替换，正在映射旧文件的进程不受影响）
+
+    source 是读取数据文件之前取得的文件状态，用于下次启动时快速判断快照是否过期。
+    """
+    meta, sections = _sections(data)
+    layout: Dict[str, List] = {}
+    position = 0
+    for name, buffer, typecode in sections:
+        nbytes = memoryview(buffer).nbytes
+        layout[name] = [position, nbytes, typecode]
+        position += nbytes + (-nbytes % _ALIGN)
+
+    manifest = json.dumps({
+        "byteorder": sys.byteorder,
+        "version": data.version,
+        "source": None if source is None else {"size": source.st_size, "mtime_ns": source.st_mtime_ns},
+        "rows": len(data),
+        "sections": layout,
+        "stats": data.stats,
+        **meta,
+    }, ensure_ascii=False).encode('utf-8')
+    manifest += b"\0" * (-(_HEADER.size + len(manifest)) % _ALIGN)
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            # 先占位写文件头，数据写完后再补上校验和
+            f.write(bytes(_HEADER.size))
+            f.write(manifest)
+            checksum = zlib.crc32(manifest)
+            for name, buffer, _ in sections:
+                padding = b"\0" * (-memoryview(buffer).nbytes % _ALIGN)
+                f.write(buffer)
+                f.write(padding)
+                checksum = zlib.crc32(padding, zlib.crc32(buffer, checksum))
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(manifest), checksum))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _open(path: str, verify: bool = True) -> Tuple[FoodDataset, Dict[str, Any]]:
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise SnapshotError("快照文件为空")
+    view = memoryview(mm)
+    if len(view) < _HEADER.size:
+        raise SnapshotError("快照文件已截断")
+    magic, format_version, manifest_size, checksum = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise SnapshotError("不是数据快照文件")
+    if format_version != FORMAT_VERSION:
+        raise SnapshotError(f"不支持的快照格式版本: {format_version}")
+    if verify and zlib.crc32(view[_HEADER.size:]) != checksum:
+        raise SnapshotError("快照文件校验和不匹配")
+    try:
+        manifest = json.loads(bytes(view[_HEADER.size:_HEADER.size + manifest_size]).rstrip(b"\0"))
+    except ValueError:
+        raise SnapshotError("快照清单已损坏")
+    if manifest.get("byteorder") != sys.byteorder:
+        raise SnapshotError("快照文件的字节序与当前平台不一致")
+
+    data_start = _HEADER.size + manifest_size
+
+    def section(name: str):
+        offset, nbytes, typecode = manifest["sections"][name]
+        start = data_start + offset
+        if start + nbytes > len(view):
+            raise SnapshotError(f"快照文件已截断（数据段 {name}）")
+        return view[start:start + nbytes].cast(typecode)
+
+    def table(name: str) -> StringTable:
+        return StringTable(section(f"{name}.blob"), section(f"{name}.offsets"))
+
+    strings = {field: table(field) for field in STRING_FIELDS}
+    interned = {field: InternedColumn(table(f"{field}.values"), section(f"{field}.codes"))
+                for field in INTERNED_FIELDS}
+    foods = ColumnarFoodStore(
+        ids=strings["id"],
+        names=strings["name"],
+        sources=strings["source"],
+        summaries=strings["summary"],
+        categories=interned["category"],
+        portions=interned["portion"],
+        emojis=interned["emoji"],
+        descriptions=strings["description"],
+        calories=section("calories"),
+        calorie_levels=section("calorie_levels"),
+        json=table("json"),
+    )
+    if len(foods) != manifest["rows"]:
+        raise SnapshotError("快照文件的行数与清单不一致")
+
+    category_rows = section("category_rows")
+    by_category = {category: category_rows[start:stop]
+                   for category, (start, stop) in manifest["categories"].items()}
+    by_id = KeyIndex(foods.ids, section("id_order"), manifest["unique_ids"])
+    by_name = KeyIndex(foods.names, section("name_order"), manifest["unique_names"])
+    postings = PostingTable(table("grams"), section("posting_rows"), section("posting_offsets"))
+    calorie_rows, calorie_values = section("calorie_rows"), section("calorie_values")
+    calorie_index = CalorieIndex({
+        (category, level): (calorie_rows[start:stop], calorie_values[start:stop])
+        for category, level, start, stop in manifest["calorie_buckets"]
+    })
+    data = FoodDataset.from_parts(foods, manifest["version"], by_id, by_name, by_category,
+                                  NgramIndex(foods.names, postings), calorie_index, manifest["stats"])
+    return data, manifest
+
+
+def open_snapshot(path: str, verify: bool = True) -> FoodDataset:
+    """以只读方式映射快照文件，返回直接引用映射内存的数据集
+
+    verify 为 True 时先校验整个文件的 CRC32，文件损坏时抛出 SnapshotError。
+    """
+    return _open(path, verify)[0]
+
+
+def _is_current(manifest: Dict[str, Any], data_file: str) -> bool:
+    """快照是否与数据文件一致：文件大小和修改时间不变时直接认为一致，否则比较内容摘要"""
+    try:
+        stat = os.stat(data_file)
+    except FileNotFoundError:
+        # 只部署了快照文件
+        return True
+    source = manifest.get("source")
+    if source == {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}:
+        return True
+    return file_version(data_file) == manifest["version"]
+
+
+@contextlib.contextmanager
+def _exclusive(lock_path: str):
+    """进程间互斥；无法创建锁文件（例如只读目录）或平台不支持文件锁时不加锁
+
+    不加锁时多个进程可能同时编译，但快照经 os.replace 原子替换，读到的总是完整文件
+    """
+    if fcntl is None and msvcrt is None:
+        yield
+        return
+    try:
+        lock = open(lock_path, 'w')
+    except OSError:
+        yield
+        return
+    with lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        else:
+            # LK_LOCK 重试 10 秒后报错，编译较慢时继续等待
+            while True:
+                try:
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def load_snapshot(path: str, data_file: str) -> FoodDataset:
+    """优先映射快照文件；快照缺失、损坏或与数据文件不一致时解析 JSON 并重新编译
+
+    - 只有快照而没有数据文件时直接使用快照，可以只部署编译好的快照
+    - 快照无法写入（例如只读文件系统）时退回到使用 JSON 的解析结果
+    - 多个 worker 同时启动时用文件锁保证只有一个进程在编译，其余进程等待后
+      直接映射新文件；编译完成的进程同样改为映射文件，丢弃自己构建的副本
+    """
+    with _exclusive(f"{path}.lock"):
+        try:
+            data, manifest = _open(path)
+            if _is_current(manifest, data_file):
+                return data
+        except FileNotFoundError:
+            pass
+        except SnapshotError as e:
+            print(f"⚠️ 快照文件不可用，改为解析 JSON: {e}")
+
+        source = os.stat(data_file)
+        data = FoodDataset.from_json_file(data_file)
+        try:
+            write_snapshot(data, path, source)
+        except OSError as e:
+            print(f"⚠️ 无法写入快照文件，本次使用 JSON 数据: {e}")
+            return data
+        print(f"📦 已生成数据快照: {path}")
+        mapped = open_snapshot(path, verify=False)
+        # 本进程实际构建过索引，保留其耗时
+        mapped.index_build_seconds = data.index_build_seconds
+        return mapped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把 data.json 编译成数据快照文件")
+    parser.add_argument("data_file", nargs="?", default="data.json", help="JSON 数据文件")
+    parser.add_argument("-o", "--output", help="快照文件路径，默认与数据文件同名、扩展名为 .snapshot")
+    parser.add_argument("--verify", metavar="SNAPSHOT", help="只校验已有的快照文件")
+    args = parser.parse_args()
+
+    if args.verify:
+        try:
+            data = open_snapshot(args.verify)
+        except SnapshotError as e:
+            print(f"❌ 快照校验失败: {e}")
+            sys.exit(1)
+        print(f"✅ 快照完好: {len(data)} 条食物数据 (版本 {data.version})")
+        return
+
+    output = args.output or os.path.splitext(args.data_file)[0] + ".snapshot"
+    start = time.perf_counter()
+    source = os.stat(args.data_file)
+    data = FoodDataset.from_json_file(args.data_file)
+    write_snapshot(data, output, source)
+    elapsed = time.perf_counter() - start
+    print(f"📦 已生成数据快照: {output}")
+    print(f"   {len(data)} 条食物数据，{os.path.getsize(output) / 2**20:.1f}MB，"
+          f"版本 {data.version}，耗时 {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""搜索框自动补全：按前缀查找食物名称，结果按搜索热度排序
+
+名称（小写，安装了 pypinyin 时还有全拼和首字母）按 UTF-8 字节序排好后存入
+StringTable，前缀对应排序数组中连续的一段，两次二分即可定位，相当于一棵
+隐式的字符 trie。候选较少的前缀直接在这一段中挑选；候选多的前缀（trie 中
+“爆裂”开的节点）缓存其 top-k 行号，由各子节点的 top-k 合并得到，热度变化时
+只需更新该名称沿路的节点。
+"""
+import heapq
+import threading
+from array import array
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from food_store import StringTable
+
+try:
+    from pypinyin import Style, lazy_pinyin  # 用于拼音和首字母补全，已列入 requirements.txt
+except ImportError:
+    # 未安装时只按名称前缀补全，拼音输入没有结果
+    lazy_pinyin = None
+
+PINYIN_ENABLED = lazy_pinyin is not None
+
+# 每个前缀保留的候选数（接口 limit 的上限）
+TOP_K = 10
+# 候选数不超过该值的前缀每次直接挑选，不缓存 top-k
+BURST_SIZE = 128
+
+# 大于任何 UTF-8 字节，key + _MAX_BYTE 是所有以 key 开头的键的上界
+_MAX_BYTE = b"\xff"
+
+
+def _char_length(lead: int) -> int:
+    """UTF-8 首字节对应的字符长度"""
+    if lead < 0x80:
+        return 1
+    if lead < 0xE0:
+        return 2
+    if lead < 0xF0:
+        return 3
+    return 4
+
+
+def name_keys(name: str) -> Iterator[str]:
+    """一个名称的全部补全键：小写名称，以及含汉字时的全拼和首字母"""
+    key = name.lower()
+    yield key
+    if lazy_pinyin is not None and any('一' <= ch <= '鿿' for ch in key):
+        full = "".join(lazy_pinyin(key))
+        initials = "".join(lazy_pinyin(key, style=Style.FIRST_LETTER))
+        yield full
+        if initials != full:
+            yield initials
+
+
+class Popularity:
+    """各食物名称（小写）被搜索的次数；保存在索引之外，重新加载数据后保留"""
+
+    def __init__(self):
+        self._hits: Dict[str, int] = {}
+
+    def __getitem__(self, name: str) -> int:
+        return self._hits.get(name, 0)
+
+    def increment(self, name: str) -> int:
+        hits = self._hits[name] = self._hits.get(name, 0) + 1
+        return hits
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+
+class SuggestIndex:
+    """名称前缀索引，每个候选较多的前缀缓存按热度排序的 top-k 行号
+
+    同名（忽略大小写）的食物只保留第一条。排序规则：搜索次数多的在前，
+    次数相同时名称短的在前，再按数据顺序。
+    """
+
+    def __init__(self, names: Sequence[str], version: str, popularity: Popularity):
+        self.version = version
+        self._names = names
+        self._popularity = popularity
+        first_row: Dict[bytes, int] = {}
+        for row, name in enumerate(names):
+            for key in name_keys(name):
+                first_row.setdefault(key.encode('utf-8'), row)
+        keys = sorted(first_row)
+        self._keys = StringTable.build(keys)
+        self._rows = array('I', [first_row[key] for key in keys])
+        # 前缀（字节串）到 top-k 行号列表；列表整体替换，读取时无需加锁
+        self._nodes: Dict[bytes, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _rank(self, row: int) -> Tuple[int, int, int]:
+        name = self._names[row]
+        return -self._popularity[name.lower()], len(name), row
+
+    def _lower_bound(self, lo: int, hi: int, key: bytes) -> int:
+        get_bytes = self._keys.get_bytes
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if get_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _range(self, prefix: bytes) -> Tuple[int, int]:
+        """以 prefix 开头的键在排序数组中的区间"""
+        lo = self._lower_bound(0, len(self._rows), prefix)
+        return lo, self._lower_bound(lo, len(self._rows), prefix + _MAX_BYTE)
+
+    def _pick(self, rows: Iterable[int]) -> List[int]:
+        # 同一食物的名称和拼音可能同时落在一个前缀下，先去重
+        return heapq.nsmallest(TOP_K, dict.fromkeys(rows), key=self._rank)
+
+    def _top(self, prefix: bytes, lo: int, hi: int) -> List[int]:
+        """区间 [lo, hi)（即以 prefix 开头的全部键）的 top-k 行号"""
+        if hi - lo <= BURST_SIZE:
+            return self._pick(self._rows[lo:hi])
+        cached = self._nodes.get(prefix)
+        if cached is not None:
+            return cached
+
+        # 合并各子节点（前缀后再跟一个字符）的 top-k
+        get_bytes = self._keys.get_bytes
+        candidates: List[int] = []
+        i = lo
+        if get_bytes(i) == prefix:
+            candidates.append(self._rows[i])
+            i += 1
+        depth = len(prefix)
+        while i < hi:
+            key = get_bytes(i)
+            child = key[:depth + _char_length(key[depth])]
+            child_hi = self._lower_bound(i, hi, child + _MAX_BYTE)
+            candidates.extend(self._top(child, i, child_hi))
+            i = child_hi
+        top = self._pick(candidates)
+        with self._lock:
+            self._nodes[prefix] = top
+        return top
+
+    def suggest(self, prefix: str, limit: int = TOP_K) -> List[int]:
+        """以 prefix 开头（忽略大小写，可用拼音或首字母）的名称，按热度返回行号"""
+        key = prefix.lower().encode('utf-8')
+        if not key:
+            return []
+        lo, hi = self._range(key)
+        if lo == hi:
+            return []
+        return self._top(key, lo, hi)[:limit]
+
+    def warm(self):
+        """预先算好所有候选较多的前缀的 top-k（耗时与数据量成正比，适合在后台线程中执行）"""
+        if len(self._rows) > BURST_SIZE:
+            self._top(b"", 0, len(self._rows))
+
+    def record_hit(self, query: str) -> bool:
+        """query 与某个食物名称完全相同（忽略大小写）时计一次搜索，返回是否计入"""
+        key = query.lower().encode('utf-8')
+        i = self._lower_bound(0, len(self._rows), key)
+        if i >= len(self._rows) or self._keys.get_bytes(i) != key:
+            return False
+        row = self._rows[i]
+        name = self._names[row]
+        self._popularity.increment(name.lower())
+
+        # 更新该名称（及其拼音）沿路已缓存的节点
+        rank = self._rank(row)
+        for variant in name_keys(name):
+            encoded = variant.encode('utf-8')
+            for end in range(len(encoded) + 1):
+                node = self._nodes.get(encoded[:end])
+                if node is None:
+                    continue
+                if row not in node and len(node) >= TOP_K and rank >= self._rank(node[-1]):
+                    continue
+                with self._lock:
+                    self._nodes[encoded[:end]] = sorted(set(node) | {row}, key=self._rank)[:TOP_K]
+        return True
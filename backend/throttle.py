@@ -0,0 +1,72 @@
+"""爬虫使用的限速、礼貌间隔与重试工具"""
+import random
+import threading
+import time
+from typing import Callable, Dict, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+
+class RateLimiter:
+    """线程安全的令牌桶限速器，限制所有线程合计的每秒请求数"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        # rate <= 0 表示不限速
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取得一个令牌，令牌不足时阻塞等待"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostThrottle:
+    """对同一站点的相邻两次请求保持最小间隔（礼貌爬取）
+
+    每个线程先在锁内预约下一个可用时间点，再在锁外等待，
+    因此多个线程访问同一站点时会依次错开，而不会同时醒来。
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: str):
+        if self.min_interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def retry_with_backoff(func: Callable[[], T], retries: int = 3, base_delay: float = 1.0,
+                       max_delay: float = 30.0,
+                       retry_on: Tuple[Type[BaseException], ...] = (Exception,)) -> T:
+    """失败时按指数退避（带随机抖动）重试，超过次数后抛出最后一次的异常"""
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except retry_on as e:
+            if attempt == retries:
+                raise
+            delay = min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"   请求失败，{delay:.1f}s 后重试: {e}")
+            time.sleep(delay)
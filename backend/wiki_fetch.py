@@ -0,0 +1,180 @@
+"""维基百科抓取后端：搜索、批量加载页面和批量查询修订号
+
+- MediaWikiFetcher：直接调用 MediaWiki action API，一次请求最多查询 50 个标题，
+  同时取回页面地址（info）、修订号（revisions）和歧义页标记，并解析规范化标题
+  和重定向。TextExtracts 每次请求只返回一个页面的全文正文（extracts），其余
+  页面要通过 excontinue 翻页，因此加载 N 个页面的正文仍需 N 次请求；搜索时以
+  搜索结果作为 generator，第一次响应就带有其中一个结果页面的正文，其余结果
+  页面在用到时再加载
+- WikipediaLibFetcher：沿用 wikipedia 库逐页加载，每个页面需要 3 次左右请求，
+  保留用于对照
+
+页面以可缓存的字典返回（与 ScrapeCache 中 page: 条目的格式相同）：正常页面为
+WikiPage.to_dict()，歧义页为 {'title', 'disambiguation'}，不存在的页面为
+{'missing': True}。
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import wikipedia
+from bs4 import BeautifulSoup
+
+# MediaWiki API 单次请求的标题数上限（未登录用户）
+BATCH_SIZE = 50
+
+GetJson = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+# 批量加载页面时请求的属性：正文、页面地址、修订号和歧义页标记
+_PAGE_PARAMS = {
+    'prop': 'extracts|info|revisions|pageprops',
+    'explaintext': '',
+    'exlimit': 'max',
+    'inprop': 'url',
+    'rvprop': 'ids',
+    'ppprop': 'disambiguation',
+}
+
+
+def _chunks(titles: Sequence[str], size: int) -> List[Sequence[str]]:
+    return [titles[start:start + size] for start in range(0, len(titles), size)]
+
+
+class MediaWikiFetcher:
+    """get_json 执行一次 action=query 请求并返回解析后的 JSON（由爬虫负责限速和重试）
+
+    batch_size 为一次请求能加载的页面数，大于 1 时爬虫会预先批量加载全部搜索结果。
+    """
+
+    batch_size = BATCH_SIZE
+
+    def __init__(self, get_json: GetJson):
+        self._get_json = get_json
+
+    def _query(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        data = self._get_json(params)
+        if 'error' in data:
+            raise wikipedia.exceptions.WikipediaException(data['error'].get('info', 'MediaWiki API 错误'))
+        return data
+
+    def _query_pages(self, params: Dict[str, Any], titles: Sequence[str] = (),
+                     follow: bool = True) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """对一批标题（或 params 中的 generator）执行 prop 查询并跟随 continue 取完全部属性
+
+        返回 (最终标题 -> 页面, 请求的标题 -> 规范化并解析重定向后的最终标题)。
+        正文等属性超出单次返回上限时会分散在多次响应中，按页面合并；follow 为
+        False 时只取第一次响应。generator 自身的翻页（更多搜索结果）不跟随。
+        """
+        params = {**params, 'redirects': ''}
+        if titles:
+            params['titles'] = '|'.join(titles)
+        pages: Dict[str, Dict[str, Any]] = {}
+        resolved = {title: title for title in titles}
+        while True:
+            data = self._query(params)
+            query = data.get('query', {})
+            for key in ('normalized', 'redirects'):
+                mapping = {item['from']: item['to'] for item in query.get(key, [])}
+                if mapping:
+                    resolved = {title: mapping.get(target, target) for title, target in resolved.items()}
+            for page in query.get('pages', {}).values():
+                pages.setdefault(page['title'], {}).update(page)
+            continuation = data.get('continue', {})
+            if not follow or not set(continuation) - {'continue', 'gsroffset'}:
+                return pages, resolved
+            params = {**params, **continuation}
+
+    def search(self, term: str, results: int = 5) -> List[str]:
+        data = self._query({'list': 'search', 'srprop': '', 'srlimit': results, 'srsearch': term})
+        return [item['title'] for item in data['query']['search']]
+
+    def search_pages(self, term: str, results: int = 5) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+        """搜索并取回第一次响应中已有正文的结果页面（一次请求）
+
+        返回 (按相关度排序的标题, 标题 -> 页面字典)；正文要翻页才能取得的页面
+        不在字典中，由调用方按需加载（多数食物在第一个结果页面就能找到数据）。
+        """
+        pages, _ = self._query_pages({**_PAGE_PARAMS, 'generator': 'search', 'gsrsearch': term,
+                                      'gsrlimit': results, 'gsrprop': ''}, follow=False)
+        ranked = sorted(pages.values(), key=lambda page: page.get('index', 0))
+        loaded = {page['title']: self._entry(page) for page in ranked
+                  if 'extract' in page or 'missing' in page or 'pageprops' in page}
+        return [page['title'] for page in ranked], loaded
+
+    def search_revisions(self, term: str, results: int = 5) -> Tuple[List[str], Dict[str, Optional[int]]]:
+        """搜索并取回结果页面的当前修订号（一次请求，不含正文），返回 (按相关度排序的标题, 标题 -> 修订号)"""
+        pages, _ = self._query_pages({'prop': 'revisions', 'rvprop': 'ids', 'generator': 'search',
+                                      'gsrsearch': term, 'gsrlimit': results, 'gsrprop': ''})
+        ranked = sorted(pages.values(), key=lambda page: page.get('index', 0))
+        return ([page['title'] for page in ranked],
+                {page['title']: page.get('revisions', [{}])[0].get('revid') for page in ranked})
+
+    def fetch(self, titles: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """加载多个页面，每 BATCH_SIZE 个标题一次请求，返回 请求的标题 -> 页面字典"""
+        result: Dict[str, Dict[str, Any]] = {}
+        for chunk in _chunks(titles, BATCH_SIZE):
+            pages, resolved = self._query_pages(_PAGE_PARAMS, chunk)
+            for title in chunk:
+                result[title] = self._entry(pages.get(resolved[title]))
+        return result
+
+    def revisions(self, titles: Sequence[str]) -> Dict[str, Optional[int]]:
+        """各标题当前的修订号（页面不存在时为 None），每 BATCH_SIZE 个标题一次请求"""
+        result: Dict[str, Optional[int]] = {}
+        for chunk in _chunks(titles, BATCH_SIZE):
+            pages, resolved = self._query_pages({'prop': 'revisions', 'rvprop': 'ids'}, chunk)
+            for title in chunk:
+                page = pages.get(resolved[title]) or {}
+                result[title] = page.get('revisions', [{}])[0].get('revid')
+        return result
+
+    def _entry(self, page: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if page is None or 'missing' in page or 'invalid' in page:
+            return {'missing': True}
+        if 'pageprops' in page:
+            return {'title': page['title'], 'disambiguation': self._disambiguation_options(page['title'])}
+        revisions = page.get('revisions')
+        return {
+            'title': page['title'],
+            'url': page.get('fullurl', ''),
+            'content': page.get('extract', ''),
+            'revision_id': revisions[0]['revid'] if revisions else page.get('lastrevid'),
+        }
+
+    def _disambiguation_options(self, title: str) -> List[str]:
+        """歧义页的候选标题：与 wikipedia 库相同，取渲染后页面中各列表项的第一个链接"""
+        data = self._query({'prop': 'revisions', 'rvprop': 'content', 'rvparse': '', 'rvlimit': 1,
+                            'titles': title})
+        page = next(iter(data['query']['pages'].values()))
+        html = page.get('revisions', [{}])[0].get('*', '')
+        items = BeautifulSoup(html, 'html.parser').find_all('li')
+        return [li.a.get_text() for li in items
+                if li.a and 'tocsection' not in ''.join(li.get('class', []))]
+
+
+class WikipediaLibFetcher(MediaWikiFetcher):
+    """通过 wikipedia 库逐页加载；request 负责限速和重试，修订号仍批量查询"""
+
+    batch_size = 1
+
+    def __init__(self, get_json: GetJson, request: Callable[..., Any]):
+        super().__init__(get_json)
+        self._request = request
+
+    def search(self, term: str, results: int = 5) -> List[str]:
+        return self._request(wikipedia.search, term, results=results)
+
+    def fetch(self, titles: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        result: Dict[str, Dict[str, Any]] = {}
+        for title in titles:
+            try:
+                page = self._request(wikipedia.page, title)
+                content = self._request(lambda: page.content)
+            except wikipedia.exceptions.DisambiguationError as e:
+                result[title] = {'title': e.title, 'disambiguation': e.options}
+                continue
+            except wikipedia.exceptions.PageError:
+                result[title] = {'missing': True}
+                continue
+            result[title] = {'title': page.title, 'url': page.url, 'content': content,
+                             'revision_id': page.revision_id}
+        return result
+
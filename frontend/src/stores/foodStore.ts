@@ -3,10 +3,11 @@ import { ref, computed } from "vue";
 import type {
   FoodItem,
   FoodCategory,
+  FoodSuggestion,
   SearchParams,
   StatsData,
 } from "../types/food";
-import axios from "axios";
+import axios, { type AxiosResponse } from "axios";
 
 // 在Docker环境中，API请求通过nginx代理，不需要设置baseURL
 // axios.defaults.baseURL = "http://localhost:8000";
@@ -19,6 +20,13 @@ export const useFoodStore = defineStore("food", () => {
   const searchResults = ref<FoodItem[] | null>(null);
   const searchQuery = ref("");
   const stats = ref<StatsData | null>(null);
+  // 游标分页状态：当前列表对应的分类、总数和下一页游标
+  const feedCategory = ref<string>("all");
+  const totalFoods = ref(0);
+  const nextCursor = ref<string | null>(null);
+  const loadingMore = ref(false);
+
+  const hasMoreFoods = computed(() => nextCursor.value !== null);
 
   const filteredFoods = computed(() => {
     // 如果有搜索结果，优先显示搜索结果
@@ -35,16 +43,29 @@ export const useFoodStore = defineStore("food", () => {
     );
   });
 
+  // 从响应头读取总数和下一页游标
+  const updatePaging = (response: AxiosResponse) => {
+    const total = Number(response.headers["x-total-count"]);
+    totalFoods.value = Number.isNaN(total) ? foods.value.length : total;
+    nextCursor.value = response.headers["x-next-cursor"] ?? null;
+  };
+
+  const feedUrl = (category: string) =>
+    category === "all" ? "/api/foods" : `/api/foods/category/${category}`;
+
   // 获取所有食物
   const fetchFoods = async (params?: SearchParams) => {
     loading.value = true;
     try {
       const response = await axios.get("/api/foods", { params });
       foods.value = response.data;
+      feedCategory.value = "all";
+      updatePaging(response);
       console.log(`✅ 成功加载了 ${foods.value.length} 个食物数据`);
     } catch (error) {
       console.error("获取食物数据失败:", error);
       foods.value = [];
+      nextCursor.value = null;
     } finally {
       loading.value = false;
     }
@@ -104,6 +125,22 @@ export const useFoodStore = defineStore("food", () => {
     }
   };
 
+  // 搜索框自动补全（只取名称，不影响当前列表）
+  const fetchSuggestions = async (query: string): Promise<FoodSuggestion[]> => {
+    if (!query.trim()) {
+      return [];
+    }
+    try {
+      const response = await axios.get("/api/foods/suggest", {
+        params: { q: query, limit: 8 },
+      });
+      return response.data;
+    } catch (error) {
+      console.error("获取搜索建议失败:", error);
+      return [];
+    }
+  };
+
   // 按类别获取食物
   const fetchFoodsByCategory = async (category: string) => {
     loading.value = true;
@@ -112,14 +149,41 @@ export const useFoodStore = defineStore("food", () => {
         params: { limit: 100 },
       });
       foods.value = response.data;
+      feedCategory.value = category;
+      updatePaging(response);
     } catch (error) {
       console.error("获取类别食物失败:", error);
       foods.value = [];
+      nextCursor.value = null;
     } finally {
       loading.value = false;
     }
   };
 
+  // 无限滚动：按游标加载下一页，每页的开销与已加载的数量无关
+  const loadMoreFoods = async (limit = 100) => {
+    if (nextCursor.value === null || loadingMore.value || loading.value) {
+      return;
+    }
+    loadingMore.value = true;
+    const category = feedCategory.value;
+    try {
+      const response = await axios.get(feedUrl(category), {
+        params: { limit, cursor: nextCursor.value },
+      });
+      // 加载期间切换了分类，丢弃这一页
+      if (category !== feedCategory.value) {
+        return;
+      }
+      foods.value = foods.value.concat(response.data);
+      updatePaging(response);
+    } catch (error) {
+      console.error("加载更多食物失败:", error);
+    } finally {
+      loadingMore.value = false;
+    }
+  };
+
   const clearSearch = () => {
     searchResults.value = null;
     searchQuery.value = "";
@@ -143,11 +207,16 @@ export const useFoodStore = defineStore("food", () => {
     searchQuery,
     filteredFoods,
     stats,
+    totalFoods,
+    loadingMore,
+    hasMoreFoods,
     fetchFoods,
     fetchCategories,
     fetchStats,
     fetchFoodsByCategory,
+    loadMoreFoods,
     searchFoods,
+    fetchSuggestions,
     clearSearch,
     initializeFoods,
   };
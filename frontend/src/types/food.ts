@@ -11,6 +11,12 @@ export interface FoodItem {
   summary?: string;
 }
 
+// 自动补全接口只返回 ID 和名称
+export interface FoodSuggestion {
+  id: string;
+  name: string;
+}
+
 export interface FoodCategory {
   id: string;
   name: string;
@@ -31,7 +37,18 @@ export interface StatsData {
     average: number;
     max: number;
     min: number;
+    median?: number;
+    percentiles?: Record<string, number>; // 例如: { p25: 95, p50: 180 }
   };
   calorie_level_distribution: Record<number, number>;
   category_distribution: Record<string, number>;
+  category_stats?: Record<string, CategoryStats>;
+}
+
+export interface CategoryStats {
+  count: number;
+  average: number;
+  median: number;
+  max: number;
+  min: number;
 }